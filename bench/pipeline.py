@@ -0,0 +1,271 @@
+"""
+End-to-end pipeline benchmark (headless).  
+Drives the real pipeline: load generator -> source (StreamLoader/SocketLoader) -> parse -> queue  
+-> interpolate + render (Plotter3D, off screen) -> plot (LivePlotter, Agg canvas) -> record (Recorder).  
+Every case (channels x rate x mesh vertices) runs in its own process so peak memory is per case.  
+
+Examples:  
+    python -m bench.pipeline --output results.json  
+    python -m bench.pipeline --vertices 10000 --compare bench_baseline.json  
+    python -m bench.pipeline --save-baseline bench_baseline.json  
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+
+def make_mesh(num_vertices:int):
+    """
+    Sphere with approximately num_vertices vertices.  
+    """
+    import pyvista as pv
+    resolution = max(8, int(np.sqrt(num_vertices)))
+    return pv.Sphere(radius=1.0, theta_resolution=resolution, phi_resolution=resolution)
+
+
+def make_sensors(mesh, num_sensors:int, seed:int = 0):
+    rng = np.random.default_rng(seed)
+    idx = rng.choice(mesh.n_points, num_sensors, replace=False)
+    return np.asarray(mesh.points[idx], dtype=np.float64)
+
+
+def percentiles(values) -> dict:
+    if len(values) == 0:
+        return {"count": 0}
+    values = np.asarray(values) * 1e3
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"count": len(values), "mean_ms": float(values.mean()), "p50_ms": float(p50),
+            "p90_ms": float(p90), "p99_ms": float(p99), "max_ms": float(values.max())}
+
+
+def _start_source(kind:str, meas_q, fifo_path:str, port:int):
+    if kind == "fifo":
+        from data.stream_loader import StreamLoader
+        from data.stream_writer import FifoOutput
+        if not os.path.exists(fifo_path):
+            os.mkfifo(fifo_path)
+        loader = StreamLoader(fifo_path, meas_q)
+        loader.start()
+        return loader, FifoOutput(fifo_path)
+    from data.socket_loader import SocketLoader
+    from data.stream_writer import SocketOutput
+    url = f"tcp://127.0.0.1:{port}"
+    loader = SocketLoader(url, meas_q)
+    loader.start()
+    # SocketLoader reconnects with backoff until the generator listens
+    return loader, SocketOutput(url)
+
+
+def run_case(channels:int, rate:float, vertices:int, duration:float, source:str = "fifo", port:int = 50700) -> dict:
+    """
+    Runs one benchmark case in the current process.  
+    Returns:  
+        - case result dict  
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import pyvista as pv
+    from gui.plotter_3D import Plotter3D
+    from gui.live_plotter import LivePlotter
+    from data.recorder import Recorder
+    from data.stream_writer import SignalGenerator, FaultInjector, LoadGenerator
+
+    setup_start = time.perf_counter()
+    mesh = make_mesh(vertices)
+    sensor_positions = make_sensors(mesh, channels)
+    labels = [f"S{i}" for i in range(channels)]
+    plotter = pv.Plotter(off_screen=True)
+    plotter_3D = Plotter3D(plotter, mesh, sensor_positions, labels)
+    figure = Figure()
+    live_plotter = LivePlotter(figure, FigureCanvasAgg(figure), labels)
+    workdir = tempfile.mkdtemp(prefix="vizcalor_bench_")
+    recorder = Recorder(os.path.join(workdir, "record.csv"), labels)
+    setup_time = time.perf_counter() - setup_start
+
+    stages = {name: [] for name in ("queue", "interpolate", "render", "plot", "record", "end_to_end")}
+    # interpolation is timed separately from the rest of update_temperatures (VTK render),
+    # per frame -> frames skipped without interpolation have no entry
+    interpolate = plotter_3D.interpolate_temperatures
+    frame = dict()
+    def timed_interpolate(temps):
+        t0 = time.perf_counter()
+        result = interpolate(temps)
+        frame["interpolate"] = frame.get("interpolate", 0.0) + time.perf_counter() - t0
+        return result
+    plotter_3D.interpolate_temperatures = timed_interpolate
+
+    meas_q = queue.Queue()
+    # opening the output blocks until the source is connected
+    loader, output = _start_source(source, meas_q, os.path.join(workdir, "stream"), port)
+    generator = LoadGenerator(output, SignalGenerator(channels, rate, noise=0.05), FaultInjector())
+    report = {}
+    gen_thread = threading.Thread(target=lambda: report.update(generator.run(duration)), daemon=True)
+    gen_thread.start()
+
+    processed = 0
+    deadline = None
+    while True:
+        try:
+            temps = meas_q.get(timeout=0.5)
+        except queue.Empty:
+            if not gen_thread.is_alive():
+                break
+            continue
+        t_get = time.perf_counter()
+        if rate > 0:
+            # rows arrive in order without faults -> row k was due at start_time + k / rate
+            due = generator.start_time + processed / rate
+            stages["queue"].append(t_get - due)
+        else:
+            # unlimited rate -> no schedule, latency counted from the dequeue
+            due = t_get
+        frame.clear()
+        t0 = time.perf_counter()
+        plotter_3D.update_temperatures(temps)
+        t1 = time.perf_counter()
+        if "interpolate" in frame:
+            stages["interpolate"].append(frame["interpolate"])
+        stages["render"].append((t1 - t0) - frame.get("interpolate", 0.0))
+        live_plotter.update(temps)
+        t2 = time.perf_counter()
+        stages["plot"].append(t2 - t1)
+        recorder.write(temps)
+        t3 = time.perf_counter()
+        stages["record"].append(t3 - t2)
+        stages["end_to_end"].append(t3 - due)
+        processed += 1
+        if deadline is None:
+            deadline = generator.start_time + duration
+        if t3 > deadline and not gen_thread.is_alive():
+            break
+    elapsed = time.perf_counter() - generator.start_time
+    backlog = meas_q.qsize()
+    gen_thread.join()
+    output.close()
+    loader.stop()
+    recorder.close()
+    plotter.close()
+
+    return {
+        "case": {"channels": channels, "rate": rate, "vertices": int(mesh.n_points), "source": source},
+        "setup_s": setup_time,
+        "generated_rows": report.get("rows", 0),
+        "processed_rows": processed,
+        "backlog_rows": backlog,
+        "throughput_rows_per_s": processed / elapsed if elapsed > 0 else 0.0,
+        "stages": {name: percentiles(values) for name, values in stages.items()},
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != "darwin" else 1024 ** 2),
+    }
+
+
+def _case_process(result_q, *args):
+    # stdout is reserved for the JSON results
+    sys.stdout = sys.stderr
+    try:
+        result_q.put(run_case(*args))
+    except Exception as e:
+        result_q.put({"error": repr(e)})
+
+
+def run_isolated(*args) -> dict:
+    """
+    Runs run_case in a fresh process -> peak memory of the case only.  
+    """
+    ctx = multiprocessing.get_context("spawn")
+    result_q = ctx.Queue()
+    process = ctx.Process(target=_case_process, args=(result_q,) + args)
+    process.start()
+    result = result_q.get()
+    process.join()
+    return result
+
+
+def case_key(result:dict) -> str:
+    case = result["case"]
+    return f"{case['source']}/ch{case['channels']}/rate{case['rate']:g}/v{case['vertices']}"
+
+
+def compare(results:dict, baseline:dict, tolerance:float) -> list[str]:
+    """
+    Returns:  
+        - list of regressions (throughput lower or p50/p90 latency higher than tolerance allows)  
+    """
+    base_cases = {case_key(r): r for r in baseline.get("results", []) if "error" not in r}
+    regressions = []
+    for result in results["results"]:
+        if "error" in result or case_key(result) not in base_cases:
+            continue
+        base = base_cases[case_key(result)]
+        key = case_key(result)
+        if result["throughput_rows_per_s"] < base["throughput_rows_per_s"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {result['throughput_rows_per_s']:.1f} < {base['throughput_rows_per_s']:.1f} rows/s")
+        for stage, stats in result["stages"].items():
+            base_stats = base["stages"].get(stage, {})
+            for p in ("p50_ms", "p90_ms"):
+                if p in stats and p in base_stats and stats[p] > base_stats[p] * (1 + tolerance):
+                    regressions.append(f"{key}: {stage} {p} {stats[p]:.3f} > {base_stats[p]:.3f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--channels", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--rates", type=float, nargs="+", default=[10.0, 100.0], help="rows per second")
+    parser.add_argument("--vertices", type=int, nargs="+", default=[10000, 200000, 2000000])
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds of generated data per case")
+    parser.add_argument("--source", choices=("fifo", "tcp"), default="fifo")
+    parser.add_argument("--output", default=None, help="results JSON (default stdout)")
+    parser.add_argument("--compare", default=None, help="baseline JSON -> exit code 1 on regression")
+    parser.add_argument("--save-baseline", default=None, help="also store results as baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": [],
+    }
+    for i, (channels, rate, vertices) in enumerate(itertools.product(args.channels, args.rates, args.vertices)):
+        print(f"case ch={channels} rate={rate:g} vertices={vertices}", file=sys.stderr)
+        result = run_isolated(channels, rate, vertices, args.duration, args.source, 50700 + i)
+        if "error" in result:
+            print(f"  failed: {result['error']}", file=sys.stderr)
+            result["case"] = {"channels": channels, "rate": rate, "vertices": vertices, "source": args.source}
+        else:
+            print(f"  {result['throughput_rows_per_s']:.1f} rows/s, e2e p50 {result['stages']['end_to_end'].get('p50_ms', 0):.1f} ms, "
+                  f"peak {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+        results["results"].append(result)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,32 @@
 from labjack import ljm
 import threading
 import time
+import math
 from functools import partial
 import queue
+import numpy as np
+from data.supervisor import Gap, reconnect
+from data.metrics import metrics
 
 class TemperatureMeas(threading.Thread):
+    # T7 AIN extended features (AIN#_EF_INDEX) that linearize on the device
+    ef_indexes = {
+        "TC_E": 20,
+        "TC_J": 21,
+        "TC_K": 22,
+        "TC_R": 23,
+        "TC_T": 24,
+        "TC_S": 25,
+        "TC_N": 27,
+        "TC_B": 28,
+        "TC_C": 30,
+        "RTD_PT100": 40,
+        "RTD_PT500": 41,
+        "RTD_PT1000": 42,
+    }
+    ef_temp_units = {"K": 0, "C": 1, "F": 2}
 
-    def __init__(self, channels:list[str]|int|tuple[int,int]|list[int], config:dict, temperature_q:queue.Queue) -> None:
+    def __init__(self, channels:list[str]|int|tuple[int,int]|list[int], config:dict, temperature_q:queue.Queue, identifier:str = "ANY") -> None:
         threading.Thread.__init__(self)
         
         if type(channels) == list:
@@ -30,42 +50,125 @@ class TemperatureMeas(threading.Thread):
         else:
             raise ValueError("Invalid channels, should be {list[int]|list[str]|tuple[int, int]|int}, got: ", type(channels))
         #print("Channels to sample: ", self.channels)
-        self.tool = ljm.openS("T7", "ANY", "ANY")
-        info = ljm.getHandleInfo(self.tool)
-        print(f"Opened LabJack with Device type: {info[0]}\nConnection type: {info[1]}\nSerial number: {info[2]}")
+        # identifier -> serial number / IP / name of the device, "ANY" opens the first one found
+        self.identifier = identifier
+        self.tool = None
+        self.serial_number = None
         # config should be dict:
         # for each "AIN0" : {"T_FUNC": [0, 1, 2] -> polynomial coeffs (voltage to temp conversion)}
+        #   or {"EF_TYPE": "TC_K"} -> conversion done on the device (see ef_indexes), optional
+        #   "EF_UNITS" ("C" default), "EF_CONFIG" ({"CONFIG_B": 60052, ...} raw AIN#_EF_* registers) and "RANGE"
+        # "ACQ_MODE" -> "Stream" (hardware stream at SCAN_FREQ) or "Poll" (one eReadNames every POLL_PERIOD_S)
+        # "FILTER" -> {"METHOD": ..., "FACTOR": n} stream runs at n * SCAN_FREQ and publishes blocks of n scans
+        #   (decimated back to SCAN_FREQ by data.decimator right after acquisition)
         self.config = config
-        self.config_channels()
+        self.mode = config.get("ACQ_MODE", "Stream")
+        if self.mode not in ("Stream", "Poll"):
+            raise ValueError("Invalid acquisition mode, should be {Stream|Poll} -> got: ", self.mode)
+        self.poll_period = float(config.get("POLL_PERIOD_S", 1.0))
+        if self.poll_period <= 0:
+            raise ValueError("Poll period has to be positive -> got: ", self.poll_period)
+        filter_config = config.get("FILTER", {})
+        self.oversampling = 1
+        if self.mode == "Stream" and filter_config.get("METHOD", "None") != "None":
+            self.oversampling = max(1, int(filter_config.get("FACTOR", 1)))
+        self.calibrations = {chan: self.__channel_calibration(chan) for chan in self.channels}
+        self.ef_channels = [chan for chan in self.channels if "EF_TYPE" in self.calibrations[chan]]
+        if self.ef_channels and self.mode == "Stream":
+            # AIN-EF results are command-response registers, the T7 can not put them into a stream scan
+            raise ValueError(f"Extended feature channels {self.ef_channels} need the Poll acquisition mode")
+        # names that are actually read -> EF channels return the converted value in AIN#_EF_READ_A
+        self.read_names = [f"{chan}_EF_READ_A" if chan in self.ef_channels else chan for chan in self.channels]
+        self.__open()
         self.transfer_functions = {}
         # prepare transfer functions
         self.__init_transfer_functions()
         self._q = temperature_q
+        # timeline of the acquisition: scan k was taken at start_time + k / scan_rate (monotonic clock)
+        # start_time can be set before .start() to share the poll grid between more devices
+        self.start_time = None
+        self.scan_rate = None
+        self.scan_index = 0
         self.end = threading.Event()
         self.daemon = True # when main thread exits -> this thread ends too
     
+    def __open(self):
+        self.tool = ljm.openS("T7", "ANY", self.identifier)
+        info = ljm.getHandleInfo(self.tool)
+        self.serial_number = info[2]
+        # reconnect has to find the same device again, not any device
+        self.identifier = str(info[2])
+        print(f"Opened LabJack with Device type: {info[0]}\nConnection type: {info[1]}\nSerial number: {info[2]}")
+        try:
+            self.config_channels()
+            # prepare LED for blinking
+            self.__led_init()
+        except Exception:
+            self.__close()
+            raise
+    
+    def __close(self):
+        try:
+            ljm.close(self.tool)
+        except Exception as e:
+            # handle of a disconnected device can already be invalid
+            print(f"Close error: {e}")
+    
     def config_channels(self):
         # self channels are ["AIN0", "AIN5", "AIN4"] ...
         # -> configure them and the results are gonna be returned in this order (I think? TODO: Test it)
         settle_us_time = self.config["SETTLING_MS"] * 1000
-        v_range = 10.0 # TODO: Read the needed range out of the assigned sensor config
         for channel in self.channels:
-            # Set the range to 0-10.0V
+            calib = self.calibrations[channel]
+            is_thermocouple = calib.get("EF_TYPE", "").startswith("TC_")
+            # thermocouples produce mV -> smallest range, everything else 0-10.0V unless the calibration says otherwise
+            v_range = calib.get("RANGE", 0.1 if is_thermocouple else 10.0)
             ljm.eWriteName(self.tool, f"{channel}_RANGE", v_range)
             # Set the resolution index
             ljm.eWriteName(self.tool, f"{channel}_RESOLUTION_INDEX", self.config["RESOLUTION"])
             # Set settling time
             ljm.eWriteName(self.tool, f"{channel}_SETTLING_US", settle_us_time)
+            if channel in self.ef_channels:
+                self.__config_extended_feature(channel, calib)
+            else:
+                # make sure no EF from previous session is left on the channel
+                ljm.eWriteName(self.tool, f"{channel}_EF_INDEX", 0)
+    
+    def __config_extended_feature(self, channel, calib):
+        ef_type = calib["EF_TYPE"]
+        if ef_type not in self.ef_indexes:
+            raise ValueError(f"Unknown extended feature type for channel {channel}, should be one of {list(self.ef_indexes)} -> got: ", ef_type)
+        units = calib.get("EF_UNITS", "C")
+        if units not in self.ef_temp_units:
+            raise ValueError(f"Unknown temperature units for channel {channel}, should be {{K|C|F}} -> got: ", units)
+        # writing index 0 first resets all EF config registers to the defaults of the new index
+        ljm.eWriteName(self.tool, f"{channel}_EF_INDEX", 0)
+        ljm.eWriteName(self.tool, f"{channel}_EF_INDEX", self.ef_indexes[ef_type])
+        names = [f"{channel}_EF_CONFIG_A"]
+        values = [self.ef_temp_units[units]]
+        for register, value in calib.get("EF_CONFIG", {}).items():
+            names.append(f"{channel}_EF_{register}")
+            values.append(value)
+        ljm.eWriteNames(self.tool, len(names), names, values)
+    
+    def __channel_calibration(self, chan):
+        # try to find the calib/sensor file inside the config
+        if chan not in self.config["ain_channels"]:
+            raise ValueError(f"Missing Transfer Function for channel: {chan}")
+        calib_name = self.config["ain_channels"][chan]["assigned_calibration"]
+        calib = self.config["calibrations"].get(calib_name, None)
+        if calib is None or ("T_FUNC" not in calib and "EF_TYPE" not in calib):
+            raise ValueError(f"Missing Transfer Function for channel: {chan}")
+        return calib
     
     def __init_transfer_functions(self):
         for chan in self.channels:
-            # try to find the calib/sensor file inside the config
-            if chan in self.config["ain_channels"]:
-                calib = self.config["ain_channels"][chan]["assigned_calibration"]
-                coefs = self.config["calibrations"][calib]["T_FUNC"]
-                self.transfer_functions[chan] = partial(self.__transfer_function, coeffs=coefs)
+            if chan in self.ef_channels:
+                # already converted on the device
+                self.transfer_functions[chan] = float
             else:
-                raise ValueError(f"Missing Transfer Function for channel: {chan}")
+                coefs = self.calibrations[chan]["T_FUNC"]
+                self.transfer_functions[chan] = partial(self.__transfer_function, coeffs=coefs)
             
     @staticmethod
     def __transfer_function(voltage, coeffs:None|list[float] = None):
@@ -80,7 +183,11 @@ class TemperatureMeas(threading.Thread):
     
     def __start_stream(self):
         addresses, _ = ljm.namesToAddresses(len(self.channels), self.channels)
-        ljm.eStreamStart(self.tool, 1, len(self.channels), addresses, self.config["SCAN_FREQ"])
+        # returns the actual scan rate the device is going to use
+        # one read per output sample -> oversampled scans come as one block
+        self.scan_rate = ljm.eStreamStart(self.tool, self.oversampling, len(self.channels), addresses, self.config["SCAN_FREQ"] * self.oversampling)
+        self.start_time = time.monotonic()
+        self.scan_index = 0
     
     def __led_init(self):
         gpio_pins = [0, 1, 2, 3]
@@ -102,33 +209,108 @@ class TemperatureMeas(threading.Thread):
         time.sleep(delay)
         ljm.eWriteName(self.tool, f"DIO{pin}", 1)
         
+    def __stream_loop(self):
+        self.__start_stream()
+        try:
+            while not self.end.is_set():
+                with metrics.stage("labjack.read"):
+                    ret = ljm.eStreamRead(self.tool)
+                data = ret[0]  # First return is the data array
+                
+                if self.oversampling == 1:
+                    with metrics.stage("labjack.convert"):
+                        temps = [self.transfer_functions[self.channels[i]](data[i]) for i in range(len(self.channels))]
+                    print(temps)
+                    self._publish(temps)
+                else:
+                    # interleaved scans -> (scans x channels), conversion vectorized per channel
+                    with metrics.stage("labjack.convert"):
+                        data = np.asarray(data).reshape(-1, len(self.channels))
+                        block = np.column_stack([self.transfer_functions[self.channels[i]](data[:, i]) for i in range(len(self.channels))])
+                    self._publish(block)
+                self.scan_index += self.oversampling
+                self.__blink_led("BLUE", 0.01)
+        finally:
+            try:
+                ljm.eStreamStop(self.tool)
+            except Exception as e:
+                print(f"Stream stop error: {e}")
+    
+    def __poll_loop(self):
+        """
+        Command-response acquisition for slow logging. All active channels are read
+        with a single eReadNames call per period, the device stays idle in between.  
+        Channels with an extended feature are read from AIN#_EF_READ_A in the same call.  
+        Deadlines are kept on a fixed grid (start_time + k * period) so the sampling does not drift,
+        if a deadline is missed (slow read, host hiccup) it is skipped instead of bursting.  
+        Arguments:  
+            None  
+        Returns:  
+            None  
+        """
+        period = self.poll_period
+        num_channels = len(self.channels)
+        self.scan_rate = 1.0 / period
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+        self.scan_index = max(0, math.ceil((time.monotonic() - self.start_time) / period))
+        self.end.wait(max(0.0, self.start_time + self.scan_index * period - time.monotonic()))
+        while not self.end.is_set():
+            with metrics.stage("labjack.read"):
+                data = ljm.eReadNames(self.tool, num_channels, self.read_names)
+            with metrics.stage("labjack.convert"):
+                temps = [self.transfer_functions[self.channels[i]](data[i]) for i in range(num_channels)]
+            self._publish(temps)
+            self.__blink_led("BLUE", 0.01)
+            now = time.monotonic()
+            self.scan_index = max(self.scan_index + 1, math.ceil((now - self.start_time) / period))
+            # end.wait -> stop() does not have to wait for the whole period
+            self.end.wait(self.start_time + self.scan_index * period - now)
+        
+    def _publish(self, temps):
+        """
+        Hands one converted scan (self.scan_index) over to the consumer. Overridden by MultiDeviceMeas workers.  
+        Arguments:  
+            - temps: list of temperatures in the order of self.channels,  
+              or (scans x channels) block starting at self.scan_index when oversampling  
+        Returns:  
+            None  
+        """
+        # one scan or an oversampled (scans x channels) block
+        metrics.count("labjack.rows", temps.shape[0] if isinstance(temps, np.ndarray) and temps.ndim == 2 else 1)
+        self._q.put(temps)
+    
+    def _publish_gap(self, gap:Gap):
+        self._q.put(gap)
+        
     def run(self):
         """
         Main loop of the thread. Gets called by .start() function 
+        Any LJM/OS read error (USB/Ethernet hiccup, device reset) closes the device, reopens it with backoff
+        and restarts the acquisition, the missing interval is put into the queue as Gap.  
         Arguments:   
             None  
         Returns:  
             None  
         """
-        self.__start_stream()
-        # prepare LED for blinking
-        self.__led_init()
-        
-        while not self.end.is_set():
-            try:
-                ret = ljm.eStreamRead(self.tool)
-                data = ret[0]  # First return is the data array
-                
-                temps = [self.transfer_functions[self.channels[i]](data[i]) for i in range(len(self.channels))]
-                print(temps)
-                self._q.put(temps)
-                self.__blink_led("BLUE", 0.01)
-
-            except Exception as read_error:
-                print(f"Read error: {read_error}")
-                break
-        ljm.eStreamStop(self.tool)
-        ljm.close(self.tool)
+        try:
+            while not self.end.is_set():
+                try:
+                    metrics.count("labjack.starts")
+                    if self.mode == "Poll":
+                        self.__poll_loop()
+                    else:
+                        self.__stream_loop()
+                except (ljm.LJMError, OSError) as read_error:
+                    # only connection errors are retried, programming errors end the thread
+                    print(f"Read error: {read_error}")
+                    metrics.count("labjack.errors")
+                    gap_start = time.time()
+                    self.__close()
+                    if reconnect(self.__open, self.end, f"LabJack {self.serial_number}"):
+                        self._publish_gap(Gap(gap_start, time.time(), f"LabJack {self.serial_number}"))
+        finally:
+            self.__close()
         
         
     def start(self):
@@ -151,7 +333,11 @@ class TemperatureMeas(threading.Thread):
             None  
         """
         self.end.set()
-        self.join()
+        if self.ident is not None:
+            self.join()
+        else:
+            # never started -> the device opened in __init__ is still open
+            self.__close()
     
 if __name__ == "__main__":
     q = queue.Queue()
@@ -0,0 +1,191 @@
+from labjack import ljm
+import threading
+import time
+import queue
+import numpy as np
+from .meas import TemperatureMeas
+from data.supervisor import Gap
+from data.metrics import metrics
+
+
+def split_channel(channel:str) -> tuple[str, str]:
+    """
+    Splits merged channel name "470012345/AIN3" into ("470012345", "AIN3").  
+    Channels without device prefix belong to "ANY" device.  
+    """
+    if "/" in channel:
+        serial, ain = channel.split("/", 1)
+        return serial, ain
+    return "ANY", channel
+
+
+class _DeviceWorker(TemperatureMeas):
+    """
+    TemperatureMeas of one device inside MultiDeviceMeas.  
+    Instead of putting plain rows it tags every scan with the device index and scan timing,  
+    so the manager can align the scans to the common timeline. Gaps are passed as they are.  
+    """
+    def __init__(self, device_idx:int, channels:list[str], config:dict, raw_q:queue.Queue, identifier:str):
+        super().__init__(channels, config, raw_q, identifier=identifier)
+        self.device_idx = device_idx
+
+    def _publish(self, temps):
+        if isinstance(temps, np.ndarray) and temps.ndim == 2:
+            # oversampled block -> merged scan by scan
+            metrics.count("labjack.rows", temps.shape[0])
+            for i, row in enumerate(temps):
+                self._q.put((self.device_idx, self.start_time, self.scan_rate, self.scan_index + i, row))
+        else:
+            metrics.count("labjack.rows", 1)
+            self._q.put((self.device_idx, self.start_time, self.scan_rate, self.scan_index, temps))
+
+
+class MultiDeviceMeas(threading.Thread):
+    """
+    Synchronized acquisition from more LabJack T7 devices.  
+    Every device is opened by its serial number and runs in its own TemperatureMeas thread (in parallel).  
+    Scans are put onto a common timeline (shared start time + scan index) and merged  
+    into one row in the order of the channels given -> same output as TemperatureMeas,  
+    so the rest of the GUI sees one big channel space.  
+    """
+    def __init__(self, channels:list[str], config:dict, temperature_q:queue.Queue, pending_window:float = 2.0) -> None:
+        """
+        Arguments:  
+            - channels: merged channel names "<serial>/AIN#" (order of the output row)  
+            - config: meas config, "ain_channels" keys are the merged channel names  
+            - temperature_q: queue for the merged rows  
+            - pending_window: seconds incomplete scans are kept behind the newest one, older ones are dropped as a Gap  
+        """
+        threading.Thread.__init__(self)
+        if len(channels) == 0:
+            raise ValueError("Got Empty List of Channels")
+        self.channels = channels
+        self._q = temperature_q
+        self._raw_q = queue.Queue()
+
+        # group channels by device, keep the device order of first appearance
+        device_channels = dict()
+        for channel in channels:
+            serial, ain = split_channel(channel)
+            device_channels.setdefault(serial, []).append(ain)
+
+        self.devices = []
+        # for every device -> positions of its channels in the merged row
+        self.row_slots = []
+        try:
+            for idx, (serial, ains) in enumerate(device_channels.items()):
+                prefix = "" if serial == "ANY" else f"{serial}/"
+                device_config = dict(config)
+                device_config["ain_channels"] = {ain: config["ain_channels"][f"{prefix}{ain}"] for ain in ains if f"{prefix}{ain}" in config["ain_channels"]}
+                self.devices.append(_DeviceWorker(idx, ains, device_config, self._raw_q, identifier=serial))
+                self.row_slots.append([channels.index(f"{prefix}{ain}") for ain in ains])
+        except Exception:
+            self.__close_devices()
+            raise
+
+        self._pending = dict() # common scan index -> list of per device rows
+        self._last_emitted = -1
+        self.pending_window = pending_window
+        self.start_time = None
+        self.start_wall_time = None
+        self.end = threading.Event()
+        self.daemon = True
+
+    def __close_devices(self):
+        for device in self.devices:
+            try:
+                ljm.close(device.tool)
+            except Exception as e:
+                print(e)
+
+    def _common_index(self, start_time, scan_rate, scan_index):
+        # streams can not be started at exactly the same moment -> shift by the start offset (in scans)
+        return scan_index + round((start_time - self.start_time) * scan_rate)
+
+    def _drop_stale(self, newest:int, scan_rate:float):
+        # device in its reconnect loop -> the scans of the others would pile up for as long as it is gone
+        window = max(1, int(self.pending_window * scan_rate))
+        if min(self._pending) >= newest - window:
+            return
+        # dropped down to half the window -> one Gap per half window, not one per scan
+        stale = [i for i in self._pending if i < newest - window // 2]
+        for idx in stale:
+            del self._pending[idx]
+        first, last = min(stale), max(stale)
+        self._last_emitted = max(self._last_emitted, last)
+        self._q.put(Gap(self.start_wall_time + first / scan_rate, self.start_wall_time + (last + 1) / scan_rate, "MultiDevice"))
+
+    def _merge(self, device_idx, common_idx, temps, scan_rate:float):
+        if common_idx <= self._last_emitted:
+            # arrived too late - this time step was already emitted without it
+            return
+        parts = self._pending.setdefault(common_idx, [None] * len(self.devices))
+        parts[device_idx] = temps
+        if any(part is None for part in parts):
+            self._drop_stale(common_idx, scan_rate)
+            return
+        # complete scan -> older incomplete ones will never complete (a device skipped them)
+        for idx in [i for i in self._pending if i <= common_idx]:
+            del self._pending[idx]
+        row = [None] * len(self.channels)
+        for slots, part in zip(self.row_slots, parts):
+            for slot, value in zip(slots, part):
+                row[slot] = value
+        self._last_emitted = common_idx
+        self._q.put(row)
+
+    def run(self):
+        """
+        Merges the scans of all devices. Gets called by .start() function  
+        Arguments:  
+            None  
+        Returns:  
+            None  
+        """
+        while not self.end.is_set():
+            try:
+                item = self._raw_q.get(timeout=0.5)
+            except queue.Empty:
+                if not any(device.is_alive() for device in self.devices):
+                    break
+                continue
+            if isinstance(item, Gap):
+                # one device missing -> the merged stream is missing too
+                self._q.put(item)
+                continue
+            device_idx, start_time, scan_rate, scan_index, temps = item
+            self._merge(device_idx, self._common_index(start_time, scan_rate, scan_index), temps, scan_rate)
+
+    def start(self):
+        """
+        Starts all device threads on a shared start time and the merging thread.  
+        Arguments:  
+            None  
+        Returns:  
+            None  
+        """
+        self.end.clear()
+        self.start_time = time.monotonic()
+        # Gaps are wall clock times
+        self.start_wall_time = time.time()
+        for device in self.devices:
+            # poll mode uses it as the shared deadline grid, stream mode overwrites it with the real stream start
+            device.start_time = self.start_time
+            device.start()
+        super(MultiDeviceMeas, self).start()
+
+    def stop(self):
+        """
+        Stops all devices and the merging thread.  
+        Arguments:  
+            None  
+        Returns:  
+            None  
+        """
+        for device in self.devices:
+            device.end.set()
+        for device in self.devices:
+            device.stop()
+        self.end.set()
+        if self.ident is not None:
+            self.join()
@@ -0,0 +1,313 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+import numpy as np
+import serial
+from functools import partial
+from .parser import parse_temperatures, StreamDecoder
+from .serial_loader import SerialLoader
+from .socket_loader import parse_socket_url
+from .supervisor import Gap, Backoff
+from .metrics import metrics
+
+
+def _parse_lines(lines, emit):
+    for line in lines:
+        try:
+            text = line.decode("utf-8").strip()
+            if text != "":
+                emit(parse_temperatures(text, ","))
+        except ValueError as e:
+            # malformed line -> skip only the line
+            print(f"Invalid line: {e}")
+
+
+class AsyncFifoSource(object):
+    """
+    Named pipe (FIFO) source for SourceRuntime.  
+    The pipe is watched by the event loop (add_reader) -> no polling timeout, data is handled as soon as it arrives.  
+    Writer disconnect reopens the pipe, disconnect longer than min_gap is reported as Gap.  
+    """
+    def __init__(self, file_path:str, min_gap:float = 1.0):
+        self.file_path = file_path
+        self.min_gap = min_gap
+        self.name = f"FIFO {file_path}"
+
+    async def run(self, emit):
+        loop = asyncio.get_running_loop()
+        backoff = Backoff()
+        gap_start = None
+        while True:
+            try:
+                fd = os.open(self.file_path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError as e:
+                print(f"{self.name} open failed: {e}")
+                if gap_start is None:
+                    gap_start = time.time()
+                await asyncio.sleep(backoff.next())
+                continue
+            backoff = Backoff()
+            readable = asyncio.Event()
+            loop.add_reader(fd, readable.set)
+            buffer = b''
+            try:
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    try:
+                        chunk = os.read(fd, 65536)
+                    except BlockingIOError:
+                        continue
+                    if chunk == b'':
+                        # Writer disconnected -> reopen, otherwise the loop keeps getting EOF
+                        if gap_start is None:
+                            gap_start = time.time()
+                        break
+                    if gap_start is not None:
+                        if time.time() - gap_start >= self.min_gap:
+                            emit(Gap(gap_start, time.time(), self.name))
+                        gap_start = None
+                    *lines, buffer = (buffer + chunk).split(b'\n')
+                    _parse_lines(lines, emit)
+            except OSError as e:
+                print(f"{self.name} error: {e}")
+                if gap_start is None:
+                    gap_start = time.time()
+            finally:
+                loop.remove_reader(fd)
+                os.close(fd)
+
+
+class AsyncSerialSource(object):
+    """
+    Serial port source for SourceRuntime (POSIX - the port file descriptor is watched by the event loop).  
+    Port is opened non-blocking (timeout=0), whatever is waiting is read in one call.  
+    Lost port is reopened with backoff and reported as Gap.  
+    """
+    def __init__(self, serial_port:str, config:dict):
+        self.serial_port = serial_port
+        self.config = config
+        self.name = f"Serial {serial_port}"
+
+    def _open(self):
+        return serial.Serial(self.serial_port,
+                             baudrate=self.config.get("baudrate", 115200),
+                             bytesize=SerialLoader.bytesizes[self.config.get("bytesize", "EIGHTBITS")],
+                             parity=SerialLoader.parities[self.config.get("parity", "NONE")],
+                             stopbits=SerialLoader.stopbits[self.config.get("stopbits", "ONE")],
+                             timeout=0)
+
+    async def run(self, emit):
+        loop = asyncio.get_running_loop()
+        backoff = Backoff()
+        gap_start = None
+        while True:
+            try:
+                port = self._open()
+            except (serial.SerialException, OSError) as e:
+                print(f"{self.name} open failed: {e}")
+                await asyncio.sleep(backoff.next())
+                continue
+            backoff = Backoff()
+            if gap_start is not None:
+                emit(Gap(gap_start, time.time(), self.name))
+                gap_start = None
+            readable = asyncio.Event()
+            loop.add_reader(port.fileno(), readable.set)
+            buffer = b''
+            try:
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    # raises SerialException when the device is gone (readable but no data)
+                    chunk = port.read(max(1, port.in_waiting))
+                    *lines, buffer = (buffer + chunk).split(b'\n')
+                    _parse_lines(lines, emit)
+            except (serial.SerialException, OSError) as e:
+                print(f"{self.name} error: {e}")
+                gap_start = time.time()
+            finally:
+                loop.remove_reader(port.fileno())
+                port.close()
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, decoder:StreamDecoder, emit):
+        self.decoder = decoder
+        self.emit = emit
+
+    def datagram_received(self, data, addr):
+        for row in self.decoder.decode_datagram(data):
+            self.emit(row)
+
+
+class AsyncSocketSource(object):
+    """
+    Network source for SourceRuntime ("tcp://host:port" or "udp://host:port", optional "?framing=binary").  
+    TCP data is received into the decoder buffer and parsed in batches, lost connection is reconnected  
+    with backoff and reported as Gap. UDP datagrams are parsed as they arrive.  
+    """
+    def __init__(self, url:str, buffer_size:int = 1 << 20):
+        self.url = url
+        self.protocol, self.host, self.port, framing = parse_socket_url(url)
+        self.decoder = StreamDecoder(framing, buffer_size)
+        self.name = f"Network {url}"
+
+    async def run(self, emit):
+        if self.protocol == "udp":
+            await self._run_udp(emit)
+        else:
+            await self._run_tcp(emit)
+
+    async def _run_udp(self, emit):
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramProtocol(self.decoder, emit),
+                                                           local_addr=(self.host, self.port))
+        try:
+            await asyncio.Future() # until the runtime cancels it
+        finally:
+            transport.close()
+
+    async def _run_tcp(self, emit):
+        loop = asyncio.get_running_loop()
+        backoff = Backoff()
+        gap_start = None
+        while True:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, (self.host, self.port))
+            except OSError as e:
+                print(f"{self.name} connect failed: {e}")
+                sock.close()
+                if gap_start is None:
+                    gap_start = time.time()
+                await asyncio.sleep(backoff.next())
+                continue
+            backoff = Backoff()
+            if gap_start is not None:
+                emit(Gap(gap_start, time.time(), self.name))
+                gap_start = None
+            self.decoder.reset()
+            try:
+                while True:
+                    received = await loop.sock_recv_into(sock, self.decoder.free())
+                    if received == 0:
+                        raise ConnectionError("Connection closed by the board")
+                    for row in self.decoder.commit(received):
+                        emit(row)
+            except OSError as e:
+                print(f"{self.name} error: {e}")
+                gap_start = time.time()
+            finally:
+                sock.close()
+
+
+class ThreadBridge(object):
+    """
+    Queue-like object for thread based sources (TemperatureMeas, MultiDeviceMeas).  
+    LJM calls are blocking, so the LabJack keeps its acquisition thread  
+    and hands every row over to the event loop through this bridge.  
+    """
+    def __init__(self):
+        self.loop = None
+        self.emit = None
+
+    def put(self, item):
+        self.loop.call_soon_threadsafe(self.emit, item)
+
+
+class AsyncThreadSource(object):
+    """
+    Runs thread based source (created with ThreadBridge as its result queue) inside SourceRuntime.  
+    """
+    def __init__(self, source, bridge:ThreadBridge, name:str = "LabJack"):
+        self.source = source
+        self.bridge = bridge
+        self.name = name
+
+    async def run(self, emit):
+        self.bridge.loop = asyncio.get_running_loop()
+        self.bridge.emit = emit
+        self.source.start()
+        try:
+            await asyncio.Future() # until the runtime cancels it
+        finally:
+            # stop joins the thread -> not on the event loop thread
+            await self.bridge.loop.run_in_executor(None, self.source.stop)
+
+    def close(self):
+        """
+        Releases the source (opened when built) if the runtime is never started.  
+        """
+        self.source.stop()
+
+
+class SampleMerger(object):
+    """
+    Merges rows of more sources into one sample stream.  
+    Merged row = latest row of every source concatenated in the source order (sample and hold),  
+    a new merged row is emitted whenever any source delivers (once every source delivered at least once).  
+    """
+    def __init__(self, num_sources:int, result_q):
+        self.latest = [None] * num_sources
+        self.result_q = result_q
+
+    def push(self, source_idx, item):
+        metrics.count(f"merge.source{source_idx}")
+        if isinstance(item, Gap):
+            self.result_q.put(item)
+            return
+        rows = np.asarray(item, dtype=np.float64)
+        # oversampled blocks -> only the newest row matters for sample and hold
+        self.latest[source_idx] = rows[-1] if rows.ndim == 2 else rows
+        if any(row is None for row in self.latest):
+            return
+        self.result_q.put(np.concatenate(self.latest))
+
+
+class SourceRuntime(threading.Thread):
+    """
+    Single asyncio event loop running any number of sources (FIFO, serial, LabJack, ...).  
+    Their rows are merged into one sample stream in result_q.  
+    Interface is the same as the loaders (.start(), .stop()), stopping is immediate - no polling timeouts.  
+    """
+    def __init__(self, sources:list, result_q):
+        threading.Thread.__init__(self)
+        if len(sources) == 0:
+            raise ValueError("Got Empty List of Sources")
+        self.sources = sources
+        self.merger = SampleMerger(len(sources), result_q)
+        self.loop = None
+        self._stop_event = None
+        self._ready = threading.Event()
+        self.daemon = True
+
+    def run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._ready.set()
+        tasks = [asyncio.create_task(self._run_source(i, source)) for i, source in enumerate(self.sources)]
+        await self._stop_event.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_source(self, idx, source):
+        try:
+            await source.run(partial(self.merger.push, idx))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # one broken source must not take the others down
+            print(f"{getattr(source, 'name', idx)} failed: {e}")
+
+    def stop(self):
+        self._ready.wait()
+        self.loop.call_soon_threadsafe(self._stop_event.set)
+        self.join()
@@ -0,0 +1,123 @@
+import numpy as np
+from .supervisor import Gap
+
+
+class Decimator(object):
+    """
+    Anti-alias filter + decimation of (samples x channels) blocks.  
+    Every channel can use its own method, the decimation factor is shared (rows stay aligned):  
+        - "Mean": block averaging of every `factor` samples  
+        - "Median": median of every `factor` samples (robust against spikes)  
+        - "IIR": Butterworth low pass (scipy.signal.lfilter, state kept across blocks), every `factor`-th sample  
+    Blocks of any length can be passed in, incomplete windows are carried over to the next call.  
+    """
+    methods = ("Mean", "Median", "IIR")
+
+    def __init__(self, num_channels:int, factor:int, method:str = "Mean", channel_methods:dict|None = None, iir_order:int = 4):
+        """
+        Arguments:  
+            - num_channels: number of columns of the blocks  
+            - factor: decimation factor (output rate = input rate / factor)  
+            - method: default method for all channels  
+            - channel_methods: {column index: method} overrides  
+            - iir_order: order of the Butterworth filter  
+        """
+        if factor < 1:
+            raise ValueError("Decimation factor has to be >= 1 -> got: ", factor)
+        self.num_channels = num_channels
+        self.factor = int(factor)
+        channel_methods = channel_methods or dict()
+        per_channel = [channel_methods.get(i, method) for i in range(num_channels)]
+        self.groups = dict()
+        for i, m in enumerate(per_channel):
+            if m not in self.methods:
+                raise ValueError(f"Invalid filter method, should be one of {self.methods} -> got: ", m)
+            # no decimation -> nothing to anti-alias, plain pass through
+            self.groups.setdefault(m if self.factor > 1 else "Mean", []).append(i)
+        self.groups = {m: np.array(cols) for m, cols in self.groups.items()}
+
+        if "IIR" in self.groups:
+            from scipy import signal
+            self._lfilter = signal.lfilter
+            # cutoff a bit below the new Nyquist frequency (normalized to the input Nyquist)
+            cutoff = 0.8 / self.factor
+            self.b, self.a = signal.butter(iir_order, cutoff)
+            self.zi_unit = signal.lfilter_zi(self.b, self.a)
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets the filter state (after a gap the old state does not belong to the new data).  
+        """
+        # samples of the incomplete window (its length is the phase of the decimation)
+        self.carry = np.empty((0, self.num_channels))
+        self.zi = None
+
+    def process(self, block) -> np.ndarray:
+        """
+        Filters and decimates one block.  
+        Arguments:  
+            - block: (samples x channels) array, or one row  
+        Returns:  
+            - (samples // factor x channels) array (can be empty)  
+        """
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim == 1:
+            block = block.reshape(1, -1)
+        phase = self.carry.shape[0]
+        n_out = (phase + block.shape[0]) // self.factor
+        out = np.empty((n_out, self.num_channels))
+        for method, cols in self.groups.items():
+            if method == "IIR":
+                if self.zi is None:
+                    # start in steady state of the first sample -> no step response at the beginning
+                    self.zi = self.zi_unit[:, None] * block[0, cols][None, :]
+                filtered, self.zi = self._lfilter(self.b, self.a, block[:, cols], axis=0, zi=self.zi)
+                # output sample = last sample of every window
+                out[:, cols] = filtered[self.factor - 1 - phase::self.factor][:n_out]
+            else:
+                windows = np.concatenate((self.carry[:, cols], block[:, cols]))[:n_out * self.factor]
+                windows = windows.reshape(n_out, self.factor, len(cols))
+                if method == "Mean":
+                    out[:, cols] = windows.mean(axis=1)
+                else:
+                    out[:, cols] = np.median(windows, axis=1)
+        self.carry = np.concatenate((self.carry, block))[n_out * self.factor:]
+        return out
+
+
+class DecimatingSink(object):
+    """
+    Filter/decimate stage right after the acquisition.  
+    Looks like a queue to the sources (.put), the sources put rows or whole blocks,  
+    only the decimated rows (and Gaps) get into the result queue -> everything downstream sees the reduced rate.  
+    """
+    def __init__(self, result_q, decimator:Decimator):
+        self.result_q = result_q
+        self.decimator = decimator
+
+    def put(self, item):
+        if isinstance(item, Gap):
+            self.decimator.reset()
+            self.result_q.put(item)
+            return
+        for row in self.decimator.process(item):
+            self.result_q.put(row)
+
+
+def sink_from_config(result_q, channels:list[str], meas_config:dict):
+    """
+    Puts the filter stage in front of result_q if meas_config["FILTER"] asks for it.  
+    FILTER: {"METHOD": "None"|"Mean"|"Median"|"IIR", "FACTOR": int, "CHANNELS": {channel name: method}}  
+    Only the Stream acquisition oversamples, Poll rows go directly to result_q.  
+    Returns:  
+        - object with .put() for the source  
+    """
+    filter_config = meas_config.get("FILTER", {})
+    method = filter_config.get("METHOD", "None")
+    if method == "None" or meas_config.get("ACQ_MODE", "Stream") != "Stream":
+        return result_q
+    overrides = filter_config.get("CHANNELS", {})
+    channel_methods = {i: overrides[channel] for i, channel in enumerate(channels) if channel in overrides}
+    decimator = Decimator(len(channels), filter_config.get("FACTOR", 1), method, channel_methods)
+    return DecimatingSink(result_q, decimator)
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class _NullSpan(object):
+    """
+    Returned by Metrics.stage() while disabled -> the hooks cost one attribute check.  
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+    __slots__ = ("metrics", "histogram", "start")
+
+    def __init__(self, metrics, histogram):
+        self.metrics = metrics
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.histogram.record(self.start, end)
+        if self.metrics.tracing:
+            self.metrics._trace(self.histogram.name, self.start, end)
+        return False
+
+
+class RollingHistogram(object):
+    """
+    Last `size` durations of one stage (ring buffer) + total count.  
+    Percentiles and rate are computed over the ring -> they follow the recent behaviour.  
+    """
+    def __init__(self, name:str, size:int = 2048):
+        self.name = name
+        self.size = size
+        self.durations = np.zeros(size)
+        self.ends = np.zeros(size)
+        self.index = 0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, start:float, end:float):
+        with self.lock:
+            self.durations[self.index] = end - start
+            self.ends[self.index] = end
+            self.index = (self.index + 1) % self.size
+            self.count += 1
+
+    def summary(self) -> dict:
+        with self.lock:
+            n = min(self.count, self.size)
+            durations = self.durations[:n].copy()
+            ends = self.ends[:n].copy()
+            count = self.count
+        if n == 0:
+            return {"count": 0}
+        durations *= 1e3
+        p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+        span = ends.max() - ends.min()
+        return {
+            "count": count,
+            "rate_per_s": float((n - 1) / span) if span > 0 else 0.0,
+            "mean_ms": float(durations.mean()),
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+            "max_ms": float(durations.max()),
+        }
+
+
+class Metrics(object):
+    """
+    Per-stage timing hooks, counters and gauges of the pipeline.  
+    Usage in a stage:  
+        with metrics.stage("plotter3d.interpolate"):  
+            ...  
+        metrics.count("fifo.rows", len(rows))  
+    Disabled by default (VIZCALOR_METRICS=1 or the diagnostics panel enables it), while disabled  
+    every hook returns immediately. Trace recording (Chrome trace export) is a separate switch.  
+    """
+    def __init__(self, enabled:bool = False, histogram_size:int = 2048, max_trace_events:int = 200000):
+        self.enabled = enabled
+        self.tracing = False
+        self.histogram_size = histogram_size
+        self.histograms = dict()
+        self.counters = dict()
+        self.gauges = dict()
+        self.trace_events = deque(maxlen=max_trace_events)
+        self.thread_names = dict()
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def stage(self, name:str):
+        """
+        Context manager timing one pass through the stage `name`.  
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, RollingHistogram(name, self.histogram_size))
+        return _Span(self, histogram)
+
+    def count(self, name:str, n:int = 1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name:str, value:float):
+        if not self.enabled:
+            return
+        self.gauges[name] = value
+
+    def _trace(self, name:str, start:float, end:float):
+        thread = threading.current_thread()
+        self.thread_names.setdefault(thread.ident, thread.name)
+        self.trace_events.append((name, thread.ident, start, end))
+
+    def set_enabled(self, enabled:bool):
+        self.enabled = enabled
+
+    def set_tracing(self, tracing:bool):
+        self.tracing = tracing
+
+    def reset(self):
+        with self.lock:
+            self.histograms = dict()
+            self.counters = dict()
+            self.gauges = dict()
+            self.trace_events.clear()
+            self.origin = time.perf_counter()
+
+    def snapshot(self) -> dict:
+        """
+        Returns:  
+            - {"stages": {name: summary}, "counters": {...}, "gauges": {...}}  
+        """
+        with self.lock:
+            histograms = list(self.histograms.values())
+            counters = dict(self.counters)
+        return {
+            "stages": {h.name: h.summary() for h in sorted(histograms, key=lambda h: h.name)},
+            "counters": counters,
+            "gauges": dict(self.gauges),
+        }
+
+    def export_json(self, file_path:str):
+        data = self.snapshot()
+        data["time"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with open(file_path, "w") as f:
+            json.dump(data, f, indent=4)
+
+    def export_chrome_trace(self, file_path:str):
+        """
+        Writes recorded spans in the Chrome trace event format (chrome://tracing, Perfetto).  
+        """
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.thread_names.items()]
+        for name, tid, start, end in list(self.trace_events):
+            events.append({
+                "name": name,
+                "cat": name.split(".")[0],
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": tid,
+            })
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# shared by all stages of the pipeline
+metrics = Metrics(enabled=os.environ.get("VIZCALOR_METRICS", "0") == "1")
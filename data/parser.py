@@ -1,7 +1,146 @@
+import struct
+import numpy as np
+
 def parse_temperatures(input:str|list[str], separator=','):
     if type(input) == str:
         temps = input.strip().split(sep=separator)
     else:
         temps = input
     return list(map(lambda x: float(x), temps))
-    
\ No newline at end of file
+
+# Binary framing: b"VC" + uint16 number of channels + float32 temperatures (all little endian)
+FRAME_MAGIC = b"VC"
+FRAME_HEADER = struct.Struct("<2sH")
+
+def pack_frame(temps) -> bytes:
+    temps = np.asarray(temps, dtype="<f4")
+    return FRAME_HEADER.pack(FRAME_MAGIC, len(temps)) + temps.tobytes()
+
+def parse_csv_block(data, separator=b','):
+    """
+    Parses all complete lines in data at once.  
+    Arguments:  
+        - data: bytes-like with "\n" terminated lines (last incomplete line is left)  
+    Returns:  
+        - rows: list of numpy rows (malformed lines are skipped)  
+        - consumed: number of bytes used  
+    """
+    data = bytes(data)
+    end = data.rfind(b'\n')
+    if end == -1:
+        return [], 0
+    lines = [line.strip() for line in data[:end].split(b'\n')]
+    lines = [line for line in lines if line]
+    if not lines:
+        return [], end + 1
+    counts = {line.count(separator) for line in lines}
+    if len(counts) == 1:
+        # fast path -> all lines same width, one conversion for the whole batch
+        try:
+            values = np.array(separator.join(lines).split(separator), dtype=np.float64)
+            return list(values.reshape(len(lines), -1)), end + 1
+        except ValueError:
+            pass
+    rows = []
+    for line in lines:
+        try:
+            rows.append(np.array(line.split(separator), dtype=np.float64))
+        except ValueError as e:
+            print(f"Invalid line: {e}")
+    return rows, end + 1
+
+def parse_binary_frames(data):
+    """
+    Parses all complete binary frames in data at once (vectorized for runs of frames with same channel count).  
+    Arguments:  
+        - data: bytes-like starting at a frame boundary  
+    Returns:  
+        - rows: list of numpy rows  
+        - consumed: number of bytes used (garbage before a valid header is skipped)  
+    """
+    data = memoryview(data).cast("B")
+    rows = []
+    pos = 0
+    size = len(data)
+    while size - pos >= FRAME_HEADER.size:
+        magic, count = FRAME_HEADER.unpack_from(data, pos)
+        if magic != FRAME_MAGIC or count == 0:
+            # lost sync -> find next magic
+            next_pos = bytes(data[pos + 1:]).find(FRAME_MAGIC)
+            if next_pos == -1:
+                return rows, size - 1
+            pos += 1 + next_pos
+            continue
+        frame_size = FRAME_HEADER.size + 4 * count
+        num_frames = (size - pos) // frame_size
+        if num_frames == 0:
+            break
+        frames = np.frombuffer(data, dtype=np.uint8, count=num_frames * frame_size, offset=pos).reshape(num_frames, frame_size)
+        # all frames of the run have to carry the same header
+        header = frames[0, :FRAME_HEADER.size]
+        valid = np.all(frames[:, :FRAME_HEADER.size] == header, axis=1)
+        run = num_frames if valid.all() else int(np.argmin(valid))
+        values = np.ascontiguousarray(frames[:run, FRAME_HEADER.size:]).view("<f4").astype(np.float64)
+        rows.extend(values)
+        pos += run * frame_size
+        if run < num_frames:
+            continue
+        break
+    return rows, pos
+
+
+class StreamDecoder(object):
+    """
+    Preallocated receive buffer + batch parsing for byte streams (TCP) and datagrams (UDP).  
+    Data is received directly into the buffer (recv_into(decoder.free())), then decoder.commit(n)  
+    parses everything complete in one go and keeps the incomplete rest for the next receive.  
+    """
+    framings = ("csv", "binary")
+
+    def __init__(self, framing:str = "csv", buffer_size:int = 1 << 20):
+        if framing not in self.framings:
+            raise ValueError(f"Invalid framing, should be one of {self.framings} -> got: ", framing)
+        self.framing = framing
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+
+    def _parse(self, data):
+        if self.framing == "csv":
+            return parse_csv_block(data)
+        return parse_binary_frames(data)
+
+    def free(self):
+        """
+        Writable part of the buffer for recv_into.  
+        """
+        if self.filled == len(self.buffer):
+            # no complete line/frame in the whole buffer -> garbage, drop it
+            print("Receive buffer overflow, dropping data")
+            self.filled = 0
+        return self.view[self.filled:]
+
+    def commit(self, num_bytes:int):
+        """
+        Marks num_bytes received into free() and parses the complete lines/frames.  
+        Returns:  
+            - list of numpy rows  
+        """
+        self.filled += num_bytes
+        rows, consumed = self._parse(self.view[:self.filled])
+        if consumed:
+            rest = self.filled - consumed
+            self.buffer[:rest] = self.buffer[consumed:self.filled]
+            self.filled = rest
+        return rows
+
+    def decode_datagram(self, data):
+        """
+        Datagram is self-contained -> parsed without the stream buffer.  
+        """
+        if self.framing == "csv" and not bytes(data[-1:]) == b'\n':
+            data = bytes(data) + b'\n'
+        return self._parse(data)[0]
+
+    def reset(self):
+        self.filled = 0
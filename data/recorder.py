@@ -0,0 +1,59 @@
+import csv
+import time
+from .supervisor import Gap
+
+
+class Recorder(object):
+    """
+    Records the sample stream into CSV file (meant for the Recorded File Playback source).  
+    First column is the wall clock time of the row, then one column per sensor.  
+    Gaps are written as explicit intervals: "#GAP,<start>,<end>,<source>".  
+    """
+    def __init__(self, file_path:str, labels:list[str], flush_interval:float = 1.0):
+        """
+        Arguments:  
+            - file_path: output CSV file (overwritten)  
+            - labels: sensor names -> header  
+            - flush_interval: how often (s) the data is flushed to disk, so a crash loses at most this much  
+        """
+        self.file_path = file_path
+        self.file = open(file_path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["time"] + list(labels))
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.rows = 0
+        self.gaps = 0
+
+    def write_row(self, temps, timestamp:float|None = None):
+        if timestamp is None:
+            timestamp = time.time()
+        self.writer.writerow([f"{timestamp:.6f}"] + [f"{t:.6g}" for t in temps])
+        self.rows += 1
+        self._maybe_flush()
+
+    def write_gap(self, gap:Gap):
+        self.writer.writerow(["#GAP", f"{gap.start:.6f}", f"{gap.end:.6f}", gap.source])
+        self.gaps += 1
+        # gaps are rare and important -> always on disk
+        self.file.flush()
+
+    def write(self, item):
+        """
+        Writes one item of the sample stream (row or Gap).  
+        """
+        if isinstance(item, Gap):
+            self.write_gap(item)
+        else:
+            self.write_row(item)
+
+    def _maybe_flush(self):
+        now = time.monotonic()
+        if now - self.last_flush >= self.flush_interval:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            self.file.close()
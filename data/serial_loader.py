@@ -1,7 +1,10 @@
 import serial
 import threading
 import queue
+import time
 from .parser import parse_temperatures
+from .supervisor import Gap, reconnect
+from .metrics import metrics
 
 class SerialLoader(threading.Thread):
     bytesizes = {
@@ -47,23 +50,42 @@ class SerialLoader(threading.Thread):
         
         #self.port.open()
         print("start")
-        try:
-            while not self.end.is_set():
-                #print("try to read line")
-                line = self.port.readline()
-                if not line or len(line) < 1:
-                    #print("timeout")
-                    continue
-                text = line.decode("utf-8").strip()
-                temps = parse_temperatures(text, ",")
-                print("Received: ", temps)
-                self.result_q.put(temps)
-                
-        except Exception as e:
-            print(e)
-        finally:
-            self.port.close()
+        name = f"Serial {self.port.port}"
+        while not self.end.is_set():
+            try:
+                self.__read_lines()
+            except Exception as e:
+                # port vanished (USB unplug/re-enumeration) -> reopen it and account for the gap
+                print(e)
+                metrics.count("serial.errors")
+                gap_start = time.time()
+                self.port.close()
+                if reconnect(self.port.open, self.end, name):
+                    self.result_q.put(Gap(gap_start, time.time(), name))
+        self.port.close()
         print("end")
+    
+    def __read_lines(self):
+        while not self.end.is_set():
+            #print("try to read line")
+            line = self.port.readline()
+            if not line or len(line) < 1:
+                #print("timeout")
+                continue
+            try:
+                with metrics.stage("serial.parse"):
+                    text = line.decode("utf-8").strip()
+                    if text == "":
+                        continue
+                    temps = parse_temperatures(text, ",")
+            except ValueError as e:
+                # malformed line (noise, partial line after reconnect) -> skip only the line
+                print(f"Invalid line: {e}")
+                metrics.count("serial.malformed")
+                continue
+            metrics.count("serial.lines")
+            print("Received: ", temps)
+            self.result_q.put(temps)
             
         
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import socket
+import threading
+import queue
+import time
+from urllib.parse import urlparse, parse_qs
+from .parser import StreamDecoder
+from .supervisor import Gap, reconnect
+from .metrics import metrics
+
+
+def parse_socket_url(url:str):
+    """
+    "tcp://host:port" -> connect to the board and read the stream  
+    "udp://host:port" -> bind and receive datagrams (host can be empty/0.0.0.0)  
+    optional "?framing=binary" (default csv)  
+    Returns:  
+        - (protocol, host, port, framing)  
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("tcp", "udp"):
+        raise ValueError("Invalid network source, should be {tcp|udp}://host:port -> got: ", url)
+    if parsed.port is None:
+        raise ValueError("Missing port in network source -> got: ", url)
+    framing = parse_qs(parsed.query).get("framing", ["csv"])[0]
+    return parsed.scheme, parsed.hostname or "0.0.0.0", parsed.port, framing
+
+
+class SocketLoader(threading.Thread):
+    """
+    Network data source (remote embedded boards over LAN).  
+    Same CSV lines / binary frames as the other loaders, received in bulk into a preallocated buffer
+    (recv_into) and parsed in batches. Lost TCP connection is reconnected with backoff and reported as Gap.  
+    """
+    def __init__(self, url:str, result_q:queue.Queue, buffer_size:int = 1 << 20):
+        threading.Thread.__init__(self)
+        self.url = url
+        self.protocol, self.host, self.port, framing = parse_socket_url(url)
+        self.decoder = StreamDecoder(framing, buffer_size)
+        self.result_q = result_q
+        self.sock = None
+        self.end = threading.Event()
+        self.daemon = True
+
+    def __open(self):
+        if self.protocol == "tcp":
+            self.sock = socket.create_connection((self.host, self.port), timeout=0.5)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind((self.host, self.port))
+            # bigger kernel buffer -> bursts are not dropped while parsing
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, len(self.decoder.buffer))
+        # timeout -> end event is checked at least every 0.5 s
+        self.sock.settimeout(0.5)
+        self.decoder.reset()
+
+    def __close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def __receive(self):
+        while not self.end.is_set():
+            try:
+                if self.protocol == "tcp":
+                    received = self.sock.recv_into(self.decoder.free())
+                    if received == 0:
+                        raise ConnectionError("Connection closed by the board")
+                    with metrics.stage("socket.parse"):
+                        rows = self.decoder.commit(received)
+                else:
+                    received = self.sock.recv_into(self.decoder.free())
+                    with metrics.stage("socket.parse"):
+                        rows = self.decoder.decode_datagram(self.decoder.free()[:received])
+            except socket.timeout:
+                continue
+            metrics.count("socket.bytes", received)
+            metrics.count("socket.rows", len(rows))
+            for row in rows:
+                self.result_q.put(row)
+
+    def run(self):
+        print("start receive")
+        name = f"Network {self.url}"
+        while not self.end.is_set():
+            try:
+                if self.sock is None:
+                    self.__open()
+                self.__receive()
+            except OSError as e:
+                print(f"{name} error: {e}")
+                metrics.count("socket.errors")
+                gap_start = time.time()
+                self.__close()
+                if reconnect(self.__open, self.end, name):
+                    self.result_q.put(Gap(gap_start, time.time(), name))
+        self.__close()
+        print("End ")
+
+    def start(self):
+        self.end.clear()
+        super(SocketLoader, self).start()
+
+    def stop(self):
+        # this should take at most 0.5 sec (timeout)
+        self.end.set()
+        self.join()
+
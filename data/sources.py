@@ -0,0 +1,146 @@
+"""
+Builds the configured data source from the project (no GUI imports -> used by main.py and headless.py).  
+Invalid setup raises ValueError with the message for the user.  
+"""
+from .stream_loader import StreamLoader
+from .socket_loader import SocketLoader
+from .decimator import sink_from_config
+# pyserial (serial loaders, async_sources) and LJM are imported when such source is built
+
+
+def active_channels(meas_config:dict) -> list[str]:
+    """
+    Returns:  
+        - enabled channel names in the order of the acquisition (= column order of the rows)  
+    """
+    return [name for name, channel in meas_config.get("ain_channels", {}).items() if channel.get("enabled", False)]
+
+
+def channel_labels(meas_config:dict) -> list[str]:
+    """
+    Returns:  
+        - assigned sensor names of the enabled channels (channel name if none is assigned)  
+    """
+    channels = meas_config.get("ain_channels", {})
+    return [channels[name].get("assigned_sensor") or name for name in active_channels(meas_config)]
+
+
+def validate_meas_config(meas_config:dict) -> list[str]:
+    """
+    Same checks as the Device Config overlay, on the saved configuration.  
+    Returns:  
+        - list of errors (empty when valid)  
+    """
+    errors = []
+    selected_sensors = set()
+    calibrations = meas_config.get("calibrations", {})
+    for name, channel in meas_config.get("ain_channels", {}).items():
+        if not channel.get("enabled", False):
+            continue
+        sensor = channel.get("assigned_sensor", None)
+        if sensor is None:
+            errors.append(f"{name} - no sensor assigned")
+        elif sensor in selected_sensors:
+            errors.append(f"{name} - uses already assigned sensor")
+        else:
+            selected_sensors.add(sensor)
+        calib_name = channel.get("assigned_calibration", None)
+        if calib_name is None or calib_name not in calibrations:
+            errors.append(f"{name} - no calibration/type assigned")
+        elif "EF_TYPE" in calibrations[calib_name] and meas_config.get("ACQ_MODE", "Stream") != "Poll":
+            errors.append(f"{name} - on-device (EF) conversion needs the Poll acquisition mode")
+    if len(active_channels(meas_config)) == 0:
+        errors.append("No channel enabled")
+    return errors
+
+
+def make_device_source(meas_config:dict, channels:list[str], result_q):
+    """
+    LabJack reader (one or more devices) putting into result_q.  
+    LJM is imported here -> projects without LabJack source do not need it installed.  
+    """
+    from daq.meas import TemperatureMeas
+    from daq.multi_meas import MultiDeviceMeas
+    devices = meas_config.get("DEVICES", ["ANY"])
+    # oversampled blocks are filtered/decimated right after acquisition
+    sink = sink_from_config(result_q, channels, meas_config)
+    if len(devices) > 1:
+        return MultiDeviceMeas(channels, meas_config, sink)
+    return TemperatureMeas(channels, meas_config, sink, identifier=devices[0])
+
+
+def make_source(source:dict, project:dict, result_q, channels:list[str]|None = None):
+    """
+    Thread based loader of one source ({"type": ..., "value": ...}).  
+    Arguments:  
+        - channels: enabled LabJack channels (default from project["meas_config"])  
+    """
+    if source["type"] == "Device":
+        meas_config = project.get("meas_config", {})
+        return make_device_source(meas_config, channels or active_channels(meas_config), result_q)
+    elif source["type"] == "Serial":
+        if project.get("serial_config", None) is None:
+            raise ValueError("Serial Port Not Configured")
+        from .serial_loader import SerialLoader
+        return SerialLoader(source["value"], project["serial_config"], result_q)
+    elif source["type"] == "Stream":
+        return StreamLoader(source["value"], result_q)
+    elif source["type"] == "Network":
+        return SocketLoader(source["value"], result_q)
+    raise ValueError(f"Data source - {source['type']}: Not yet implemented")
+
+
+def make_async_source(source:dict, project:dict, channels:list[str]|None = None):
+    """
+    Source for the shared event loop (merged sources).  
+    """
+    from .async_sources import AsyncFifoSource, AsyncSerialSource, AsyncSocketSource, AsyncThreadSource, ThreadBridge
+    if source["type"] == "Device":
+        bridge = ThreadBridge()
+        return AsyncThreadSource(make_source(source, project, bridge, channels), bridge)
+    elif source["type"] == "Serial":
+        if project.get("serial_config", None) is None:
+            raise ValueError("Serial Port Not Configured")
+        return AsyncSerialSource(source["value"], project["serial_config"])
+    elif source["type"] == "Stream":
+        return AsyncFifoSource(source["value"])
+    elif source["type"] == "Network":
+        return AsyncSocketSource(source["value"])
+    raise ValueError(f"Data source - {source['type']}: Can not be merged")
+
+
+def build_data_source(sources:list[dict], project:dict, result_q, channels:list[str]|None = None):
+    """
+    One loader for a single source, SourceRuntime merging the rows when there are more.  
+    Returns:  
+        - object with .start() / .stop()  
+    """
+    if len(sources) == 0 or sources[0]["type"] is None:
+        raise ValueError("No Data Source Selected")
+    if len(sources) > 1:
+        # all sources share one event loop, their rows are merged into one sample stream
+        from .async_sources import AsyncThreadSource, SourceRuntime
+        built = []
+        try:
+            for source in sources:
+                built.append(make_async_source(source, project, channels))
+        except Exception:
+            # devices are opened when built -> released again when a later source fails
+            for source in built:
+                if isinstance(source, AsyncThreadSource):
+                    source.close()
+            raise
+        return SourceRuntime(built, result_q)
+    return make_source(sources[0], project, result_q, channels)
+
+
+def project_sources(project:dict) -> list[dict]:
+    """
+    Sources selected in the saved project (merged list or the active one).  
+    """
+    data_source = project.get("data_source", {})
+    merged = data_source.get("Merged", None)
+    if merged:
+        return list(merged)
+    active = data_source.get("Active", None)
+    return [active] if active is not None else []
@@ -2,39 +2,87 @@ import os
 import threading
 import queue
 from .parser import parse_temperatures
+from .supervisor import Gap, reconnect
+from .metrics import metrics
 import select
 import time
 
 class StreamLoader(threading.Thread):
-    def __init__(self, stream_file_path:str,  result_q:queue.Queue):
+    def __init__(self, stream_file_path:str,  result_q:queue.Queue, min_gap:float = 1.0):
+        """
+        Arguments:  
+            - stream_file_path: path to the FIFO  
+            - result_q: queue for parsed rows (and Gap markers)  
+            - min_gap: writer that reconnects within this time (s) is not reported as Gap (e.g. echo per line)  
+        """
         threading.Thread.__init__(self)
         self.file_path = stream_file_path
         self.result_q = result_q
+        self.min_gap = min_gap
         self.end = threading.Event()
         self.daemon = True
+        self.fd = None
+    
+    def __open(self):
+        self.fd = os.open(self.file_path, os.O_RDONLY | os.O_NONBLOCK)
+    
+    def __close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+    
+    def __put_lines(self, lines):
+        metrics.count("fifo.lines", len(lines))
+        for line in lines:
+            try:
+                text = line.decode("utf-8").strip()
+                if text != "":
+                    self.result_q.put(parse_temperatures(text, ","))
+            except ValueError as e:
+                print(f"Invalid line: {e}")
+                metrics.count("fifo.malformed")
     
     def run(self):
         print("start receive")
-        try:
-            fd = os.open(self.file_path, os.O_RDONLY | os.O_NONBLOCK)
-            with os.fdopen(fd, 'r') as fifo:
-                buffer = ''
-                while not self.end.is_set():
-                    rlist, _, _ = select.select([fifo], [], [], 0.5)
-                    if rlist:
-                        chunk = fifo.read(1)
-                        if chunk == '':
-                            # Writer disconnected
-                            continue
-                        if chunk == '\n':
-                            if buffer != "":
-                                #print("Received:", buffer)
-                                self.result_q.put(parse_temperatures(buffer, ","))
-                            buffer = ''
-                        else:
-                            buffer += chunk
-        except Exception as e:
-            print(f"FIFO error: {e}")
+        name = f"FIFO {self.file_path}"
+        gap_start = None
+        buffer = b''
+        while not self.end.is_set():
+            try:
+                if self.fd is None:
+                    self.__open()
+                rlist, _, _ = select.select([self.fd], [], [], 0.5)
+                if not rlist:
+                    continue
+                chunk = os.read(self.fd, 4096)
+                if chunk == b'':
+                    # Writer disconnected -> reopen, otherwise select keeps reporting EOF (busy loop)
+                    self.__close()
+                    self.__open()
+                    buffer = b''
+                    if gap_start is None:
+                        gap_start = time.time()
+                    continue
+                if gap_start is not None:
+                    if time.time() - gap_start >= self.min_gap:
+                        self.result_q.put(Gap(gap_start, time.time(), name))
+                    gap_start = None
+                with metrics.stage("fifo.parse"):
+                    *lines, buffer = (buffer + chunk).split(b'\n')
+                    self.__put_lines(lines)
+            except Exception as e:
+                # FIFO removed/recreated or unreadable -> reopen with backoff
+                print(f"FIFO error: {e}")
+                metrics.count("fifo.errors")
+                if gap_start is None:
+                    gap_start = time.time()
+                buffer = b''
+                try:
+                    self.__close()
+                except OSError:
+                    self.fd = None
+                reconnect(self.__open, self.end, name)
+        self.__close()
         print("End ")
         
     def start(self):
@@ -1,5 +1,323 @@
-fifo_path = "stream_test"
+"""
+Synthetic data generator for load testing of the data sources.  
+Writes configurable temperature rows (waveform + noise + faults) to a FIFO, a pseudo-terminal  
+(stands in for a serial port) or a socket and reports the achieved rate.  
 
-with open(fifo_path, 'w') as fifo:
-    fifo.write("23.5, 24.1, 25.0\n")
-    fifo.write("22.0, 23.0, 24.0\n")
+Examples:  
+    python -m data.stream_writer fifo stream_test --channels 16 --rate 1000 --duration 10  
+    python -m data.stream_writer pty --rate 500 --malformed 0.01  
+    python -m data.stream_writer tcp://127.0.0.1:5000 --rate 0 --framing binary  
+"""
+import argparse
+import os
+import socket
+import stat
+import time
+import tty
+import numpy as np
+from urllib.parse import urlparse
+from .parser import pack_frame
+
+
+class SignalGenerator(object):
+    """
+    Temperature rows for num_channels channels sampled at rate.  
+    Every channel gets its own phase/offset so the channels are distinguishable.  
+    """
+    waveforms = ("sine", "square", "ramp", "constant")
+
+    def __init__(self, num_channels:int, rate:float, waveform:str = "sine", offset:float = 25.0,
+                 amplitude:float = 5.0, period:float = 10.0, noise:float = 0.05, seed:int = 0):
+        if waveform not in self.waveforms:
+            raise ValueError(f"Invalid waveform, should be one of {self.waveforms} -> got: ", waveform)
+        self.num_channels = num_channels
+        self.rate = rate
+        self.waveform = waveform
+        self.offset = offset + 0.5 * np.arange(num_channels)
+        self.amplitude = amplitude
+        self.period = period
+        self.noise = noise
+        self.phase = np.linspace(0, 1, num_channels, endpoint=False)
+        self.rng = np.random.default_rng(seed)
+
+    def rows(self, first_index:int, count:int) -> np.ndarray:
+        """
+        Returns:  
+            - (count x num_channels) array of samples first_index ... first_index + count - 1  
+        """
+        # unlimited rate -> waveform time base of 1 kHz
+        t = (first_index + np.arange(count))[:, None] / (self.rate if self.rate > 0 else 1000.0)
+        cycle = (t / self.period + self.phase[None, :]) % 1.0
+        if self.waveform == "sine":
+            shape = np.sin(2 * np.pi * cycle)
+        elif self.waveform == "square":
+            shape = np.where(cycle < 0.5, 1.0, -1.0)
+        elif self.waveform == "ramp":
+            shape = 2 * cycle - 1
+        else:
+            shape = np.zeros_like(cycle)
+        values = self.offset[None, :] + self.amplitude * shape
+        if self.noise > 0:
+            values += self.rng.normal(0, self.noise, values.shape)
+        return values
+
+
+class FaultInjector(object):
+    """
+    Fault patterns of real boards:  
+        - malformed: probability that a row is replaced by a garbage line  
+        - gap_every/gap_duration: output pauses (seconds), rows of the pause are not sent  
+        - burst_every/burst_size: extra rows sent at once (board flushing its buffer)  
+    """
+    def __init__(self, malformed:float = 0.0, gap_every:float = 0.0, gap_duration:float = 0.0,
+                 burst_every:float = 0.0, burst_size:int = 0, seed:int = 0):
+        self.malformed = malformed
+        self.gap_every = gap_every
+        self.gap_duration = gap_duration
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.rng = np.random.default_rng(seed + 1)
+        self.next_gap = gap_every if gap_every > 0 else None
+        self.next_burst = burst_every if burst_every > 0 else None
+        self.counts = {"malformed": 0, "gaps": 0, "bursts": 0}
+
+    def in_gap(self, elapsed:float) -> bool:
+        if self.next_gap is None or elapsed < self.next_gap:
+            return False
+        if elapsed < self.next_gap + self.gap_duration:
+            return True
+        self.next_gap += self.gap_every
+        self.counts["gaps"] += 1
+        return False
+
+    def gap_end(self) -> float:
+        return self.next_gap + self.gap_duration
+
+    def burst(self, elapsed:float) -> int:
+        if self.next_burst is None or elapsed < self.next_burst:
+            return 0
+        self.next_burst += self.burst_every
+        self.counts["bursts"] += 1
+        return self.burst_size
+
+    def malformed_mask(self, count:int) -> np.ndarray:
+        if self.malformed <= 0:
+            return np.zeros(count, dtype=bool)
+        mask = self.rng.random(count) < self.malformed
+        self.counts["malformed"] += int(mask.sum())
+        return mask
+
+
+def encode_rows(rows:np.ndarray, framing:str = "csv", malformed:np.ndarray|None = None) -> bytes:
+    if framing == "binary":
+        data = [pack_frame(row) for row in rows]
+        if malformed is not None:
+            # corrupted header -> reader has to resync
+            data = [b"XX" + frame[2:] if bad else frame for frame, bad in zip(data, malformed)]
+        return b"".join(data)
+    lines = [",".join(f"{t:.3f}" for t in row) for row in rows]
+    if malformed is not None:
+        lines = ["25.1,#ERR,,abc" if bad else line for line, bad in zip(lines, malformed)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+class FifoOutput(object):
+    """
+    Named pipe (created if missing), opening blocks until the reader (StreamLoader) opens it.  
+    """
+    def __init__(self, path:str):
+        if not os.path.exists(path):
+            os.mkfifo(path)
+        elif not stat.S_ISFIFO(os.stat(path).st_mode):
+            raise ValueError("Path exists and is not a FIFO -> got: ", path)
+        self.name = path
+        print(f"Waiting for reader on {path}")
+        self.fd = os.open(path, os.O_WRONLY)
+
+    def write(self, data:bytes, rows:int):
+        os.write(self.fd, data)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PtyOutput(object):
+    """
+    Pseudo-terminal in place of a serial port -> the printed device path is used as the Serial source.  
+    """
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.name = os.ttyname(self.slave)
+        print(f"Serial port stand-in: {self.name}")
+
+    def write(self, data:bytes, rows:int):
+        os.write(self.master, data)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class SocketOutput(object):
+    """
+    "tcp://host:port" -> listens and waits for SocketLoader to connect (generator plays the board)  
+    "udp://host:port" -> sends datagrams to SocketLoader  
+    """
+    max_datagram = 60000
+
+    def __init__(self, url:str, framing:str = "csv"):
+        parsed = urlparse(url)
+        self.framing = framing
+        self.protocol = parsed.scheme
+        self.address = (parsed.hostname or "127.0.0.1", parsed.port)
+        self.name = url
+        if self.protocol == "tcp":
+            server = socket.create_server(self.address)
+            print(f"Waiting for connection on {url}")
+            self.sock, _ = server.accept()
+            server.close()
+        elif self.protocol == "udp":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            raise ValueError("Invalid socket output, should be {tcp|udp}://host:port -> got: ", url)
+
+    def write(self, data:bytes, rows:int):
+        if self.protocol == "tcp":
+            self.sock.sendall(data)
+            return
+        # split on row boundaries -> every datagram holds complete rows
+        start = 0
+        while start < len(data):
+            end = min(start + self.max_datagram, len(data))
+            if end < len(data):
+                if self.framing == "binary":
+                    row_size = len(data) // rows # frames have fixed size
+                    end = start + max(1, self.max_datagram // row_size) * row_size
+                else:
+                    end = data.rfind(b'\n', start, end) + 1
+            self.sock.sendto(data[start:end], self.address)
+            start = end
+
+    def close(self):
+        self.sock.close()
+
+
+def open_output(target:str, path:str|None = None, framing:str = "csv"):
+    if target == "fifo":
+        return FifoOutput(path or "stream_test")
+    if target == "pty":
+        return PtyOutput()
+    return SocketOutput(target, framing)
+
+
+class LoadGenerator(object):
+    """
+    Sends rows at the target rate (rate 0 -> as fast as the output takes them).  
+    Rows are generated and written in batches every `tick` seconds on a drift-free time grid.  
+    """
+    def __init__(self, output, signal:SignalGenerator, faults:FaultInjector, framing:str = "csv", tick:float = 0.01):
+        self.output = output
+        self.signal = signal
+        self.faults = faults
+        self.framing = framing
+        self.tick = tick
+        self.sent_rows = 0
+        self.sent_bytes = 0
+        self.index = 0
+        # perf_counter time of row 0 -> row i is due at start_time + i / rate
+        self.start_time = None
+
+    def _send(self, count:int):
+        rows = self.signal.rows(self.index, count)
+        self.index += count
+        data = encode_rows(rows, self.framing, self.faults.malformed_mask(count))
+        self.output.write(data, count)
+        self.sent_rows += count
+        self.sent_bytes += len(data)
+
+    def run(self, duration:float) -> dict:
+        """
+        Returns:  
+            - report dict (target/achieved rate, rows, bytes, faults)  
+        """
+        start = time.perf_counter()
+        self.start_time = start
+        unlimited = self.signal.rate <= 0
+        batch = 1000
+        k = 0
+        try:
+            while True:
+                elapsed = time.perf_counter() - start
+                if duration > 0 and elapsed >= duration:
+                    break
+                if unlimited:
+                    due = batch
+                else:
+                    due = int(elapsed * self.signal.rate) - self.index
+                if self.faults.in_gap(elapsed):
+                    # nothing to send until the pause ends -> slept through, whatever the rate
+                    end = self.faults.gap_end() if duration <= 0 else min(self.faults.gap_end(), duration)
+                    time.sleep(max(0.0, end - elapsed))
+                    now = time.perf_counter() - start
+                    # rows of the pause are lost, like on a disconnected board
+                    if not unlimited:
+                        self.index = max(self.index, int(now * self.signal.rate))
+                        k = int(now / self.tick)
+                    continue
+                due += self.faults.burst(elapsed)
+                if due > 0:
+                    self._send(due)
+                if not unlimited:
+                    k += 1
+                    time.sleep(max(0.0, start + k * self.tick - time.perf_counter()))
+        except (BrokenPipeError, ConnectionError) as e:
+            print(f"Reader disconnected: {e}")
+        except KeyboardInterrupt:
+            pass
+        elapsed = time.perf_counter() - start
+        return {
+            "output": self.output.name,
+            "framing": self.framing,
+            "channels": self.signal.num_channels,
+            "target_rate": self.signal.rate,
+            "achieved_rate": self.sent_rows / elapsed if elapsed > 0 else 0.0,
+            "rows": self.sent_rows,
+            "bytes": self.sent_bytes,
+            "throughput_MBps": self.sent_bytes / elapsed / 1e6 if elapsed > 0 else 0.0,
+            "duration": elapsed,
+            "faults": dict(self.faults.counts),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic temperature data generator for load testing")
+    parser.add_argument("target", help="fifo | pty | tcp://host:port | udp://host:port")
+    parser.add_argument("path", nargs="?", default=None, help="FIFO path (fifo target)")
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=100.0, help="rows per second, 0 = unlimited")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds, 0 = until interrupted")
+    parser.add_argument("--waveform", choices=SignalGenerator.waveforms, default="sine")
+    parser.add_argument("--noise", type=float, default=0.05, help="standard deviation in deg C")
+    parser.add_argument("--framing", choices=("csv", "binary"), default="csv")
+    parser.add_argument("--malformed", type=float, default=0.0, help="probability of a malformed row")
+    parser.add_argument("--gap-every", type=float, default=0.0, help="seconds between output pauses")
+    parser.add_argument("--gap-duration", type=float, default=1.0)
+    parser.add_argument("--burst-every", type=float, default=0.0, help="seconds between bursts")
+    parser.add_argument("--burst-size", type=int, default=1000, help="extra rows per burst")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    signal = SignalGenerator(args.channels, args.rate, args.waveform, noise=args.noise, seed=args.seed)
+    faults = FaultInjector(args.malformed, args.gap_every, args.gap_duration, args.burst_every, args.burst_size, args.seed)
+    output = open_output(args.target, args.path, args.framing)
+    try:
+        report = LoadGenerator(output, signal, faults, args.framing).run(args.duration)
+    finally:
+        output.close()
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
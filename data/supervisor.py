@@ -0,0 +1,57 @@
+class Gap(object):
+    """
+    Explicit interval without data in the sample stream.  
+    Sources put it into the result queue (instead of a row) after they recover from a disconnect.  
+    Times are wall clock (time.time()) so they can be matched with the recording.  
+    """
+    def __init__(self, start:float, end:float, source:str = ""):
+        self.start = start
+        self.end = end
+        self.source = source
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"Gap({self.source}: {self.duration:.3f} s)"
+
+
+class Backoff(object):
+    """
+    Exponential backoff for reconnecting sources.  
+    Delays are kept short (max 0.5 s by default) -> the source is back in under a second  
+    once the device/port/pipe is available again.  
+    """
+    def __init__(self, initial:float = 0.05, maximum:float = 0.5, factor:float = 2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = initial
+
+    def next(self):
+        delay = self.delay
+        self.delay = min(self.delay * self.factor, self.maximum)
+        return delay
+
+
+def reconnect(open_function, end_event, name:str = ""):
+    """
+    Calls open_function until it succeeds (or end_event is set), waits with backoff in between.  
+    Arguments:  
+        - open_function: reopens the source, raises on failure  
+        - end_event: threading.Event of the source thread -> stops retrying  
+        - name: used in the log messages  
+    Returns:  
+        - True if reconnected, False if stopped  
+    """
+    backoff = Backoff()
+    while not end_event.is_set():
+        try:
+            open_function()
+            print(f"{name} reconnected")
+            return True
+        except Exception as e:
+            print(f"{name} reconnect failed: {e}")
+            end_event.wait(backoff.next())
+    return False
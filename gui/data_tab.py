@@ -1,6 +1,6 @@
 from PyQt5 import QtWidgets
 import os
-import serial.tools.list_ports
+from data.socket_loader import parse_socket_url
 
 class DataSourceTab(QtWidgets.QWidget):
     def __init__(self, main_window=None):
@@ -23,6 +23,11 @@ class DataSourceTab(QtWidgets.QWidget):
         separator.setFrameShape(QtWidgets.QFrame.HLine)
         separator.setFrameShadow(QtWidgets.QFrame.Sunken)
 
+        # more sources at once -> merged into one sample stream (source order = column order)
+        self.merge_checkbox = QtWidgets.QCheckBox("Merge Multiple Sources")
+        self.merge_checkbox.toggled.connect(self.toggle_merge)
+        source_layout.addWidget(self.merge_checkbox)
+
         self.layout.addLayout(source_layout)
         self.layout.addWidget(separator)
 
@@ -51,6 +56,19 @@ class DataSourceTab(QtWidgets.QWidget):
 
         self.layout.addWidget(self.stream_group)
 
+        # --- Network Sources ---
+        self.network_group = QtWidgets.QGroupBox("Network Sources")
+        network_layout = QtWidgets.QVBoxLayout(self.network_group)
+        self.network_input = QtWidgets.QLineEdit()
+        self.network_input.setPlaceholderText("tcp://host:port or udp://0.0.0.0:port")
+        self.add_network_button = QtWidgets.QPushButton("Add Network Source")
+        self.network_list = QtWidgets.QListWidget()
+        network_layout.addWidget(self.network_input)
+        network_layout.addWidget(self.add_network_button)
+        network_layout.addWidget(self.network_list)
+
+        self.layout.addWidget(self.network_group)
+
         # --- Recorded Files ---
         self.recorded_group = QtWidgets.QGroupBox("Recorded File Playback")
         recorded_layout = QtWidgets.QVBoxLayout(self.recorded_group)
@@ -88,22 +106,27 @@ class DataSourceTab(QtWidgets.QWidget):
         self.device_list.setFixedWidth(250)
         self.serial_list.setFixedWidth(250)
         self.stream_list.setFixedWidth(250)
+        self.network_list.setFixedWidth(250)
         
         self.device_list.setWordWrap(False)
         self.serial_list.setWordWrap(False)
         self.stream_list.setWordWrap(False)
+        self.network_list.setWordWrap(False)
         
         # Connect actions
         self.add_stream_button.clicked.connect(self.add_stream_file)
+        self.add_network_button.clicked.connect(self.add_network_source)
         self.load_recorded_button.clicked.connect(self.load_recorded_file)
         
         self.selected_source_type = None
         self.selected_source_value = None
         self.recored_file_path = None
+        self.merged_sources = []
         
         self.device_list.itemClicked.connect(lambda item: self.set_current_source("Device", item.text()))
         self.serial_list.itemClicked.connect(lambda item: self.set_current_source("Serial", item.text()))
         self.stream_list.itemClicked.connect(lambda item: self.set_current_source("Stream", item.text()))
+        self.network_list.itemClicked.connect(lambda item: self.set_current_source("Network", item.text()))
         
         self.config_device_button.setEnabled(False)
         self.temp_order_button.setEnabled(False)
@@ -113,6 +136,7 @@ class DataSourceTab(QtWidgets.QWidget):
     def refresh_serial_ports(self):
         
         self.serial_list.clear()
+        import serial.tools.list_ports
         ports = serial.tools.list_ports.comports()
         for port in ports:
             self.serial_list.addItem(port.device)
@@ -122,6 +146,15 @@ class DataSourceTab(QtWidgets.QWidget):
         if path:
             self.stream_list.addItem(path)
             
+    def add_network_source(self):
+        url = self.network_input.text().strip()
+        try:
+            parse_socket_url(url)
+        except ValueError as e:
+            QtWidgets.QMessageBox.critical(self, "Configuration Error", f"{e.args[0]}{url}")
+            return
+        self.network_list.addItem(url)
+        self.network_input.clear()
 
     def load_recorded_file(self):
         path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Select Recorded File", "", "CSV/TXT (*.csv *.txt)")
@@ -156,19 +189,54 @@ class DataSourceTab(QtWidgets.QWidget):
             self.temp_order_button.setEnabled(False)
         self.selected_source_type = source_type
         self.selected_source_value = value
-        self.current_source_value.setText(f"{source_type}: {value}")
+        if self.merge_checkbox.isChecked() and source_type != "Playback":
+            # clicking again removes the source from the merge
+            source = {"type": source_type, "value": value}
+            if source in self.merged_sources:
+                self.merged_sources.remove(source)
+            else:
+                self.merged_sources.append(source)
+            self.show_merged_sources()
+        else:
+            self.current_source_value.setText(f"{source_type}: {value}")
+    
+    def show_merged_sources(self):
+        self.current_source_value.setText("\n".join(f"{s['type']}: {s['value']}" for s in self.merged_sources))
+    
+    def toggle_merge(self, checked):
+        self.merged_sources = []
+        if checked and self.selected_source_type not in (None, "Playback"):
+            self.merged_sources.append(self.get_data_source())
+        if checked:
+            self.show_merged_sources()
+        elif self.selected_source_type is not None:
+            self.current_source_value.setText(f"{self.selected_source_type}: {self.selected_source_value}")
     
     def get_data_source(self):
         source = {"type": self.selected_source_type, "value": self.selected_source_value}
         return source
     
+    def get_active_sources(self):
+        """
+        All sources that should run -> more than one when merging.  
+        """
+        if self.merge_checkbox.isChecked():
+            return list(self.merged_sources)
+        return [self.get_data_source()]
+    
     def clear_inputs(self):
         self.selected_source_type = None
         self.selected_source_value = None
         self.recored_file_path = None
+        self.merged_sources = []
+        self.merge_checkbox.blockSignals(True)
+        self.merge_checkbox.setChecked(False)
+        self.merge_checkbox.blockSignals(False)
         self.current_source_value.setText(None)
         self.serial_list.clear()
         self.stream_list.clear()
+        self.network_list.clear()
+        self.network_input.clear()
         self.recorded_file_label.setText(None)
     
     def get_serial_sources(self):
@@ -187,12 +255,22 @@ class DataSourceTab(QtWidgets.QWidget):
             stream_sources.append(item.text())
         return stream_sources
     
+    def get_network_sources(self):
+        network_sources = []
+        
+        for i in range(self.network_list.count()):
+            item = self.network_list.item(i)
+            network_sources.append(item.text())
+        return network_sources
+    
     def get_data_sources(self):
         sources = {
             "Serial": self.get_serial_sources(),
             "Stream": self.get_stream_sources(),
+            "Network": self.get_network_sources(),
             "Playback": self.recored_file_path,
-            "Active": self.get_data_source()
+            "Active": self.get_data_source(),
+            "Merged": self.merged_sources if self.merge_checkbox.isChecked() else None
         }
         return sources
     
@@ -200,6 +278,7 @@ class DataSourceTab(QtWidgets.QWidget):
         self.clear_inputs()
         serial_sources = config.get("Serial", [])
         stream_sources = config.get("Stream", [])
+        network_sources = config.get("Network", [])
         self.recored_file_path = config.get("Playback", None)
         if self.recored_file_path is not None:
             self.recorded_file_label.setText(os.path.basename(self.recored_file_path))
@@ -207,9 +286,18 @@ class DataSourceTab(QtWidgets.QWidget):
             self.serial_list.addItem(src)
         for src in stream_sources:
             self.stream_list.addItem(src)
+        for src in network_sources:
+            self.network_list.addItem(src)
         active = config.get("Active", None)
         if active is not None:
             self.set_current_source(active["type"], active["value"])
+        merged = config.get("Merged", None)
+        if merged:
+            self.merge_checkbox.blockSignals(True)
+            self.merge_checkbox.setChecked(True)
+            self.merge_checkbox.blockSignals(False)
+            self.merged_sources = list(merged)
+            self.show_merged_sources()
         
         
         
\ No newline at end of file
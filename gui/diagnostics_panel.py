@@ -0,0 +1,105 @@
+from PyQt5 import QtWidgets, QtCore
+from data.metrics import metrics
+
+
+class DiagnosticsPanel(QtWidgets.QWidget):
+    """
+    Live view of the pipeline metrics (data.metrics): per-stage rate and latency percentiles,  
+    counters and gauges. Refreshes once per second while visible.  
+    """
+    stage_columns = ("Stage", "Count", "Rate (/s)", "Mean (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)")
+    stage_keys = ("count", "rate_per_s", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.setWindowFlags(QtCore.Qt.Window)
+        self.resize(760, 520)
+        layout = QtWidgets.QVBoxLayout(self)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.enable_checkbox = QtWidgets.QCheckBox("Enable Instrumentation")
+        self.enable_checkbox.setChecked(metrics.enabled)
+        self.enable_checkbox.toggled.connect(self.toggle_enabled)
+        self.trace_checkbox = QtWidgets.QCheckBox("Record Trace")
+        self.trace_checkbox.setChecked(metrics.tracing)
+        self.trace_checkbox.setEnabled(metrics.enabled)
+        self.trace_checkbox.toggled.connect(metrics.set_tracing)
+        self.reset_button = QtWidgets.QPushButton("Reset")
+        self.reset_button.clicked.connect(self.reset)
+        controls.addWidget(self.enable_checkbox)
+        controls.addWidget(self.trace_checkbox)
+        controls.addStretch(1)
+        controls.addWidget(self.reset_button)
+        layout.addLayout(controls)
+
+        self.stage_table = QtWidgets.QTableWidget(0, len(self.stage_columns))
+        self.stage_table.setHorizontalHeaderLabels(self.stage_columns)
+        self.stage_table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.stage_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.stage_table, stretch=3)
+
+        self.counter_table = QtWidgets.QTableWidget(0, 2)
+        self.counter_table.setHorizontalHeaderLabels(("Counter / Gauge", "Value"))
+        self.counter_table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.counter_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.counter_table, stretch=2)
+
+        export_layout = QtWidgets.QHBoxLayout()
+        self.export_json_button = QtWidgets.QPushButton("Export JSON")
+        self.export_trace_button = QtWidgets.QPushButton("Export Chrome Trace")
+        self.export_json_button.clicked.connect(self.export_json)
+        self.export_trace_button.clicked.connect(self.export_trace)
+        export_layout.addWidget(self.export_json_button)
+        export_layout.addWidget(self.export_trace_button)
+        layout.addLayout(export_layout)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def toggle_enabled(self, checked):
+        metrics.set_enabled(checked)
+        self.trace_checkbox.setEnabled(checked)
+        if not checked:
+            self.trace_checkbox.setChecked(False)
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        stages = snapshot["stages"]
+        self.stage_table.setRowCount(len(stages))
+        for row, (name, summary) in enumerate(stages.items()):
+            self.stage_table.setItem(row, 0, QtWidgets.QTableWidgetItem(name))
+            for col, key in enumerate(self.stage_keys, start=1):
+                value = summary.get(key, 0)
+                text = str(value) if key == "count" else f"{value:.2f}"
+                self.stage_table.setItem(row, col, QtWidgets.QTableWidgetItem(text))
+
+        values = list(snapshot["counters"].items()) + list(snapshot["gauges"].items())
+        self.counter_table.setRowCount(len(values))
+        for row, (name, value) in enumerate(sorted(values)):
+            self.counter_table.setItem(row, 0, QtWidgets.QTableWidgetItem(name))
+            self.counter_table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(value)))
+
+    def export_json(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Metrics", "metrics.json", "JSON (*.json)")
+        if path:
+            metrics.export_json(path)
+
+    def export_trace(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Chrome Trace", "trace.json", "JSON (*.json)")
+        if path:
+            metrics.export_chrome_trace(path)
@@ -0,0 +1,101 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from model.operators import IncrementalRbf, rbf_epsilon
+
+
+class FieldPreview(object):
+    """
+    Interpolated field shown while placing sensors, from the last readings of the sensors (by name)  
+    or a test pattern (gradient along the longest side of the model). Sensor changes update the  
+    interpolation incrementally (IncrementalRbf) -> preview follows every click.  
+    A sensor on the spot of another one is left out of the interpolation (active False) until that one is gone.  
+    """
+    def __init__(self, plotter, surface, positions, names:list[str], last_readings:dict|None = None):
+        self.plotter = plotter
+        # shallow copy -> own point data, the plain model keeps no scalars
+        self.surface = surface.copy(deep=False)
+        self.last_readings = last_readings or dict()
+        bounds = np.array(surface.bounds).reshape(3, 2)
+        self.axis = int(np.argmax(bounds[:, 1] - bounds[:, 0]))
+        self.pattern_range = bounds[self.axis]
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.positions = list(positions)
+        self.values = [self.value_for(position, name) for position, name in zip(positions, names)]
+        # epsilon of the model size without a layout to derive it from (less than 2 distinct sensors)
+        model_epsilon = float(np.max(bounds[:, 1] - bounds[:, 0])) / 4
+        epsilon = rbf_epsilon(positions, model_epsilon)
+        self.rbf = IncrementalRbf(self.surface.points, epsilon)
+        self.active = [True] * len(positions)
+        for i, j in sorted(cKDTree(positions).query_pairs(self.rbf.duplicate_ratio * epsilon)):
+            if self.active[i]:
+                self.active[j] = False
+        self.rbf.rebuild(positions[np.array(self.active, dtype=bool)])
+        self.surface["Temperature"] = self.rbf.evaluate(self._active_values())
+        self.actor = self.plotter.add_mesh(self.surface, scalars="Temperature", cmap="plasma", show_edges=True,
+                                           nan_color="gray", name="field_preview")
+
+    def value_for(self, position, name:str) -> float:
+        if name in self.last_readings and np.isfinite(self.last_readings[name]):
+            return float(self.last_readings[name])
+        low, high = self.pattern_range
+        return 20.0 + 10.0 * (position[self.axis] - low) / max(high - low, 1e-12)
+
+    def _active_values(self):
+        return np.asarray(self.values, dtype=float)[np.array(self.active, dtype=bool)]
+
+    def _rbf_index(self, index:int) -> int:
+        return int(np.count_nonzero(self.active[:index]))
+
+    def _insert(self, index:int, position) -> bool:
+        if self.rbf.is_duplicate(position):
+            print(f"Field preview: sensor {index + 1} is on the spot of another one, left out")
+            return False
+        self.rbf.add(position, self._rbf_index(index))
+        return True
+
+    def _refresh(self):
+        self.surface["Temperature"] = self.rbf.evaluate(self._active_values())
+        self.plotter.render()
+
+    def add(self, position, name:str):
+        value = self.value_for(position, name)
+        # state changes only once the interpolation accepted the sensor
+        active = self._insert(len(self.values), position)
+        self.positions.append(np.asarray(position, dtype=float))
+        self.values.append(value)
+        self.active.append(active)
+        self._refresh()
+
+    def move(self, index:int, position, name:str):
+        value = self.value_for(position, name)
+        if self.active[index]:
+            self.rbf.remove(self._rbf_index(index))
+            self.active[index] = False
+        self.positions[index] = np.asarray(position, dtype=float)
+        self.values[index] = value
+        self.active[index] = self._insert(index, position)
+        self._reactivate()
+        self._refresh()
+
+    def rename(self, index:int, position, name:str):
+        # only the value can change (last reading of the new name)
+        self.values[index] = self.value_for(position, name)
+        self._refresh()
+
+    def remove(self, index:int):
+        if self.active[index]:
+            self.rbf.remove(self._rbf_index(index))
+        del self.positions[index]
+        del self.values[index]
+        del self.active[index]
+        self._reactivate()
+        self._refresh()
+
+    def _reactivate(self):
+        # sensors left out as duplicates take over once their spot is free
+        for index, active in enumerate(self.active):
+            if not active and not self.rbf.is_duplicate(self.positions[index]):
+                self.active[index] = self._insert(index, self.positions[index])
+
+    def close(self):
+        self.plotter.remove_actor(self.actor)
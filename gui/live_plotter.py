@@ -1,6 +1,6 @@
-import matplotlib.pyplot as plt
 import numpy as np
 import queue
+from data.metrics import metrics
 class RingBuffer(object):
     """
     Ring buffer used by LivePlotter.  
@@ -93,12 +93,28 @@ class LivePlotter(object):
         # dont use too big n_samples as this is not exactly optimized -> since optimizing it would add more logic to sample_function wich is alreade pretty involved
         #self.__ring = RingBuffer(200)
         self.__ring = FastRingBuffer(100, len(labels))
-        self.figure = fig
-        self.canvas = canvas
+        self.figure = None
+        self.canvas = None
         self.labels = labels
         self.ax = None
         self.t = 0
+        # no canvas yet (Plot view not opened) -> only the ring buffer is filled, attach() later
+        if fig is not None:
+            self.attach(fig, canvas)
+    
+    def attach(self, fig, canvas):
+        """
+        Starts drawing into fig/canvas (buffered history is drawn right away).  
+        Arguments:  
+            - fig: matplotlib Figure  
+            - canvas: canvas of the figure  
+        Returns:  
+            None  
+        """
+        self.figure = fig
+        self.canvas = canvas
         self._init_plots()
+        self._draw()
     
     
     def _init_plots(self):
@@ -123,8 +139,16 @@ class LivePlotter(object):
         Returns:  
             None  
         """
+        with metrics.stage("liveplot.update"):
+            self._update(temperatures)
+    
+    def _update(self, temperatures):
         self.__ring.put(self.t, np.copy(temperatures))
         self.t += 1
+        if self.canvas is not None:
+            self._draw()
+    
+    def _draw(self):
         t, temps = self.__ring.get_all()
         if len(t) < 1:
             return
@@ -149,4 +173,15 @@ class LivePlotter(object):
             labelcolor='white',
             frameon=False            # No box around legend (optional, cleaner)
         )
-        self.canvas.draw()
\ No newline at end of file
+        self.canvas.draw()
+    
+    def add_gap(self):
+        """
+        Marks missing data (source reconnect) -> NaN row breaks the plotted lines.  
+        Arguments:  
+            None  
+        Returns:  
+            None  
+        """
+        self.__ring.put(self.t, np.full(len(self.labels), np.nan))
+        self.t += 1
\ No newline at end of file
@@ -3,6 +3,8 @@ import os
 import json
 
 class DeviceConfigOverlay(QtWidgets.QWidget):
+    AIN_PER_DEVICE = 14
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyle(QtWidgets.QStyleFactory.create("Fusion"))
@@ -40,6 +42,21 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         """)
         self.card_layout = QtWidgets.QVBoxLayout(self.card)
         self.overlay_layout.addWidget(self.card, alignment=QtCore.Qt.AlignHCenter)
+        # --- Devices row (serial numbers, more devices -> one merged channel space) ---
+        self.devices_layout = QtWidgets.QHBoxLayout()
+        self.devices_label = QtWidgets.QLabel("Devices (serial numbers):")
+        self.devices_input = QtWidgets.QLineEdit()
+        self.devices_input.setPlaceholderText("ANY")
+        self.find_devices_button = QtWidgets.QPushButton("Find Devices")
+        self.apply_devices_button = QtWidgets.QPushButton("Apply Devices")
+        self.devices_layout.addWidget(self.devices_label)
+        self.devices_layout.addWidget(self.devices_input, stretch=1)
+        self.devices_layout.addWidget(self.find_devices_button)
+        self.devices_layout.addWidget(self.apply_devices_button)
+        self.card_layout.addLayout(self.devices_layout)
+        self.find_devices_button.clicked.connect(self.find_devices)
+        self.apply_devices_button.clicked.connect(lambda: self.build_ain_grid(self.get_devices()))
+
         # --- AIN Configuration Area (3 columns) ---
         self.ain_scroll = QtWidgets.QScrollArea()
         self.ain_scroll.setWidgetResizable(True)
@@ -47,32 +64,11 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         self.ain_grid = QtWidgets.QGridLayout(self.ain_widget)
 
         self.ain_controls = []
-        for i in range(14):
-            groupbox = QtWidgets.QGroupBox(f"AIN {i}")
-            vbox = QtWidgets.QVBoxLayout()
-            checkbox = QtWidgets.QCheckBox("Enable")
-            
-            combo = QtWidgets.QComboBox()
-            combo.addItem("Select Sensor")
-            calibration_combo = QtWidgets.QComboBox()
-            calibration_combo.addItem("Select Calibration")
-            vbox.addWidget(checkbox)
-            vbox.addWidget(combo)
-            vbox.addWidget(calibration_combo)
-            groupbox.setLayout(vbox)
-            
-            def make_toggle_handler(sensor_cb, calib_cb):
-                return lambda state: (
-                    sensor_cb.setEnabled(state == QtCore.Qt.Checked),
-                    calib_cb.setEnabled(state == QtCore.Qt.Checked)
-                )
-
-            checkbox.setChecked(False)
-            combo.setEnabled(False)
-            calibration_combo.setEnabled(False)
-            checkbox.stateChanged.connect(make_toggle_handler(combo, calibration_combo))
-            self.ain_grid.addWidget(groupbox, i // 3, i % 3)
-            self.ain_controls.append((checkbox, combo, calibration_combo))
+        self.ain_channel_names = []
+        self.devices = ["ANY"]
+        self.sensor_names = []
+        self.calibrations = dict()
+        self.build_ain_grid(self.devices)
 
         self.ain_scroll.setWidget(self.ain_widget)
         self.ain_scroll.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
@@ -121,6 +117,44 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         refresh_group.addWidget(self.refresh_label)
         refresh_group.addWidget(self.refresh_slider)
 
+        # --- Acquisition mode block (Stream / Poll) ---
+        mode_group = QtWidgets.QVBoxLayout()
+        mode_label = QtWidgets.QLabel("Acquisition Mode")
+        mode_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.mode_combo = QtWidgets.QComboBox()
+        self.mode_combo.addItems(["Stream", "Poll"])
+        self.mode_combo.setFixedWidth(150)
+        self.poll_period_input = QtWidgets.QDoubleSpinBox()
+        self.poll_period_input.setPrefix("Period: ")
+        self.poll_period_input.setSuffix(" s")
+        self.poll_period_input.setDecimals(2)
+        self.poll_period_input.setRange(0.05, 3600.0)
+        self.poll_period_input.setValue(1.0)
+        self.poll_period_input.setFixedWidth(150)
+        self.poll_period_input.setEnabled(False)
+        mode_group.addWidget(mode_label)
+        mode_group.addWidget(self.mode_combo)
+        mode_group.addWidget(self.poll_period_input)
+
+        # --- Oversampling filter block (stream only) ---
+        filter_group = QtWidgets.QVBoxLayout()
+        filter_label = QtWidgets.QLabel("Oversampling Filter")
+        filter_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.filter_combo = QtWidgets.QComboBox()
+        self.filter_combo.addItems(["None", "Mean", "Median", "IIR"])
+        self.filter_combo.setFixedWidth(150)
+        self.filter_factor_input = QtWidgets.QSpinBox()
+        self.filter_factor_input.setPrefix("Oversampling: x")
+        self.filter_factor_input.setRange(1, 1000)
+        self.filter_factor_input.setValue(1)
+        self.filter_factor_input.setFixedWidth(150)
+        self.filter_factor_input.setEnabled(False)
+        filter_group.addWidget(filter_label)
+        filter_group.addWidget(self.filter_combo)
+        filter_group.addWidget(self.filter_factor_input)
+        # per channel methods ({"AIN3": "Median"}) are kept from the project file
+        self.channel_filters = dict()
+
         # --- Settling time field ---
         settling_group = QtWidgets.QVBoxLayout()
         settling_label = QtWidgets.QLabel("Settling Time (ms)")
@@ -139,10 +173,16 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         self.lower_left_layout.addLayout(refresh_group)
         self.lower_left_layout.addSpacing(20)
         self.lower_left_layout.addLayout(settling_group)
+        self.lower_left_layout.addSpacing(20)
+        self.lower_left_layout.addLayout(mode_group)
+        self.lower_left_layout.addSpacing(20)
+        self.lower_left_layout.addLayout(filter_group)
         self.lower_left_layout.addStretch()
         self.resolution_slider.valueChanged.connect(self.update_resolution_label)
         self.refresh_slider.valueChanged.connect(self.update_refresh_label)
         self.settling_time_input.textChanged.connect(self.recalculate_refresh_rate)
+        self.mode_combo.currentTextChanged.connect(self.update_acquisition_mode)
+        self.filter_combo.currentTextChanged.connect(self.update_filter_inputs)
         
         # --- Save & Close buttons ---
         self.save_close_layout = QtWidgets.QHBoxLayout()
@@ -164,7 +204,6 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         self.load_calibration_button.clicked.connect(self.load_calibration)
         
         
-        self.calibrations = dict()
         # --- Final overlay ---
         self.overlay_layout.addWidget(self.card)
         self.hide()
@@ -202,7 +241,87 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         value = self.refresh_slider.value()
         self.refresh_label.setText(f"Refresh Frequency: {value} Hz")
 
+    def update_acquisition_mode(self, mode):
+        # Stream uses the refresh slider, Poll uses the (sub Hz capable) period
+        polling = mode == "Poll"
+        self.poll_period_input.setEnabled(polling)
+        self.refresh_slider.setEnabled(not polling)
+        # oversampling only makes sense for the stream
+        self.filter_combo.setEnabled(not polling)
+        self.update_filter_inputs(self.filter_combo.currentText())
+
+    def update_filter_inputs(self, method):
+        self.filter_factor_input.setEnabled(method != "None" and self.mode_combo.currentText() != "Poll")
+
+    def build_ain_grid(self, devices:list[str]):
+        """
+        (Re)creates the AIN channel boxes - 14 per device.  
+        Single device keeps the plain "AIN#" channel names, more devices use "<serial>/AIN#".  
+        Assignments of channels that exist before and after the rebuild are kept.  
+        """
+        previous = self.get_meas_config()["ain_channels"] if self.ain_controls else {}
+        while self.ain_grid.count():
+            item = self.ain_grid.takeAt(0)
+            item.widget().deleteLater()
+        self.devices = devices
+        self.ain_controls = []
+        self.ain_channel_names = []
+        multi_device = len(devices) > 1
+        for serial in devices:
+            for i in range(self.AIN_PER_DEVICE):
+                groupbox = QtWidgets.QGroupBox(f"{serial} AIN {i}" if multi_device else f"AIN {i}")
+                vbox = QtWidgets.QVBoxLayout()
+                checkbox = QtWidgets.QCheckBox("Enable")
+                
+                combo = QtWidgets.QComboBox()
+                combo.addItem("Select Sensor")
+                calibration_combo = QtWidgets.QComboBox()
+                calibration_combo.addItem("Select Calibration")
+                vbox.addWidget(checkbox)
+                vbox.addWidget(combo)
+                vbox.addWidget(calibration_combo)
+                groupbox.setLayout(vbox)
+                
+                def make_toggle_handler(sensor_cb, calib_cb):
+                    return lambda state: (
+                        sensor_cb.setEnabled(state == QtCore.Qt.Checked),
+                        calib_cb.setEnabled(state == QtCore.Qt.Checked)
+                    )
+
+                checkbox.setChecked(False)
+                combo.setEnabled(False)
+                calibration_combo.setEnabled(False)
+                checkbox.stateChanged.connect(make_toggle_handler(combo, calibration_combo))
+                pos = len(self.ain_controls)
+                self.ain_grid.addWidget(groupbox, pos // 3, pos % 3)
+                self.ain_controls.append((checkbox, combo, calibration_combo))
+                self.ain_channel_names.append(f"{serial}/AIN{i}" if multi_device else f"AIN{i}")
+        self.update_ain_calibration_list()
+        self.update_ain_sensor_list(self.sensor_names)
+        self.apply_channel_config(previous)
+
+    def get_devices(self):
+        devices = [d for d in self.devices_input.text().replace(",", " ").split() if d]
+        # duplicates would open the same device twice
+        devices = list(dict.fromkeys(devices))
+        return devices if devices else ["ANY"]
+
+    def find_devices(self):
+        try:
+            from labjack import ljm
+            _, _, _, serials, _ = ljm.listAll(ljm.constants.dtT7, ljm.constants.ctANY)
+        except Exception as e:
+            print(e)
+            QtWidgets.QMessageBox.warning(self, "Device Error", f"Failed to list LabJack devices: {e}")
+            return
+        # same device can be found over USB and Ethernet
+        serials = list(dict.fromkeys(str(serial) for serial in serials))
+        self.devices_input.setText(", ".join(serials))
+
     def clear_inputs(self):
+        self.devices_input.clear()
+        if self.devices != ["ANY"]:
+            self.build_ain_grid(["ANY"])
         for checkbox, combo, combo_calib in self.ain_controls:
             checkbox.setChecked(False)
             combo.clear()
@@ -213,6 +332,11 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         self.resolution_slider.setValue(0)
         self.settling_time_input.clear()
         self.refresh_slider.setValue(1)
+        self.mode_combo.setCurrentText("Stream")
+        self.poll_period_input.setValue(1.0)
+        self.filter_combo.setCurrentText("None")
+        self.filter_factor_input.setValue(1)
+        self.channel_filters = dict()
     
     def load_config(self, config:dict, sensors=[]):
         self.calibrations:dict = config.get("calibrations", {})
@@ -222,16 +346,27 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
             self.calibration_list.addItem(name)
         self.update_ain_calibration_list()
         self.update_ain_sensor_list(sensors)
-        
-        for channel_name, channel in config.get("ain_channels", {}).items():
-            try:
-                idx = int(channel_name.replace("AIN", ""))
-            except Exception as e:
-                print(e)
-                continue
-            #print("Load idx: ", idx, " -> ", channel_name)
-            if idx >= len(self.ain_controls):
+        devices = config.get("DEVICES", ["ANY"])
+        self.devices_input.setText("" if devices == ["ANY"] else ", ".join(devices))
+        if devices != self.devices:
+            self.build_ain_grid(devices)
+        self.apply_channel_config(config.get("ain_channels", {}))
+
+        self.resolution_slider.setValue(config.get("RESOLUTION", 0))
+        self.settling_time_input.setText(str(config.get("SETTLING_MS", 0)))
+        self.refresh_slider.setValue(config.get("SCAN_FREQ", 1))
+        self.mode_combo.setCurrentText(config.get("ACQ_MODE", "Stream"))
+        self.poll_period_input.setValue(config.get("POLL_PERIOD_S", 1.0))
+        filter_config = config.get("FILTER", {})
+        self.filter_combo.setCurrentText(filter_config.get("METHOD", "None"))
+        self.filter_factor_input.setValue(filter_config.get("FACTOR", 1))
+        self.channel_filters = dict(filter_config.get("CHANNELS", {}))
+
+    def apply_channel_config(self, ain_channels:dict):
+        for channel_name, channel in ain_channels.items():
+            if channel_name not in self.ain_channel_names:
                 continue
+            idx = self.ain_channel_names.index(channel_name)
             checkbox, combo, combo_calib = self.ain_controls[idx]
             checkbox.setChecked(channel.get("enabled", False))
             assigned = channel.get("assigned_sensor", None)
@@ -244,10 +379,6 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
                 index = combo_calib.findText(assigned_calib)
                 if index != -1:
                     combo_calib.setCurrentIndex(index)
-
-        self.resolution_slider.setValue(config.get("RESOLUTION", 0))
-        self.settling_time_input.setText(str(config.get("SETTLING_MS", 0)))
-        self.refresh_slider.setValue(config.get("SCAN_FREQ", 1))
         
     def load_calibration(self):
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Calibration", "", "Calibration Files (*.json)")
@@ -283,6 +414,7 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
 
     
     def update_ain_sensor_list(self, sensor_names):
+        self.sensor_names = list(sensor_names)
         for checkbox, combo, calibration_combo in self.ain_controls:
             current = combo.currentText()
             combo.blockSignals(True)
@@ -300,11 +432,19 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
             "RESOLUTION": self.resolution_slider.value(),
             "SETTLING_MS": int(self.settling_time_input.text()) if self.settling_time_input.text().isdigit() else 0,
             "SCAN_FREQ": self.refresh_slider.value(),
+            "DEVICES": self.devices,
+            "ACQ_MODE": self.mode_combo.currentText(),
+            "POLL_PERIOD_S": self.poll_period_input.value(),
+            "FILTER": {
+                "METHOD": self.filter_combo.currentText(),
+                "FACTOR": self.filter_factor_input.value(),
+                "CHANNELS": self.channel_filters
+            },
             "calibrations": self.calibrations
         }
         for i, control in enumerate(self.ain_controls):
             checkbox, combo, combo_calib = control
-            config["ain_channels"][f"AIN{i}"] = {
+            config["ain_channels"][self.ain_channel_names[i]] = {
                 "enabled": checkbox.isChecked(),
                 "assigned_sensor": combo.currentText() if combo.currentIndex() != 0 else None,
                 "assigned_calibration": combo_calib.currentText() if combo.currentIndex() != 0 else None
@@ -316,7 +456,7 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
         for idx in range(len(self.ain_controls)):
             checkbox, _,  _ = self.ain_controls[idx]
             if checkbox.isChecked():
-                channels.append(f"AIN{idx}")
+                channels.append(self.ain_channel_names[idx])
         return channels
     
     def varify_valid_setup(self):
@@ -326,15 +466,17 @@ class DeviceConfigOverlay(QtWidgets.QWidget):
             checkbox, combo, combo_calib = control
             if checkbox.isChecked():
                 if combo.currentIndex() == 0:
-                    errors.append(f"AIN{i} - no sensor assigned")
+                    errors.append(f"{self.ain_channel_names[i]} - no sensor assigned")
                 else:
                     sensor_assign = combo.currentText()
                     if sensor_assign in selected_sensors:
-                        errors.append(f"AIN{i} - uses already assigned sensor")
+                        errors.append(f"{self.ain_channel_names[i]} - uses already assigned sensor")
                     else:
                         selected_sensors.add(sensor_assign)
                 if combo_calib.currentIndex() == 0:
-                    errors.append(f"AIN{i} - no celibration/type assigned")
+                    errors.append(f"{self.ain_channel_names[i]} - no celibration/type assigned")
+                elif "EF_TYPE" in self.calibrations.get(combo_calib.currentText(), {}) and self.mode_combo.currentText() != "Poll":
+                    errors.append(f"{self.ain_channel_names[i]} - on-device (EF) conversion needs the Poll acquisition mode")
                     
         return errors
         
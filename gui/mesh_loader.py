@@ -0,0 +1,31 @@
+from PyQt5 import QtCore
+from model.cache import SurfaceCache, load_surface
+from model.projection import SurfaceProjector
+
+
+class MeshLoader(QtCore.QThread):
+    """
+    Loads model surface and builds its SurfaceProjector in a worker thread (GUI stays responsive), see model.cache.load_surface.  
+    Signals:  
+        - progress(percent, text)  
+        - loaded(surface, projector)  
+        - failed(error message)  
+    """
+    progress = QtCore.pyqtSignal(int, str)
+    loaded = QtCore.pyqtSignal(object, object)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, file_path:str, cache:SurfaceCache|None = None, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.cache = cache
+
+    def run(self):
+        try:
+            surface = load_surface(self.file_path, self.cache, lambda fraction, text: self.progress.emit(int(95 * fraction), text))
+            self.progress.emit(95, "Building locator")
+            projector = SurfaceProjector(surface)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(surface, projector)
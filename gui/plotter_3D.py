@@ -1,9 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 import pyvista as pv
-from scipy.interpolate import Rbf
+from data.metrics import metrics
+from model.lod import LODSelector, camera_distance
+from model.operators import OperatorCache, RbfInterpolator, KnnInterpolator, make_interpolator, build_operator, operator_dtype
+from model.harmonic import HarmonicInterpolator
+from model.volume import VoxelGrid, SLICE_NORMALS, grid_dims, fit_resolution
+from gui.volume_slices import VolumeSlices
+
+# name, edges, interpolate before map, render every n-th update
+QUALITY_LEVELS = (
+    ("Full", True, True, 1),
+    ("No edges", False, True, 1),
+    ("Reduced rate", False, True, 2),
+    ("Minimal", False, False, 4),
+)
+
+
+class RenderGovernor(object):
+    """
+    Frame budget controller of the 3D view: the budget is the interval between the samples (at least  
+    frame_budget_ms), quality drops one level when the smoothed frame time exceeds it and is restored  
+    one level after patience frames below headroom * budget. Updates during camera interaction are skipped.  
+    """
+    def __init__(self, frame_budget_ms:float = 33.0, headroom:float = 0.5, patience:int = 20, smoothing:float = 0.2):
+        self.frame_budget_ms = frame_budget_ms
+        self.headroom = headroom
+        self.patience = patience
+        self.smoothing = smoothing
+        self.level = 0
+        self.frame_ms = None
+        self.interval_ms = None
+        self.last_update = None
+        self.updates = 0
+        self.fast_frames = 0
+        self.interacting = False
+
+    def budget_ms(self) -> float:
+        if self.interval_ms is None:
+            return self.frame_budget_ms
+        # renders longer than the sample interval -> queue grows
+        return max(self.frame_budget_ms, 0.8 * self.interval_ms)
+
+    def _smooth(self, old, new):
+        return new if old is None else old + self.smoothing * (new - old)
+
+    def should_render(self) -> bool:
+        """
+        Called for every new sample.  
+        Returns:  
+            - False when the sample is not rendered (interaction or reduced rate)  
+        """
+        now = time.perf_counter()
+        if self.last_update is not None:
+            self.interval_ms = self._smooth(self.interval_ms, (now - self.last_update) * 1000)
+        self.last_update = now
+        self.updates += 1
+        if self.interacting:
+            return False
+        return self.updates % QUALITY_LEVELS[self.level][3] == 0
+
+    def record(self, frame_ms:float) -> bool:
+        """
+        Arguments:  
+            - frame_ms: duration of the rendered frame  
+        Returns:  
+            - True when the quality level changed  
+        """
+        self.frame_ms = self._smooth(self.frame_ms, frame_ms)
+        budget = self.budget_ms()
+        if self.frame_ms > budget and self.level < len(QUALITY_LEVELS) - 1:
+            self.level += 1
+            # next level starts with a fresh estimate
+            self.frame_ms = None
+            self.fast_frames = 0
+            return True
+        if self.frame_ms < self.headroom * budget and self.level > 0:
+            self.fast_frames += 1
+            if self.fast_frames >= self.patience:
+                self.level -= 1
+                self.frame_ms = None
+                self.fast_frames = 0
+                return True
+        else:
+            self.fast_frames = 0
+        return False
+
+    def quality_name(self) -> str:
+        return QUALITY_LEVELS[self.level][0]
+
 
 class Plotter3D(object):
-    def __init__(self, plotter, mesh, sensor_positions, labels):
+    """
+    Interpolated temperature field on the model.  
+    With lod_levels the field is interpolated only onto the vertices of the rendered level,  
+    full resolution values are computed on demand (export_field, temperatures_at for picked points).  
+    Interpolation operators of the rendered meshes are built once per level (loaded from operator_cache when given).  
+    Sensors with NaN or values outside valid_range are left out, the operators of such subsets are kept in a small LRU  
+    keyed by the validity mask -> a failed sensor costs one solve, not one per frame.  
+    volume_resolution > 0 -> field inside the model on slice planes (VolumeSlices), the surface is drawn translucent.  
+    """
+    def __init__(self, plotter, mesh, sensor_positions, labels, lod_levels=None, lod_selector:LODSelector|None = None,
+                 governor:RenderGovernor|None = None, operator_cache:OperatorCache|None = None,
+                 valid_range:tuple[float, float] = (-273.15, 2000.0), mask_cache_size:int = 4,
+                 interpolation:str = "multiquadric", neighbors:int = 8, ram_budget_mb:int|None = None, precision:str = "auto",
+                 volume_resolution:int = 0, volume_slices:int = len(SLICE_NORMALS)):
         self.plotter = plotter
         self.mesh = mesh
         self.sensor_positions = sensor_positions
@@ -11,15 +114,41 @@ class Plotter3D(object):
         self.plotter.clear()
         
         self.surface = self.mesh.extract_surface()
+        # level 0 = full resolution, then coarser render meshes
+        self.levels = [self.mesh] + list(lod_levels or [])
+        self.lod_selector = lod_selector or LODSelector(len(self.levels))
+        self.level = 0
+        self.frame_ms = None
+        self.model_size = self.mesh.length
         
         self.num_sensors = self.sensor_positions.shape[0]
-        self.points = self.surface.points
+        self.interpolator = make_interpolator(self.sensor_positions, interpolation, neighbors)
+        self.operator_cache = operator_cache
+        # dense operators over the budget -> float32 (auto) and memory mapped from the operator cache
+        self.ram_budget = None if ram_budget_mb is None else int(ram_budget_mb * 2**20)
+        self.precision = precision
+        # level -> operator W (vertices x sensors)
+        self.operators = dict()
+        self.temperatures = None
+        self.labels = list(labels)
+        self.valid_range = valid_range
+        self.valid = np.ones(self.num_sensors, dtype=bool)
+        # (level, mask) -> operator of the valid sensors, most recently used last
+        self.mask_operators = OrderedDict()
+        # (surface interpolator, mask) -> interpolator of the valid sensors, same size as the operator LRU
+        self.mask_interpolators = OrderedDict()
+        self.mask_cache_size = mask_cache_size
+        # update thread vs on-demand reads (picking/export) from the GUI thread
+        self.lock = threading.Lock()
         
         # first init -> random
         initial_temperatures = np.random.uniform(20, 25, self.num_sensors)
-        self.mesh['Temperature'] = self.interpolate_temperatures(initial_temperatures)
+        self.level = self.lod_selector.select(camera_distance=camera_distance(self.plotter, self.mesh), model_size=self.model_size)
+        self.render_mesh = self.levels[self.level]
+        self.points = self.render_mesh.points
+        self.render_mesh['Temperature'] = self.interpolate_temperatures(initial_temperatures)
         
-        self.mesh_actor = self.plotter.add_mesh(self.mesh, scalars='Temperature', cmap='plasma', show_edges=True, interpolate_before_map=True)
+        self.mesh_actor = self.plotter.add_mesh(self.render_mesh, scalars='Temperature', cmap='plasma', show_edges=True, interpolate_before_map=True)
         #self.plotter.add_points(self.sensor_positions, color='black', point_size=25, render_points_as_spheres=True)
         self.plotter.add_point_labels(
             self.sensor_positions,
@@ -28,28 +157,228 @@ class Plotter3D(object):
             font_size=12,
             text_color='white'
         )
-
         
+        self.volume = None
+        if volume_resolution > 0:
+            self.volume = self._make_volume(volume_resolution, volume_slices)
+            if self.volume is not None:
+                self.mesh_actor.GetProperty().SetOpacity(0.25)
         
+        # None -> always full quality
+        self.governor = governor
+        # observers of the shared interactor -> removed in reset, would keep this instance alive otherwise
+        self.observers = []
+        if self.governor is not None:
+            self._apply_quality()
+            if self.plotter.iren is not None:
+                self.observers = [self.plotter.iren.add_observer("StartInteractionEvent", lambda *_: self._set_interacting(True)),
+                                  self.plotter.iren.add_observer("EndInteractionEvent", lambda *_: self._set_interacting(False))]
+
+    def operator(self, level:int):
+        if level not in self.operators:
+            with metrics.stage("plotter3d.operator"):
+                self.operators[level] = build_operator(self.interpolator, self.levels[level], self.operator_cache,
+                                                       self.ram_budget, self.precision)
+        return self.operators[level]
+    
+    def _make_volume(self, resolution:int, slices:int):
+        """
+        Returns:  
+            - VolumeSlices, resolution lowered until the sensors -> voxels operator fits the operator cache  
+              (memory mapped) or the RAM budget without cache, None when nothing fits  
+        """
+        # harmonic is defined on the surface only -> multiquadric inside
+        interpolator = self.interpolator
+        if interpolator.kernel == "harmonic":
+            interpolator = RbfInterpolator(self.sensor_positions)
+        budget = self.operator_cache.max_bytes if self.operator_cache is not None else self.ram_budget
+        precision = self.precision
+        if isinstance(interpolator, KnnInterpolator):
+            # CSR data (float64) + indices (int32)
+            row_bytes = interpolator.k * 12
+        else:
+            # dtype of the requested grid, kept when the resolution is lowered
+            _, dims = grid_dims(self.surface, resolution)
+            dtype = operator_dtype(int(np.prod(dims)), self.num_sensors, self.ram_budget, self.precision)
+            row_bytes = self.num_sensors * dtype.itemsize
+            precision = dtype.name
+        fitted = fit_resolution(self.surface, resolution, row_bytes, budget)
+        if fitted == 0:
+            print(f"Volume disabled: operator does not fit {budget >> 20} MB")
+            return None
+        if fitted < resolution:
+            print(f"Volume resolution lowered {resolution} -> {fitted} (operator budget {budget >> 20} MB)")
+        with metrics.stage("plotter3d.volume_operator"):
+            grid = VoxelGrid(self.surface, fitted)
+            print(f"Volume: {len(grid)} voxels ({' x '.join(str(d) for d in grid.dims)})")
+            W = build_operator(interpolator, grid.cloud(), self.operator_cache, self.ram_budget, precision)
+        return VolumeSlices(self.plotter, grid, W, lambda valid: self._mask_interpolator(valid, interpolator),
+                            SLICE_NORMALS[:slices])
+    
+    def _mask_interpolator(self, valid, interpolator=None):
+        """
+        Arguments:  
+            - interpolator: of the volume when it is not the surface one (harmonic)  
+        Returns:  
+            - interpolator of the valid sensors only (LRU cached like the operators, each holds its own factorization)  
+        """
+        interpolator = self.interpolator if interpolator is None else interpolator
+        key = (interpolator is self.interpolator, valid.tobytes())
+        if key in self.mask_interpolators:
+            self.mask_interpolators.move_to_end(key)
+            return self.mask_interpolators[key]
+        interpolator = interpolator.subset(valid)
+        self.mask_interpolators[key] = interpolator
+        while len(self.mask_interpolators) > self.mask_cache_size:
+            self.mask_interpolators.popitem(last=False)
+        return interpolator
+    
+    def masked_operator(self, level:int, valid):
+        """
+        Returns:  
+            - operator of the valid sensors only (LRU cached)  
+        """
+        key = (level, valid.tobytes())
+        if key in self.mask_operators:
+            self.mask_operators.move_to_end(key)
+            return self.mask_operators[key]
+        with metrics.stage("plotter3d.masked_operator"):
+            W = build_operator(self._mask_interpolator(valid), self.levels[level], self.operator_cache, self.ram_budget, self.precision)
+        self.mask_operators[key] = W
+        while len(self.mask_operators) > self.mask_cache_size:
+            self.mask_operators.popitem(last=False)
+        return W
+    
+    def check_sensors(self, temperatures):
+        """
+        Returns:  
+            - validity mask (finite and within valid_range), changes are reported  
+        """
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(temperatures) & (temperatures >= self.valid_range[0]) & (temperatures <= self.valid_range[1])
+        if not np.array_equal(valid, self.valid):
+            failed = [name for name, ok in zip(self.labels, valid) if not ok]
+            print(f"Invalid sensors: {', '.join(failed) if failed else 'none'}")
+            self.valid = valid
+        metrics.gauge("plotter3d.invalid_sensors", int(self.num_sensors - valid.sum()))
+        return valid
+    
     def interpolate_temperatures(self, temperatures):
-        rbf = Rbf(self.sensor_positions[:, 0], self.sensor_positions[:, 1], self.sensor_positions[:, 2], temperatures, function='multiquadric')
-        return rbf(self.points[:, 0], self.points[:, 1], self.points[:, 2])
+        self.temperatures = np.asarray(temperatures, dtype=float)
+        valid = self.check_sensors(self.temperatures)
+        if valid.all():
+            return self.operator(self.level) @ self.temperatures
+        if not valid.any():
+            return np.full(len(self.points), np.nan)
+        return self.masked_operator(self.level, valid) @ self.temperatures[valid]
+    
+    def temperatures_at(self, points):
+        """
+        Arguments:  
+            - points: (n, 3) positions (e.g. picked points)  
+        Returns:  
+            - interpolated temperatures of the last update  
+        """
+        with self.lock:
+            if self.temperatures is None:
+                raise ValueError("No temperatures interpolated yet")
+            if self.valid.all():
+                return self.interpolator.evaluate(points, self.temperatures)
+            if not self.valid.any():
+                return np.full(len(np.atleast_2d(points)), np.nan)
+            return self._mask_interpolator(self.valid).evaluate(points, self.temperatures[self.valid])
+    
+    def full_resolution_temperatures(self):
+        """
+        Returns:  
+            - temperatures of the last update on every vertex of the full resolution mesh (export)  
+        """
+        with self.lock:
+            if self.temperatures is None:
+                raise ValueError("No temperatures interpolated yet")
+            if self.valid.all():
+                return self.operator(0) @ self.temperatures
+            if not self.valid.any():
+                return np.full(self.mesh.n_points, np.nan)
+            return self.masked_operator(0, self.valid) @ self.temperatures[self.valid]
+    
+    def export_field(self, file_path:str):
+        """
+        Writes the full resolution mesh with the temperatures of the last update (format by extension, e.g. .vtk, .vtu).  
+        """
+        mesh = self.mesh.copy(deep=False)
+        mesh.point_data["Temperature"] = self.full_resolution_temperatures()
+        mesh.save(file_path)
+    
+    def _switch_level(self, level:int):
+        # new render mesh -> interpolated onto its vertices from the next update on
+        self.level = level
+        self.render_mesh = self.levels[level]
+        self.points = self.render_mesh.points
+        self.mesh_actor.GetMapper().SetInputData(self.render_mesh)
+        print(f"LOD level {level}: {self.render_mesh.n_points} vertices")
+    
+    def _set_interacting(self, interacting:bool):
+        self.governor.interacting = interacting
+    
+    def _apply_quality(self):
+        name, edges, interpolate_before_map, every = QUALITY_LEVELS[self.governor.level]
+        self.mesh_actor.GetProperty().SetEdgeVisibility(edges)
+        self.mesh_actor.GetMapper().SetInterpolateScalarsBeforeMapping(interpolate_before_map)
+        rate = "" if every == 1 else f", 1/{every} samples"
+        self.plotter.add_text(f"Quality: {name}{rate}", position='lower_right', font_size=8, color='white', name='render_quality')
     
     def update_temperatures(self, temperatures):
-        self.mesh['Temperature'] = self.interpolate_temperatures(temperatures)
-        self.mesh_actor.GetMapper().SetScalarRange(15, 30)
-        self.mesh_actor.GetMapper().Modified()
-        self.plotter.render()
+        if self.governor is not None and not self.governor.should_render():
+            metrics.count("plotter3d.skipped")
+            return
+        if len(self.levels) > 1:
+            level = self.lod_selector.select(self.frame_ms, camera_distance(self.plotter, self.mesh), self.model_size)
+            if level != self.level:
+                self._switch_level(level)
+        start = time.perf_counter()
+        with self.lock:
+            with metrics.stage("plotter3d.interpolate"):
+                self.render_mesh['Temperature'] = self.interpolate_temperatures(temperatures)
+            if self.volume is not None:
+                with metrics.stage("plotter3d.volume"):
+                    self.volume.update(self.temperatures, self.valid)
+        with metrics.stage("plotter3d.render"):
+            self.mesh_actor.GetMapper().SetScalarRange(15, 30)
+            self.mesh_actor.GetMapper().Modified()
+            self.plotter.render()
+        self.frame_ms = (time.perf_counter() - start) * 1000
+        metrics.gauge("plotter3d.lod_level", self.level)
+        if self.governor is not None:
+            if self.governor.record(self.frame_ms):
+                print(f"Render quality: {self.governor.quality_name()}")
+                # shown with the next frame
+                self._apply_quality()
+            metrics.gauge("plotter3d.quality_level", self.governor.level)
         
     def reset(self):
         """
-        resets to original mesh
+        resets to original mesh  
+        Returns:  
+            - actor of the plain model  
         """
+        for observer in self.observers:
+            self.plotter.iren.remove_observer(observer)
+        self.observers = []
+        # operators/factorizations of the test are released (the instance is kept until the next test)
+        self.operators.clear()
+        self.mask_operators.clear()
+        self.mask_interpolators.clear()
+        if isinstance(self.interpolator, HarmonicInterpolator):
+            self.interpolator.clear()
+        if self.volume is not None:
+            self.volume.close()
+            self.volume = None
         self.plotter.clear()
         # Clear the temperatures from before
         if self.mesh is not None:
-            if 'Temperature' in self.mesh.point_data:
-                del self.mesh.point_data['Temperature']
-        
-        self.plotter.add_mesh(self.mesh, show_edges=True)
+            for level in self.levels:
+                if 'Temperature' in level.point_data:
+                    del level.point_data['Temperature']
         
+        return self.plotter.add_mesh(self.mesh, show_edges=True)
@@ -0,0 +1,92 @@
+import numpy as np
+import pyvista as pv
+from vtkmodules.vtkCommonCore import vtkStringArray
+from vtkmodules.vtkFiltersCore import vtkGlyph3D
+from vtkmodules.vtkFiltersSources import vtkCubeSource
+from vtkmodules.vtkRenderingCore import vtkActor, vtkActor2D, vtkPolyDataMapper
+from vtkmodules.vtkRenderingLabel import vtkPointSetToLabelHierarchy, vtkLabelPlacementMapper
+
+
+class SensorMarkers(object):
+    """
+    All sensor markers as one glyph actor (wireframe cube per point) and all names as one label actor.  
+    Adding/renaming/removing a sensor only changes the arrays of the shared point set.  
+    """
+    def __init__(self, plotter, size:float = 0.05, font_size:int = 12):
+        self.plotter = plotter
+        self.positions = np.empty((0, 3))
+        self.names = []
+        self.points = pv.PolyData()
+
+        cube = vtkCubeSource()
+        cube.SetXLength(size)
+        cube.SetYLength(size)
+        cube.SetZLength(size)
+        self.glyph = vtkGlyph3D()
+        self.glyph.SetInputData(self.points)
+        self.glyph.SetSourceConnection(cube.GetOutputPort())
+        self.glyph.ScalingOff()
+        self.glyph.OrientOff()
+        mapper = vtkPolyDataMapper()
+        mapper.SetInputConnection(self.glyph.GetOutputPort())
+        mapper.ScalarVisibilityOff()
+        self.marker_actor = vtkActor()
+        self.marker_actor.SetMapper(mapper)
+        self.marker_actor.GetProperty().SetRepresentationToWireframe()
+        self.marker_actor.GetProperty().SetColor(1.0, 0.0, 0.0)
+        # picks go through the markers onto the model
+        self.marker_actor.PickableOff()
+
+        hierarchy = vtkPointSetToLabelHierarchy()
+        hierarchy.SetInputData(self.points)
+        hierarchy.SetLabelArrayName("Labels")
+        text = hierarchy.GetTextProperty()
+        text.SetFontSize(font_size)
+        text.SetColor(1.0, 1.0, 1.0)
+        text.SetJustificationToCentered()
+        label_mapper = vtkLabelPlacementMapper()
+        label_mapper.SetInputConnection(hierarchy.GetOutputPort())
+        self.label_actor = vtkActor2D()
+        self.label_actor.SetMapper(label_mapper)
+        self.label_actor.PickableOff()
+        self._sync()
+
+    def _sync(self):
+        self.points.points = self.positions
+        self.points.verts = np.column_stack((np.ones(len(self.positions), dtype=np.int64), np.arange(len(self.positions)))).ravel()
+        labels = vtkStringArray()
+        labels.SetName("Labels")
+        labels.SetNumberOfValues(len(self.names))
+        for i, name in enumerate(self.names):
+            labels.SetValue(i, name)
+        self.points.GetPointData().AddArray(labels)
+        self.points.Modified()
+
+    def show(self):
+        """
+        (Re)adds the two actors, needed after plotter.clear()  
+        """
+        self.plotter.add_actor(self.marker_actor, name="sensor_markers", reset_camera=False, pickable=False)
+        self.plotter.add_actor(self.label_actor, name="sensor_labels", reset_camera=False, pickable=False)
+
+    def set_sensors(self, positions, names:list[str]):
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.names = list(names)
+        self._sync()
+
+    def add(self, position, name:str):
+        self.positions = np.vstack((self.positions, np.asarray(position, dtype=float).reshape(1, 3)))
+        self.names.append(name)
+        self._sync()
+
+    def rename(self, index:int, name:str):
+        self.names[index] = name
+        self._sync()
+
+    def remove(self, index:int):
+        self.positions = np.delete(self.positions, index, axis=0)
+        del self.names[index]
+        self._sync()
+
+    def clear(self):
+        self.set_sensors(np.empty((0, 3)), [])
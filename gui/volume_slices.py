@@ -0,0 +1,78 @@
+import numpy as np
+from model.volume import SLICE_NORMALS
+
+
+class VolumeSlices(object):
+    """
+    Temperature field inside the model on interactive slice planes (one plane widget per slice).  
+    The sensors -> voxels operator W is built once, moving a plane gathers the rows of the voxels around  
+    it into a small slice operator -> every frame only evaluates the points on the slices.  
+    Failed sensors: slice operators of the valid subset are computed from its interpolator (rows only),  
+    subset(valid) hands out the interpolators (Plotter3D mask LRU -> one factorization cache for both).  
+    """
+    def __init__(self, plotter, grid, W, subset, normals=SLICE_NORMALS, clim=(15, 30)):
+        self.plotter = plotter
+        self.grid = grid
+        self.W = W
+        self.subset = subset
+        self.clim = clim
+        self.temperatures = None
+        self.valid = None
+        # per plane: [mesh, S, rows, mask key, slice operator] or None when the plane misses the model
+        self.slices = [None] * len(normals)
+        bounds = [value for low, high in zip(grid.origin, grid.origin + (grid.dims - 1) * grid.spacing) for value in (low, high)]
+        for index, normal in enumerate(normals):
+            self.plotter.add_plane_widget(lambda normal, origin, index=index: self.move(index, normal, origin),
+                                          normal=normal, origin=grid.center, bounds=bounds, normal_rotation=True,
+                                          outline_translation=False, interaction_event="always", implicit=False)
+
+    def _operator(self, entry, valid):
+        key = valid.tobytes()
+        if entry[3] != key:
+            mesh, S, rows = entry[:3]
+            if valid.all():
+                entry[4] = self.grid.slice_operator(S, rows, W=self.W)
+            else:
+                entry[4] = self.grid.slice_operator(S, rows, interpolator=self.subset(valid))
+            entry[3] = key
+        return entry[4]
+
+    def _evaluate(self, entry):
+        mesh = entry[0]
+        if not self.valid.any():
+            mesh["Temperature"] = np.full(mesh.n_points, np.nan)
+            return
+        mesh["Temperature"] = self._operator(entry, self.valid) @ self.temperatures[self.valid]
+
+    def move(self, index:int, normal, origin):
+        mesh, S, rows = self.grid.slice(origin, normal)
+        name = f"volume_slice_{index}"
+        if mesh is None:
+            self.slices[index] = None
+            self.plotter.remove_actor(name)
+            return
+        entry = [mesh, S, rows, None, None]
+        if self.temperatures is not None:
+            self._evaluate(entry)
+        else:
+            mesh["Temperature"] = np.full(mesh.n_points, np.nan)
+        self.slices[index] = entry
+        self.plotter.add_mesh(mesh, scalars="Temperature", cmap="plasma", clim=self.clim, nan_color="gray",
+                              show_scalar_bar=False, name=name, render=False)
+
+    def update(self, temperatures, valid):
+        """
+        Arguments:  
+            - temperatures: sensor temperatures, valid: validity mask (Plotter3D.check_sensors)  
+        """
+        self.temperatures = np.asarray(temperatures, dtype=float)
+        self.valid = valid
+        for entry in list(self.slices):
+            if entry is not None:
+                self._evaluate(entry)
+
+    def close(self):
+        self.plotter.clear_plane_widgets()
+        for index in range(len(self.slices)):
+            self.plotter.remove_actor(f"volume_slice_{index}")
+        self.slices = [None] * len(self.slices)
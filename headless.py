@@ -0,0 +1,129 @@
+"""
+Headless acquisition + recording (no Qt, VTK or matplotlib) for unattended soak tests.  
+Loads a .vizcalor project, starts its data source (calibrations of the LabJack channels are applied  
+by the acquisition) and records every row into CSV, statistics are printed to the console.  
+
+Examples:  
+    python headless.py project.vizcalor --record soak.csv  
+    python headless.py project.vizcalor --record soak.csv --duration 86400 --stats-interval 60  
+    python headless.py project.vizcalor --record soak.csv --source Network=tcp://10.0.0.5:5000  
+"""
+import argparse
+import json
+import queue
+import signal
+import sys
+import threading
+import time
+from data.recorder import Recorder
+from data.supervisor import Gap
+from data.metrics import metrics
+from data.sources import build_data_source, project_sources, validate_meas_config, active_channels, channel_labels
+
+
+class HeadlessRun(object):
+    """
+    Source -> queue -> Recorder, with periodic console statistics.  
+    """
+    def __init__(self, project:dict, sources:list[dict], record_path:str, stats_interval:float = 5.0):
+        self.meas_q = queue.Queue()
+        meas_config = project.get("meas_config", {})
+        uses_device = any(source["type"] == "Device" for source in sources)
+        if uses_device:
+            errors = validate_meas_config(meas_config)
+            if len(errors) > 0:
+                raise ValueError(errors[0])
+        self.data_source = build_data_source(sources, project, self.meas_q, active_channels(meas_config))
+        if uses_device and len(sources) == 1:
+            labels = channel_labels(meas_config)
+        else:
+            labels = [sensor["name"] for sensor in project.get("sensors", [])]
+        self.recorder = Recorder(record_path, labels)
+        self.stats_interval = stats_interval
+        self.end = threading.Event()
+        self.rows = 0
+        self.gaps = 0
+        self.last_row = None
+
+    def run(self, duration:float = 0.0):
+        """
+        Records until stop() (Ctrl+C / SIGTERM) or for duration seconds (0 = no limit).  
+        """
+        start = time.monotonic()
+        next_stats = start + self.stats_interval
+        last_rows = 0
+        last_stats = start
+        self.data_source.start()
+        try:
+            while not self.end.is_set():
+                now = time.monotonic()
+                if duration > 0 and now - start >= duration:
+                    break
+                if now >= next_stats:
+                    self.print_stats(now - start, (self.rows - last_rows) / (now - last_stats))
+                    last_rows, last_stats = self.rows, now
+                    next_stats += self.stats_interval
+                try:
+                    item = self.meas_q.get(timeout=min(0.5, max(0.0, next_stats - now)))
+                except queue.Empty:
+                    continue
+                self.recorder.write(item)
+                if isinstance(item, Gap):
+                    print(f"Data gap: {item}")
+                    self.gaps += 1
+                else:
+                    self.rows += 1
+                    self.last_row = item
+        finally:
+            self.data_source.stop()
+            # rows still waiting in the queue belong to the recording
+            while not self.meas_q.empty():
+                self.recorder.write(self.meas_q.get())
+            self.recorder.close()
+            elapsed = time.monotonic() - start
+            self.print_stats(elapsed, self.rows / elapsed if elapsed > 0 else 0.0)
+
+    def print_stats(self, elapsed:float, rate:float):
+        last = "" if self.last_row is None else " last [" + ", ".join(f"{t:.2f}" for t in self.last_row) + "]"
+        print(f"[{elapsed:9.1f} s] rows {self.rows} ({rate:.1f}/s) gaps {self.gaps} queue {self.meas_q.qsize()}{last}", flush=True)
+
+    def stop(self):
+        self.end.set()
+
+
+def parse_source(text:str) -> dict:
+    source_type, _, value = text.partition("=")
+    if value == "":
+        raise ValueError("Invalid source, should be Type=value (e.g. Stream=/tmp/stream) -> got: ", text)
+    return {"type": source_type, "value": value}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless acquisition and recording of a VizCalor project")
+    parser.add_argument("project", help=".vizcalor project file")
+    parser.add_argument("--record", required=True, help="output CSV file")
+    parser.add_argument("--duration", type=float, default=0.0, help="seconds, 0 = until Ctrl+C")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="seconds between console statistics")
+    parser.add_argument("--source", action="append", default=None,
+                        help="override the project source, Type=value (Device=ANY, Serial=/dev/ttyUSB0, Stream=path, Network=url), repeat to merge")
+    args = parser.parse_args(argv)
+
+    with open(args.project, "r") as f:
+        project = json.load(f)
+    try:
+        sources = [parse_source(s) for s in args.source] if args.source else project_sources(project)
+        run = HeadlessRun(project, sources, args.record, args.stats_interval)
+    except ValueError as e:
+        print(f"Configuration Error: {''.join(str(a) for a in e.args)}", file=sys.stderr)
+        sys.exit(2)
+    signal.signal(signal.SIGINT, lambda *_: run.stop())
+    signal.signal(signal.SIGTERM, lambda *_: run.stop())
+    names = ", ".join(f"{source['type']}: {source['value']}" for source in sources)
+    print(f"Recording {names} -> {args.record}")
+    run.run(args.duration)
+    if metrics.enabled:
+        print(json.dumps(metrics.snapshot(), indent=4))
+
+
+if __name__ == "__main__":
+    main()
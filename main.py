@@ -1,31 +1,47 @@
+import time
+# startup timing report -> measured from the very first import
+STARTUP_T0 = time.perf_counter()
 import sys
 import numpy as np
 import pyvista as pv
 from PyQt5 import QtWidgets, QtCore
 from PyQt5 import QtGui
 from pyvistaqt import QtInteractor
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 import threading
-import time
 import os
 import json
 from gui import live_plotter
-from gui import plotter_3D
-from daq.meas import TemperatureMeas
 from gui.meas_config import DeviceConfigOverlay
 from gui.data_tab import DataSourceTab
 from gui.order_config import TempOrderOverlay
 from gui.serial_config import SerialPortConfigDialog
-from gui.calibrator import CalibrationWindow
+from gui.diagnostics_panel import DiagnosticsPanel
+from gui.sensor_markers import SensorMarkers
+from model.cache import SurfaceCache
+from model.lod import load_lod, LODSelector, LOD_MODES
+from model.sensor_import import read_sensor_csv
+from model.interpolation import INTERPOLATION_METHODS
 import queue
-from data.serial_loader import SerialLoader
-from data.stream_loader import StreamLoader
+from data.recorder import Recorder
+from data.supervisor import Gap
+from data.metrics import metrics
+from data.sources import build_data_source
+# Heavy subsystems are imported on first use (keeps the startup fast, LJM does not have to be installed):
+#   matplotlib canvas -> Plot view opened, scipy.spatial (gui.mesh_loader) -> first model loaded,
+#   scipy (gui.plotter_3D, model.operators) -> test start, gui.field_preview -> Field Preview shown,
+#   calibrator (pandas, matplotlib) -> Calibrator opened, labjack.ljm/serial -> data source built
+STARTUP_IMPORTS = time.perf_counter()
 
 from PyQt5.QtWidgets import QMessageBox
 
 QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_DontUseNativeMenuBar, False)
 
+# project["render"] -> lod_vertices 0 = always render the full resolution model
+DEFAULT_RENDER_CONFIG = {"lod_vertices": 0, "lod_mode": "budget", "frame_budget_ms": 33.0, "distance_factor": 2.5,
+                         "adaptive_quality": True, "operator_cache_mb": 2048, "preview_vertices": 20000,
+                         "interpolation": "multiquadric", "neighbors": 8, "ram_budget_mb": 4096, "operator_precision": "auto",
+                         "volume_resolution": 0, "volume_slices": 3}
+
 def show_error_message(parent, message, title="Configuration Error"):
     msg_box = QMessageBox(parent)
     msg_box.setIcon(QMessageBox.Critical)
@@ -92,9 +108,11 @@ class SensorManager(QtWidgets.QMainWindow):
         self.plotter = QtInteractor(self)
         self.view_stack.addWidget(self.plotter.interactor)
 
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
-        self.view_stack.addWidget(self.canvas)
+        # matplotlib canvas is created when the Plot view is opened for the first time
+        self.figure = None
+        self.canvas = None
+        self.plot_placeholder = QtWidgets.QWidget()
+        self.view_stack.addWidget(self.plot_placeholder)
 
         # Assemble full left layout
         self.left_layout.addLayout(self.top_bar_layout)
@@ -149,6 +167,19 @@ class SensorManager(QtWidgets.QMainWindow):
         self.file_menu.addAction(self.new_project_action)
         self.file_menu.addAction(self.load_project_action)
         self.file_menu.addAction(self.save_project_action)
+        self.file_menu.addSeparator()
+        self.import_sensors_action = QtWidgets.QAction("Import Sensors (CSV)", self)
+        self.file_menu.addAction(self.import_sensors_action)
+        self.import_sensors_action.triggered.connect(self.import_sensors)
+        self.export_field_action = QtWidgets.QAction("Export Temperature Field", self)
+        self.export_field_action.setEnabled(False)
+        self.file_menu.addAction(self.export_field_action)
+        self.export_field_action.triggered.connect(self.export_temperature_field)
+        self.file_menu.addSeparator()
+        self.record_action = QtWidgets.QAction("Record Test Data", self)
+        self.record_action.setCheckable(True)
+        self.file_menu.addAction(self.record_action)
+        self.record_action.triggered.connect(self.toggle_recording)
 
         self.new_project_action.triggered.connect(self.new_project)
         self.load_project_action.triggered.connect(self.load_project)
@@ -168,6 +199,29 @@ class SensorManager(QtWidgets.QMainWindow):
         # Connect it
         self.open_calibrator_action.triggered.connect(self.open_calibration_tool)
         
+        self.view_menu = self.menu.addMenu("View")
+        self.diagnostics_action = QtWidgets.QAction("Diagnostics", self)
+        self.view_menu.addAction(self.diagnostics_action)
+        self.diagnostics_action.triggered.connect(self.open_diagnostics)
+        self.render_settings_action = QtWidgets.QAction("Level of Detail", self)
+        self.view_menu.addAction(self.render_settings_action)
+        self.render_settings_action.triggered.connect(self.open_lod_settings)
+        self.adaptive_quality_action = QtWidgets.QAction("Adaptive Render Quality", self)
+        self.adaptive_quality_action.setCheckable(True)
+        self.adaptive_quality_action.setChecked(DEFAULT_RENDER_CONFIG["adaptive_quality"])
+        self.view_menu.addAction(self.adaptive_quality_action)
+        self.adaptive_quality_action.toggled.connect(self.toggle_adaptive_quality)
+        self.field_preview_action = QtWidgets.QAction("Field Preview", self)
+        self.field_preview_action.setCheckable(True)
+        self.view_menu.addAction(self.field_preview_action)
+        self.field_preview_action.toggled.connect(self.toggle_field_preview)
+        self.interpolation_action = QtWidgets.QAction("Interpolation", self)
+        self.view_menu.addAction(self.interpolation_action)
+        self.interpolation_action.triggered.connect(self.open_interpolation_settings)
+        self.volume_action = QtWidgets.QAction("Volume Slices", self)
+        self.view_menu.addAction(self.volume_action)
+        self.volume_action.triggered.connect(self.open_volume_settings)
+        
          # Connect buttons
         self.load_model_button.clicked.connect(self.load_model)
         self.rename_button.clicked.connect(self.rename_sensor)
@@ -180,10 +234,19 @@ class SensorManager(QtWidgets.QMainWindow):
         self.main_layout.addLayout(self.left_layout, stretch=3)
         self.main_layout.addLayout(self.right_layout, stretch=1)
 
-        # Sensors storage
+        # Sensors storage -> (position, name), drawn by one marker + one label actor
         self.sensors = []
+        self.sensor_markers = SensorMarkers(self.plotter)
         self.mesh = None
         self.model_path = None
+        self.project_path = None
+        self.surface_cache = None
+        self.mesh_loader = None
+        self.projector = None
+        self.model_actor = None
+        self.field_preview = None
+        # sensor name -> last temperature of the previous test (field preview)
+        self.last_readings = dict()
         self.calibrations = {}
 
         self.running = False
@@ -192,25 +255,47 @@ class SensorManager(QtWidgets.QMainWindow):
         
         self.plot_times = []
         self.view_button_plot.setEnabled(False)
+        self.record_path = None
+        self.recorder = None
+        self.live_plotter = None
         
         self.project = dict()
         self.project["serial_config"] = None
         self.project["sensor_order"] = None
+        self.project["render"] = dict(DEFAULT_RENDER_CONFIG)
         
     def update_project_dict(self):
         self.project["meas_config"] = self.device_config_overlay.get_meas_config()
         self.project["model_path"] = self.model_path
-        self.project["sensors"] = [{"position": point.tolist(), "name": name} for point, cube_actor, label_actor, name in self.sensors]
+        self.project["sensors"] = [{"position": point.tolist(), "name": name} for point, name in self.sensors]
         #print("project sensors: ", self.project["sensors"])
         #self.project["serial_config"] = dict() # -> this gets saved every time its changed
         self.project["data_source"] = self.data_source_tab.get_data_sources()
     
+    def toggle_recording(self, checked):
+        if not checked:
+            self.record_path = None
+            return
+        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Record Test Data", "", "CSV Files (*.csv)")
+        if not fileName:
+            self.record_action.setChecked(False)
+            return
+        self.record_path = fileName
+
     def open_calibration_tool(self):
         if not hasattr(self, 'calibration_window'):
+            from gui.calibrator import CalibrationWindow
             self.calibration_window = CalibrationWindow()
         self.calibration_window.show()
         self.calibration_window.raise_()
         self.calibration_window.activateWindow()
+    
+    def open_diagnostics(self):
+        if not hasattr(self, 'diagnostics_panel'):
+            self.diagnostics_panel = DiagnosticsPanel(self)
+        self.diagnostics_panel.show()
+        self.diagnostics_panel.raise_()
+        self.diagnostics_panel.activateWindow()
 
     def open_device_config(self):
         self.device_config_overlay.show()
@@ -221,7 +306,7 @@ class SensorManager(QtWidgets.QMainWindow):
     
     def open_temp_order_overlay(self):
         
-        sensor_names = [s[3] for s in self.sensors]  # assuming sensors are (pos, id, actor, name)
+        sensor_names = [name for _, name in self.sensors]
         if self.temp_order_overlay:
             self.temp_order_overlay.close()
         self.temp_order_overlay = TempOrderOverlay(sensor_names, parent=self, config=self.project["sensor_order"])
@@ -236,12 +321,33 @@ class SensorManager(QtWidgets.QMainWindow):
         self.view_button_3d.setChecked(True)
         self.view_button_plot.setChecked(False)
 
+    def ensure_plot_canvas(self):
+        """
+        Creates the matplotlib canvas of the Plot view (first use), running LivePlotter is attached to it.  
+        """
+        if self.canvas is not None:
+            return
+        t0 = time.perf_counter()
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.view_stack.removeWidget(self.plot_placeholder)
+        self.plot_placeholder.deleteLater()
+        self.view_stack.insertWidget(1, self.canvas)
+        if self.live_plotter is not None:
+            self.live_plotter.attach(self.figure, self.canvas)
+        print(f"Plot view initialized in {time.perf_counter() - t0:.2f} s")
+
     def switch_to_plot_view(self):
+        self.ensure_plot_canvas()
         self.view_stack.setCurrentIndex(1)
         self.view_button_plot.setChecked(True)
         self.view_button_3d.setChecked(False)
     
     def switch_view_tab(self, index):
+        if index == 1:
+            self.ensure_plot_canvas()
         self.view_stack.setCurrentIndex(index)
         
     def open_serial_config_dialog(self):
@@ -251,15 +357,20 @@ class SensorManager(QtWidgets.QMainWindow):
             self.project["serial_config"] = config
     
     def clear_project(self):
+        self.field_preview_action.setChecked(False)
         self.plotter.clear()
         self.sensors.clear()
+        self.sensor_markers.clear()
         self.sensor_list.clear()
         self.model_path = None
+        self.project_path = None
         
         self.device_config_overlay.clear_inputs()
         self.data_source_tab.clear_inputs()
         self.project["serial_config"] = None
         self.project["sensor_order"] = None
+        self.project["render"] = dict(DEFAULT_RENDER_CONFIG)
+        self.adaptive_quality_action.setChecked(self.project["render"]["adaptive_quality"])
         self.update_project_dict()
     
     def new_project(self):
@@ -282,19 +393,16 @@ class SensorManager(QtWidgets.QMainWindow):
         self.update_project_dict()
         with open(fileName, 'w') as f:
             json.dump(self.project, f, indent=4)
+        self.project_path = fileName
 
     def load_sensors(self, sensors:dict):
         for sensor in sensors:
             #print("sensor:", sensor)
-            position = np.array(sensor["position"])
-            name = sensor["name"]
-            cube = pv.Cube(center=position, x_length=0.05, y_length=0.05, z_length=0.05)
-            cube_actor = self.plotter.add_mesh(cube, style='wireframe', color='red')
-            label_actor = self.plotter.add_point_labels(position, [name], font_size=12, text_color='white')
-            self.plotter.disable_picking()
-            self.plotter.enable_surface_point_picking(callback=self.add_sensor, show_point=False)
-            self.sensors.append((position, cube_actor, label_actor, name))
-            self.sensor_list.addItem(name)
+            self.sensors.append((np.array(sensor["position"]), sensor["name"]))
+        self.sensor_markers.set_sensors([point for point, _ in self.sensors], [name for _, name in self.sensors])
+        self.sensor_list.addItems([name for _, name in self.sensors])
+        self.plotter.disable_picking()
+        self.plotter.enable_surface_point_picking(callback=self.add_sensor, show_point=False)
             
     def load_project(self):
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Project", "", "Project Files (*.vizcalor)")
@@ -307,18 +415,27 @@ class SensorManager(QtWidgets.QMainWindow):
                 
             self.new_project()
             
+            self.project_path = fileName
             self.model_path = project.get("model_path", None)
             
             if self.model_path and os.path.exists(self.model_path):
-                self.plotter.clear()
-                self.mesh = pv.read(self.model_path)
-                self.surface = self.mesh.extract_surface()
-                self.plotter.add_mesh(self.surface, show_edges=True)  # Just show the model
-                self.project["model_path"] = self.model_path
+                # rest of the project is applied once the model is loaded
+                self.load_model_async(self.model_path, lambda: self._apply_project(project), self._project_load_failed)
             else:
                 show_error_message(self, "Invalid Path to 3D model.\n Model was either deleted or moved!", "Load Error")
                 self.clear_project()
                 return
+        except Exception as e:
+            self._project_load_failed(e)
+
+    def _project_load_failed(self, e):
+        self.clear_project()
+        print(e)
+        QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load project: {e}")
+
+    def _apply_project(self, project:dict):
+        try:
+            self.project["model_path"] = self.model_path
             #print("Model loaded")
             self.load_sensors(project.get("sensors", []))
         
@@ -326,70 +443,146 @@ class SensorManager(QtWidgets.QMainWindow):
             
             meas_config = project.get("meas_config", dict())
             
-            sensor_names = [sensor[3] for sensor in self.sensors]
+            sensor_names = [name for _, name in self.sensors]
             self.device_config_overlay.load_config(meas_config, sensor_names)
             #print("Meas config loaded")
             self.project["serial_config"] = project.get("serial_config", None)
             self.project["sensor_order"] = project.get("sensor_order", None)
+            self.project["render"] = dict(DEFAULT_RENDER_CONFIG, **project.get("render", {}))
+            self.adaptive_quality_action.setChecked(self.project["render"]["adaptive_quality"])
             self.data_source_tab.load_data_sources(project.get("data_source", {}))
             self.update_project_dict()
             #print("print: Done")
 
         except Exception as e:
-            self.clear_project()
-            print(e)
-            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to load project: {e}")
+            self._project_load_failed(e)
 
 
     def load_model(self):
         options = QtWidgets.QFileDialog.Options()
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open 3D Model", "", "3D Files (*.stl *.obj *.ply)", options=options)
         if fileName:
-            try:
-                self.plotter.clear()
-                self.mesh = pv.read(fileName)
-                self.surface = self.mesh.extract_surface()
-                self.plotter.add_mesh(self.surface, show_edges=True)
+            def loaded():
                 self.plotter.enable_surface_point_picking(callback=self.add_sensor, show_point=False)
                 self.model_path = fileName
-            except Exception as e:
-                print(f"Error loading model: {e}")
-
-    def add_sensor(self, picked_point):
-        if self.mesh is None:
-            return
+            self.load_model_async(fileName, loaded, lambda e: print(f"Error loading model: {e}"))
 
-        picker = self.plotter.iren.interactor.GetPicker()
-        cell_id = picker.GetCellId()
-        if cell_id < 0:
-            return
+    def load_model_async(self, file_path:str, on_loaded, on_failed):
+        """
+        Loads model surface in the background (MeshLoader, cached preprocessed surface) with progress dialog.  
+        Arguments:  
+            - file_path: model file  
+            - on_loaded: called once self.mesh/self.surface are set and shown  
+            - on_failed: called with the error message  
+        """
+        # SurfaceProjector needs scipy.spatial -> imported with the first model, not at startup
+        from gui.mesh_loader import MeshLoader
+        if self.surface_cache is None:
+            try:
+                self.surface_cache = SurfaceCache()
+            except OSError as e:
+                # no writable cache dir -> load without caching
+                print(f"Mesh cache disabled: {e}")
+        progress = QtWidgets.QProgressDialog("Loading model", None, 0, 100, self)
+        progress.setWindowTitle("Loading Model")
+        progress.setWindowModality(QtCore.Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.setValue(0)
+
+        def update_progress(percent, text):
+            progress.setLabelText(text)
+            progress.setValue(percent)
+
+        def loaded(surface, projector):
+            progress.close()
+            self.field_preview_action.setChecked(False)
+            self.plotter.clear()
+            self.mesh = surface
+            self.surface = surface
+            self.projector = projector
+            self.model_actor = self.plotter.add_mesh(self.surface, show_edges=True)  # Just show the model
+            self.sensor_markers.show()
+            on_loaded()
+
+        def failed(message):
+            progress.close()
+            on_failed(message)
+
+        self.mesh_loader = MeshLoader(file_path, self.surface_cache, self)
+        self.mesh_loader.progress.connect(update_progress)
+        self.mesh_loader.loaded.connect(loaded)
+        self.mesh_loader.failed.connect(failed)
+        self.mesh_loader.start()
 
-        cell = self.surface.extract_cells(cell_id)
-        points = cell.points
-        if len(points) != 3:
+    def add_sensor(self, picked_point):
+        if self.mesh is None or self.projector is None:
             return
 
-        A, B, C = points
-        AB = B - A
-        AC = C - A
-        normal = np.cross(AB, AC)
-        normal = normal / np.linalg.norm(normal)
-
-        vec = picked_point - A
-        distance = np.dot(vec, normal)
-        projected_point = picked_point - distance * normal
-
-        cube = pv.Cube(center=projected_point, x_length=0.05, y_length=0.05, z_length=0.05)
-        cube_actor = self.plotter.add_mesh(cube, style='wireframe', color='red')
+        # snap onto the surface (any polygon type)
+        projected_point, _ = self.projector.project(picked_point)
 
         sensor_name = f"Sensor {len(self.sensors)}"
-        label_actor = self.plotter.add_point_labels(projected_point, [sensor_name], font_size=12, text_color='white')
+        self.sensors.append((projected_point, sensor_name))
+        self.sensor_markers.add(projected_point, sensor_name)
+        if self.field_preview is not None:
+            self.field_preview.add(projected_point, sensor_name)
+        self.plotter.render()
 
-        self.sensors.append((projected_point, cube_actor, label_actor, sensor_name))
         self.sensor_list.addItem(sensor_name)
-        sensor_names = [sensor[3] for sensor in self.sensors]
+        sensor_names = [name for _, name in self.sensors]
         self.device_config_overlay.update_ain_sensor_list(sensor_names)
 
+    def import_sensors(self):
+        """
+        Adds sensors from CSV (name, x, y, z[, channel]), all projected onto the surface at once.  
+        """
+        if self.mesh is None or self.projector is None:
+            show_error_message(self, "No 3D model Loaded")
+            return
+        fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import Sensors", "", "CSV Files (*.csv)")
+        if not fileName:
+            return
+        try:
+            names, positions, channels = read_sensor_csv(fileName)
+        except (OSError, ValueError) as e:
+            show_error_message(self, " ".join(str(a) for a in e.args), "Import Error")
+            return
+        current = {name for _, name in self.sensors}
+        existing = [name for name in names if name in current]
+        if existing:
+            show_error_message(self, f"Sensors already exist: {', '.join(existing)}", "Import Error")
+            return
+
+        projected, _ = self.projector.project_many(positions)
+        distances = np.linalg.norm(projected - positions, axis=1)
+        self.sensors.extend(zip(projected, names))
+        self.sensor_markers.set_sensors([point for point, _ in self.sensors], [name for _, name in self.sensors])
+        self.sensor_list.addItems(names)
+        sensor_names = [name for _, name in self.sensors]
+        self.device_config_overlay.update_ain_sensor_list(sensor_names)
+
+        assignments = dict()
+        duplicates = []
+        for name, channel in zip(names, channels):
+            if not channel:
+                continue
+            if channel in assignments:
+                duplicates.append(f"{channel} ({name})")
+                continue
+            assignments[channel] = {"enabled": True, "assigned_sensor": name}
+        if duplicates:
+            print(f"Import: channels assigned more than once, kept the first sensor: {', '.join(duplicates)}")
+        unknown = [channel for channel in assignments if channel not in self.device_config_overlay.ain_channel_names]
+        if unknown:
+            print(f"Import: unknown channels not assigned: {', '.join(unknown)}")
+        self.device_config_overlay.apply_channel_config(assignments)
+        if self.field_preview is not None:
+            # many sensors at once -> one full build instead of incremental updates
+            self.field_preview_action.setChecked(False)
+            self.field_preview_action.setChecked(True)
+        self.plotter.render()
+        print(f"Imported {len(names)} sensors, max distance to surface {distances.max() if len(distances) else 0:.4g}")
+
     def rename_sensor(self):
         selected_items = self.sensor_list.selectedItems()
         if not selected_items:
@@ -403,17 +596,16 @@ class SensorManager(QtWidgets.QMainWindow):
         
         new_name = new_name #f"Sensor {new_number}"
         selected_row = self.sensor_list.currentRow()
-        point, cube_actor, label_actor, _ = self.sensors[selected_row]
-
-        self.plotter.remove_actor(label_actor)
-
-        new_label_actor = self.plotter.add_point_labels(point, [new_name], font_size=12, text_color='white')
-
-        self.sensors[selected_row] = (point, cube_actor, new_label_actor, new_name)
+        point, _ = self.sensors[selected_row]
+        self.sensors[selected_row] = (point, new_name)
+        self.sensor_markers.rename(selected_row, new_name)
+        if self.field_preview is not None:
+            self.field_preview.rename(selected_row, point, new_name)
+        self.plotter.render()
 
         self.sensor_list.item(selected_row).setText(new_name)
         self.rename_input.clear()
-        sensor_names = [sensor[3] for sensor in self.sensors]
+        sensor_names = [name for _, name in self.sensors]
         self.device_config_overlay.update_ain_sensor_list(sensor_names)
 
     def delete_sensor(self):
@@ -423,15 +615,13 @@ class SensorManager(QtWidgets.QMainWindow):
 
         selected_row = self.sensor_list.currentRow()
 
-        point, cube_actor, label_actor, name = self.sensors.pop(selected_row)
-        try:
-            self.plotter.remove_actor(cube_actor)
-            self.plotter.remove_actor(label_actor)
-        except Exception as e:
-            print(f"Warning: failed to remove actor: {e}")
+        self.sensors.pop(selected_row)
+        self.sensor_markers.remove(selected_row)
+        if self.field_preview is not None:
+            self.field_preview.remove(selected_row)
 
         self.sensor_list.takeItem(selected_row)
-        sensor_names = [sensor[3] for sensor in self.sensors]
+        sensor_names = [name for _, name in self.sensors]
         self.device_config_overlay.update_ain_sensor_list(sensor_names)
         self.plotter.render()
         
@@ -445,6 +635,7 @@ class SensorManager(QtWidgets.QMainWindow):
         self.load_model_button.setEnabled(False)
         self.view_button_plot.setEnabled(True)
         self.stop_test_button.setEnabled(True)
+        self.export_field_action.setEnabled(True)
         
     def enable_gui(self): 
         self.rename_button.setEnabled(True)
@@ -456,6 +647,7 @@ class SensorManager(QtWidgets.QMainWindow):
         self.load_model_button.setEnabled(True)
         self.view_button_plot.setEnabled(False)
         self.stop_test_button.setEnabled(False)
+        self.export_field_action.setEnabled(False)
         
     def start_test(self):
         QtCore.QTimer.singleShot(100, self._start_test_internal)
@@ -467,33 +659,125 @@ class SensorManager(QtWidgets.QMainWindow):
         """
         Prepares loader for selected data source
         """
-        source = self.data_source_tab.get_data_source()
-        print("source: ", source)
-        if source["type"] == None:
+        sources = self.data_source_tab.get_active_sources()
+        print("source: ", sources)
+        if len(sources) == 0 or sources[0]["type"] == None:
             show_error_message(self, "No Data Source Selected", "Configuration Error")
             return False
         
-        if source["type"] == "Device":
+        if any(source["type"] == "Device" for source in sources):
             # prepare LabJack reader
             errors = self.device_config_overlay.varify_valid_setup()
             if len(errors) > 0:
                 show_error_message(self, errors[0], "Configuration Error")
                 return False
-            channels = self.device_config_overlay.get_active_channels()
-            meas_config = self.device_config_overlay.get_meas_config()
-            self.data_source = TemperatureMeas(channels, meas_config, self.meas_q)
-        elif source["type"] == "Serial":
-            if self.project["serial_config"] is None:
-                show_error_message(self, "Serial Port Not Configured")
-                return False
-            self.data_source = SerialLoader(source["value"], self.project["serial_config"], self.meas_q)
-        elif source["type"] == "Stream":
-            self.data_source = StreamLoader(source["value"], self.meas_q)
-        else:
-            show_error_message(self, f"Data source - {source['type']}: Not yet implemented")
+        # current state of the device config overlay (not only the saved one)
+        project = dict(self.project, meas_config=self.device_config_overlay.get_meas_config())
+        try:
+            self.data_source = build_data_source(sources, project, self.meas_q, self.device_config_overlay.get_active_channels())
+        except ValueError as e:
+            show_error_message(self, e.args[0])
             return False
         return True
     
+    def toggle_field_preview(self, checked):
+        if not checked:
+            if self.field_preview is not None:
+                self.field_preview.close()
+                self.field_preview = None
+                if self.model_actor is not None:
+                    self.model_actor.SetVisibility(True)
+                self.plotter.render()
+            return
+        if self.mesh is None:
+            self.field_preview_action.setChecked(False)
+            show_error_message(self, "No 3D model Loaded")
+            return
+        # scipy.linalg -> imported when the preview is first shown
+        from gui.field_preview import FieldPreview
+        # preview keeps a kernel column per sensor for every vertex -> decimated mesh
+        try:
+            preview_surface = load_lod(self.model_path, self.project["render"]["preview_vertices"], self.surface_cache, self.surface)
+        except Exception as e:
+            print(f"Preview on full resolution: {e}")
+            preview_surface = self.surface
+        if self.model_actor is not None:
+            self.model_actor.SetVisibility(False)
+        self.field_preview = FieldPreview(self.plotter, preview_surface, [point for point, _ in self.sensors],
+                                          [name for _, name in self.sensors], self.last_readings)
+        self.plotter.render()
+
+    def open_interpolation_settings(self):
+        render = self.project["render"]
+        method, ok = QtWidgets.QInputDialog.getItem(self, "Interpolation", "Method (idw/wendland = nearest sensors only, harmonic = along the surface):",
+                                                    list(INTERPOLATION_METHODS), INTERPOLATION_METHODS.index(render["interpolation"]), False)
+        if not ok:
+            return
+        if method != "multiquadric":
+            neighbors, ok = QtWidgets.QInputDialog.getInt(self, "Interpolation", "Nearest sensors:", render["neighbors"], 1, 64)
+            if not ok:
+                return
+            render["neighbors"] = neighbors
+        render["interpolation"] = method
+
+    def open_volume_settings(self):
+        render = self.project["render"]
+        resolution, ok = QtWidgets.QInputDialog.getInt(self, "Volume Slices", "Voxels along the longest side (0 = surface only):",
+                                                       render["volume_resolution"], 0, 512, 16)
+        if not ok:
+            return
+        if resolution > 0:
+            slices, ok = QtWidgets.QInputDialog.getInt(self, "Volume Slices", "Slice planes:", render["volume_slices"], 1, 3)
+            if not ok:
+                return
+            render["volume_slices"] = slices
+        render["volume_resolution"] = resolution
+
+    def toggle_adaptive_quality(self, checked):
+        self.project["render"]["adaptive_quality"] = checked
+
+    def open_lod_settings(self):
+        render = self.project["render"]
+        target, ok = QtWidgets.QInputDialog.getInt(self, "Level of Detail", "Render mesh vertices (0 = full resolution):",
+                                                   render["lod_vertices"], 0, 10_000_000, 1000)
+        if not ok:
+            return
+        mode, ok = QtWidgets.QInputDialog.getItem(self, "Level of Detail", "Switch level by:", list(LOD_MODES),
+                                                  LOD_MODES.index(render["lod_mode"]), False)
+        if ok:
+            render["lod_vertices"] = target
+            render["lod_mode"] = mode
+
+    def _make_lod(self):
+        """
+        Returns:  
+            - decimated render meshes (cached per model) and their LODSelector, (None, None) when disabled  
+        """
+        render = self.project["render"]
+        if render["lod_vertices"] <= 0 or self.model_path is None:
+            return None, None
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            lod = load_lod(self.model_path, render["lod_vertices"], self.surface_cache, self.surface)
+        except Exception as e:
+            print(f"LOD disabled: {e}")
+            return None, None
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        if lod is self.surface:
+            return None, None
+        selector = LODSelector(2, render["lod_mode"], render["frame_budget_ms"], render["distance_factor"])
+        return [lod], selector
+
+    def _make_operator_cache(self):
+        from model.operators import OperatorCache, operator_cache_dir
+        try:
+            return OperatorCache(operator_cache_dir(self.project_path), int(self.project["render"]["operator_cache_mb"] * 2**20))
+        except OSError as e:
+            # not writable -> operators only kept in memory
+            print(f"Operator cache disabled: {e}")
+            return None
+
     def _start_test_internal(self):
 
         
@@ -506,17 +790,40 @@ class SensorManager(QtWidgets.QMainWindow):
             # some error 
             return
         
+        self.field_preview_action.setChecked(False)
         self.plotter.clear()
         self.disable_gui()    
         
-        self.sensor_positions = np.array([point for point, _, _, _ in self.sensors])        
+        self.sensor_positions = np.array([point for point, _ in self.sensors])
         self.num_sensors = self.sensor_positions.shape[0]
         self.temperatures = np.random.uniform(20, 25, self.num_sensors)
         
         
-        labels = [s[3] for s in self.sensors]
+        labels = [name for _, name in self.sensors]
+        from gui import plotter_3D
         self.live_plotter = live_plotter.LivePlotter(self.figure, self.canvas, labels)
-        self.plotter_3D = plotter_3D.Plotter3D(self.plotter, self.mesh, self.sensor_positions, labels)
+        lod_levels, lod_selector = self._make_lod()
+        governor = None
+        if self.project["render"]["adaptive_quality"]:
+            governor = plotter_3D.RenderGovernor(self.project["render"]["frame_budget_ms"])
+        # operators (and the voxel operator of the volume slices) are built here -> can take a while
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            self.plotter_3D = plotter_3D.Plotter3D(self.plotter, self.mesh, self.sensor_positions, labels, lod_levels, lod_selector, governor,
+                                                   self._make_operator_cache(),
+                                                   interpolation=self.project["render"]["interpolation"],
+                                                   neighbors=self.project["render"]["neighbors"],
+                                                   ram_budget_mb=self.project["render"]["ram_budget_mb"],
+                                                   precision=self.project["render"]["operator_precision"],
+                                                   volume_resolution=self.project["render"]["volume_resolution"],
+                                                   volume_slices=self.project["render"]["volume_slices"])
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        # picks read the field while the test runs instead of adding sensors
+        self.plotter.disable_picking()
+        self.plotter.enable_surface_point_picking(callback=self.read_temperature, show_point=False)
+        if self.record_path is not None:
+            self.recorder = Recorder(self.record_path, labels)
         
         #self.refresh_interval = 1.0 / self.refresh_slider.value()
         # Update thread
@@ -528,6 +835,36 @@ class SensorManager(QtWidgets.QMainWindow):
         self.data_source.start()
         
         
+    def read_temperature(self, picked_point):
+        """
+        Shows the interpolated temperature at the picked point (full resolution, not the rendered level).  
+        """
+        try:
+            value = float(self.plotter_3D.temperatures_at(picked_point)[0])
+        except ValueError:
+            return
+        self.plotter.add_point_labels(np.atleast_2d(picked_point), [f"{value:.2f} °C"], point_size=10, font_size=12,
+                                      text_color="white", name="picked_temperature", render=False)
+        print(f"Temperature at {np.round(picked_point, 4)}: {value:.2f} °C")
+
+    def export_temperature_field(self):
+        """
+        Saves the full resolution model with the temperatures of the last update (.vtk/.vtu).  
+        """
+        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Temperature Field", "", "VTK Files (*.vtk *.vtu)")
+        if not fileName:
+            return
+        # full resolution operator may still have to be built
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            self.plotter_3D.export_field(fileName)
+        except (OSError, ValueError) as e:
+            show_error_message(self, " ".join(str(a) for a in e.args), "Export Error")
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        print(f"Temperature field exported to {fileName}")
+
     def stop_test(self):
         self.running = False
         if self.update_thread is not None:
@@ -535,16 +872,22 @@ class SensorManager(QtWidgets.QMainWindow):
             
         if self.data_source is not None:
             self.data_source.stop() # TODO: Unblock the update thread somehow
+        
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+            # next test would overwrite the file -> has to be chosen again
+            self.record_path = None
+            self.record_action.setChecked(False)
             
         self.plotter.clear()
 
         if self.mesh is not None:
-            self.plotter_3D.reset()
+            if self.plotter_3D.temperatures is not None:
+                self.last_readings = dict(zip(self.plotter_3D.labels, self.plotter_3D.temperatures))
+            self.model_actor = self.plotter_3D.reset()
             
-            for point, cube_actor, label_actor, name in self.sensors:
-                cube = pv.Cube(center=point, x_length=0.05, y_length=0.05, z_length=0.05)
-                self.plotter.add_mesh(cube, style='wireframe', color='red')
-                self.plotter.add_point_labels(point, [name], font_size=12, text_color='white')
+            self.sensor_markers.show()
             self.plotter.disable_picking()
             self.plotter.enable_surface_point_picking(callback=self.add_sensor, show_point=False)
 
@@ -557,9 +900,22 @@ class SensorManager(QtWidgets.QMainWindow):
             #self.plotter.iren.interrupt()
             #self.temperatures += np.random.uniform(-3, 3, self.num_sensors)
             #self.temperatures = np.clip(self.temperatures, 20, 80)
-            temps = self.meas_q.get()
-            self.plotter_3D.update_temperatures(temps)
-            self.live_plotter.update(temps)
+            with metrics.stage("pipeline.wait"):
+                temps = self.meas_q.get()
+            metrics.gauge("pipeline.queue_depth", self.meas_q.qsize())
+            if self.recorder is not None:
+                with metrics.stage("pipeline.record"):
+                    self.recorder.write(temps)
+            if isinstance(temps, Gap):
+                # source reconnected -> show the missing interval as a break in the plot
+                print(f"Data gap: {temps}")
+                metrics.count("pipeline.gaps")
+                self.live_plotter.add_gap()
+                continue
+            with metrics.stage("pipeline.update"):
+                self.plotter_3D.update_temperatures(temps)
+                self.live_plotter.update(temps)
+            metrics.count("pipeline.rows")
             #time.sleep(self.refresh_interval)
     
 
@@ -579,4 +935,10 @@ if __name__ == "__main__":
     app.setOrganizationName("SimonPechacek")
     window = SensorManager()
     window.show()
+    startup_window = time.perf_counter()
+    def report_startup():
+        now = time.perf_counter()
+        print(f"Startup: imports {STARTUP_IMPORTS - STARTUP_T0:.2f} s, window {startup_window - STARTUP_IMPORTS:.2f} s, "
+              f"first event loop {now - startup_window:.2f} s, total {now - STARTUP_T0:.2f} s")
+    QtCore.QTimer.singleShot(0, report_startup)
     sys.exit(app.exec_())
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pyvista as pv
+
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> str:
+    """
+    VIZCALOR_CACHE_DIR or ~/.cache/vizcalor  
+    """
+    return os.environ.get("VIZCALOR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "vizcalor"))
+
+
+def _atomic_write_json(file_path:str, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, file_path)
+
+
+class SurfaceCache(object):
+    """
+    Preprocessed surfaces of the 3D models (extracted surface + point normals + connectivity) as .npy files,  
+    loaded memory mapped -> reopening a model skips reading/extracting/normals completely.  
+    Entries are keyed by the content hash of the model file, the index remembers hash of (path, size, mtime),  
+    so an unchanged file is not even hashed again.  
+    """
+    def __init__(self, cache_dir:str|None = None):
+        self.cache_dir = os.path.join(cache_dir or default_cache_dir(), "meshes")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return dict()
+
+    def key(self, file_path:str, progress=None) -> str:
+        """
+        Arguments:  
+            - file_path: model file  
+            - progress: callback(fraction, text) while hashing  
+        Returns:  
+            - content hash of the file (cache key)  
+        """
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        index = self._read_index()
+        entry = index.get(file_path, None)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["hash"]
+        digest = hashlib.blake2b(digest_size=20)
+        done = 0
+        with open(file_path, "rb") as f:
+            while True:
+                chunk = f.read(1 << 23)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                done += len(chunk)
+                if progress is not None:
+                    progress(done / max(stat.st_size, 1), "Hashing model")
+        key = digest.hexdigest()
+        index = self._read_index()
+        index[file_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": key}
+        _atomic_write_json(self.index_path, index)
+        return key
+
+    def entry_dir(self, key:str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key:str):
+        """
+        Returns:  
+            - cached surface (pv.PolyData, arrays memory mapped) or None  
+        """
+        entry_dir = self.entry_dir(key)
+        if not os.path.exists(os.path.join(entry_dir, "meta.json")):
+            return None
+        try:
+            with open(os.path.join(entry_dir, "meta.json"), "r") as f:
+                meta = json.load(f)
+            if meta.get("version") != CACHE_VERSION:
+                return None
+            points = np.load(os.path.join(entry_dir, "points.npy"), mmap_mode="r")
+            faces = np.load(os.path.join(entry_dir, "faces.npy"), mmap_mode="r")
+            normals = np.load(os.path.join(entry_dir, "normals.npy"), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"Mesh cache miss ({key}): {e}")
+            return None
+        if meta["regular_faces"]:
+            surface = pv.PolyData.from_regular_faces(points, faces)
+        else:
+            surface = pv.PolyData(points, faces)
+        # normals, not scalars -> the model is not colored by them
+        surface.point_data.set_array(normals, "Normals")
+        surface.point_data.active_normals_name = "Normals"
+        return surface
+
+    def store(self, key:str, surface):
+        """
+        Writes the surface into the cache (written into temporary dir first -> never half written entry).  
+        """
+        entry_dir = self.entry_dir(key)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp_")
+        try:
+            regular = bool(surface.is_all_triangles)
+            faces = surface.regular_faces if regular else np.asarray(surface.faces)
+            np.save(os.path.join(tmp_dir, "points.npy"), np.asarray(surface.points))
+            np.save(os.path.join(tmp_dir, "faces.npy"), faces)
+            np.save(os.path.join(tmp_dir, "normals.npy"), np.asarray(surface.point_data["Normals"], dtype=np.float32))
+            _atomic_write_json(os.path.join(tmp_dir, "meta.json"), {
+                "version": CACHE_VERSION,
+                "regular_faces": regular,
+                "n_points": int(surface.n_points),
+                "n_cells": int(surface.n_cells),
+            })
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.replace(tmp_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+
+def preprocess_surface(mesh):
+    """
+    Surface used for the visualization/picking + point normals.  
+    """
+    surface = mesh.extract_surface()
+    return surface.compute_normals(cell_normals=False, split_vertices=False)
+
+
+def load_surface(file_path:str, cache:SurfaceCache|None = None, progress=None):
+    """
+    Loads model surface, from the cache if possible (otherwise read + preprocess + store).  
+    Arguments:  
+        - file_path: .stl/.obj/.ply/... model  
+        - cache: SurfaceCache (None -> no caching)  
+        - progress: callback(fraction, text)  
+    Returns:  
+        - pv.PolyData surface with "Normals" point data  
+    """
+    def report(fraction, text):
+        if progress is not None:
+            progress(fraction, text)
+
+    key = None
+    if cache is not None:
+        key = cache.key(file_path, lambda f, text: report(0.3 * f, text))
+        report(0.3, "Loading cached surface")
+        surface = cache.load(key)
+        if surface is not None:
+            report(1.0, "Done")
+            return surface
+    report(0.3, "Reading model")
+    mesh = pv.read(file_path)
+    report(0.6, "Extracting surface")
+    surface = preprocess_surface(mesh)
+    if cache is not None:
+        report(0.85, "Writing cache")
+        try:
+            cache.store(key, surface)
+            # reopen memory mapped -> same memory behaviour as a cache hit
+            cached = cache.load(key)
+            if cached is not None:
+                surface = cached
+        except OSError as e:
+            print(f"Mesh cache write failed: {e}")
+    report(1.0, "Done")
+    return surface
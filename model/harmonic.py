@@ -0,0 +1,144 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+from scipy.spatial import cKDTree
+
+
+def cotangent_laplacian(points, triangles):
+    """
+    Arguments:  
+        - points: (n, 3) vertices  
+        - triangles: (m, 3) vertex indices  
+    Returns:  
+        - (n, n) sparse Laplacian L (positive semi-definite, rows sum to 0), edge weight = (cot a + cot b) / 2  
+    """
+    points = np.asarray(points, dtype=float)
+    i, j, k = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    rows, cols, weights = [], [], []
+    # cotangent of the angle at each corner weights the opposite edge
+    for a, b, c in ((i, j, k), (j, k, i), (k, i, j)):
+        u = points[b] - points[a]
+        v = points[c] - points[a]
+        cross = np.linalg.norm(np.cross(u, v), axis=1)
+        cot = np.einsum("ij,ij->i", u, v) / np.maximum(cross, 1e-300)
+        rows.append(b)
+        cols.append(c)
+        weights.append(0.5 * cot)
+    rows, cols, weights = np.concatenate(rows), np.concatenate(cols), np.concatenate(weights)
+    n = len(points)
+    W = coo_matrix((weights, (rows, cols)), shape=(n, n)).tocsr()
+    W = W + W.T
+    # obtuse triangles give negative weights -> clamped, keeps the maximum principle (no over/undershoots)
+    W.data = np.maximum(W.data, 1e-8 * np.abs(W.data).mean() if W.nnz else 0.0)
+    degree = np.asarray(W.sum(axis=1)).ravel()
+    return (coo_matrix((degree, (np.arange(n), np.arange(n))), shape=(n, n)) - W).tocsr()
+
+
+class HarmonicOperator(object):
+    """
+    Harmonic field on the surface with the sensor vertices fixed, L_ff x_f = -L_fc t_c factorized once,  
+    every update is just the back substitution. Vertices of mesh parts without a sensor are NaN.  
+    """
+    def __init__(self, laplacian, constrained, average, solvable):
+        n = laplacian.shape[0]
+        self.shape = (n, average.shape[1])
+        self.constrained = constrained
+        self.average = average
+        self.free = np.setdiff1d(np.nonzero(solvable)[0], constrained)
+        self.L_fc = laplacian[self.free][:, constrained]
+        self.lu = None
+        if len(self.free):
+            # SPD -> symmetric ordering without pivoting keeps the fill-in low
+            self.lu = splu(laplacian[self.free][:, self.free].tocsc(), permc_spec="MMD_AT_PLUS_A",
+                           diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+
+    def __matmul__(self, temperatures):
+        fixed = self.average @ np.asarray(temperatures, dtype=float)
+        result = np.full(self.shape[0], np.nan)
+        result[self.constrained] = fixed
+        if self.lu is not None:
+            result[self.free] = self.lu.solve(-(self.L_fc @ fixed))
+        return result
+
+
+class HarmonicInterpolator(object):
+    """
+    Surface aware interpolation: solves the Laplace equation on the mesh (cotangent weights) with the  
+    temperatures of the sensors (snapped to their nearest vertex) as constraints -> heat does not jump  
+    across gaps or thin walls like with the 3D distance based methods.  
+    Factorizations are kept in memory per mesh and sensor set (small LRU shared with the subsets of the  
+    interpolator, released with it or by clear()).  
+    """
+    kernel = "harmonic"
+
+    def __init__(self, sensor_positions, factorizations:OrderedDict|None = None, max_factorizations:int = 4):
+        self.sensor_positions = np.asarray(sensor_positions, dtype=float)
+        self.factorizations = OrderedDict() if factorizations is None else factorizations
+        self.max_factorizations = max_factorizations
+        # (vertices, key) of the last operator -> evaluate, the mesh itself is not kept
+        self.last = None
+
+    def params(self) -> dict:
+        return {"kernel": self.kernel}
+
+    def subset(self, valid):
+        return HarmonicInterpolator(self.sensor_positions[valid], self.factorizations, self.max_factorizations)
+
+    def clear(self):
+        self.factorizations.clear()
+        self.last = None
+
+    def _key(self, mesh) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(np.ascontiguousarray(mesh.points, dtype=float).data)
+        digest.update(np.ascontiguousarray(mesh.faces).data)
+        digest.update(np.ascontiguousarray(self.sensor_positions).data)
+        return digest.hexdigest()
+
+    def operator(self, mesh):
+        """
+        Arguments:  
+            - mesh: surface (pv.PolyData), triangulated here when needed  
+        Returns:  
+            - HarmonicOperator (operator @ temperatures -> vertex temperatures)  
+        """
+        key = self._key(mesh)
+        if key in self.factorizations:
+            self.factorizations.move_to_end(key)
+            self.last = (mesh.points, key)
+            return self.factorizations[key]
+        triangles = mesh if mesh.is_all_triangles else mesh.triangulate()
+        # triangulation keeps the points -> field is valid for the vertices of mesh
+        faces = triangles.regular_faces
+        points = np.asarray(mesh.points, dtype=float)
+        laplacian = cotangent_laplacian(points, faces)
+        n = len(points)
+        _, nearest = cKDTree(points).query(self.sensor_positions)
+        constrained, sensor_vertex = np.unique(nearest, return_inverse=True)
+        # sensors snapped onto the same vertex -> their mean
+        counts = np.bincount(sensor_vertex)
+        average = csr_matrix((1.0 / counts[sensor_vertex], (sensor_vertex, np.arange(len(nearest)))),
+                             shape=(len(constrained), len(nearest)))
+        # mesh parts without a sensor have no solution
+        _, labels = connected_components(laplacian, directed=False)
+        solvable = np.isin(labels, labels[constrained])
+        operator = HarmonicOperator(laplacian, constrained, average, solvable)
+        self.factorizations[key] = operator
+        while len(self.factorizations) > self.max_factorizations:
+            self.factorizations.popitem(last=False)
+        self.last = (mesh.points, key)
+        return operator
+
+    def evaluate(self, points, temperatures):
+        """
+        Temperatures at arbitrary points = value of their nearest vertex of the last mesh.  
+        """
+        if self.last is None or self.last[1] not in self.factorizations:
+            raise ValueError("Harmonic interpolation needs the mesh operator first")
+        vertices, key = self.last
+        operator = self.factorizations[key]
+        _, nearest = cKDTree(vertices).query(np.atleast_2d(points))
+        return (operator @ temperatures)[nearest]
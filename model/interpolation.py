@@ -0,0 +1,5 @@
+# interpolation settings of project["render"], no scipy here -> importable at GUI startup
+# multiquadric = global RBF (dense operator), idw/wendland = k nearest sensors (sparse operator),
+# harmonic = Laplace equation on the surface (sparse factorization)
+INTERPOLATION_METHODS = ("multiquadric", "idw", "wendland", "harmonic")
+PRECISIONS = ("auto", "float32", "float64")
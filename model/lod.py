@@ -0,0 +1,102 @@
+import numpy as np
+from .cache import SurfaceCache, load_surface
+
+LOD_MODES = ("budget", "distance")
+
+
+def decimate_surface(surface, target_points:int):
+    """
+    Arguments:  
+        - surface: full resolution surface  
+        - target_points: wanted vertex count (approximate)  
+    Returns:  
+        - decimated surface with point normals (surface itself when it is already small enough)  
+    """
+    if target_points <= 0:
+        raise ValueError("LOD vertex target has to be positive -> got: ", target_points)
+    if surface.n_points <= target_points:
+        return surface
+    reduction = 1.0 - target_points / surface.n_points
+    decimated = surface.triangulate().decimate(reduction)
+    return decimated.compute_normals(cell_normals=False, split_vertices=False)
+
+
+def load_lod(file_path:str, target_points:int, cache:SurfaceCache|None = None, surface=None):
+    """
+    Decimated render mesh of the model, cached next to the full surface (key = model hash + target).  
+    Arguments:  
+        - surface: already loaded full surface (read from file_path when needed otherwise)  
+    Returns:  
+        - pv.PolyData render mesh  
+    """
+    key = None
+    if cache is not None:
+        key = f"{cache.key(file_path)}_lod{target_points}"
+        lod = cache.load(key)
+        if lod is not None:
+            return lod
+    if surface is None:
+        surface = load_surface(file_path, cache)
+    lod = decimate_surface(surface, target_points)
+    if cache is not None and lod is not surface:
+        try:
+            cache.store(key, lod)
+        except OSError as e:
+            print(f"Mesh cache write failed: {e}")
+    return lod
+
+
+class LODSelector(object):
+    """
+    Chooses the rendered level (0 = full resolution, higher = coarser).  
+    Modes:  
+        - budget: one level coarser when the frame takes longer than frame_budget_ms, one finer only when the  
+          last measured frame time of the finer level fits (no flipping between two levels every frame),  
+          the measurements are forgotten every probe_interval frames -> finer level is tried again  
+        - distance: coarse level when the camera is further than distance_factor * model size  
+    """
+    def __init__(self, levels:int, mode:str = "budget", frame_budget_ms:float = 33.0, distance_factor:float = 2.5, probe_interval:int = 200):
+        if mode not in LOD_MODES:
+            raise ValueError("Unknown LOD mode -> got: ", mode)
+        self.levels = levels
+        self.mode = mode
+        self.frame_budget_ms = frame_budget_ms
+        self.distance_factor = distance_factor
+        self.probe_interval = probe_interval
+        self.level = 0
+        self.frame_costs = dict()
+        self.frames = 0
+
+    def select(self, frame_ms:float|None = None, camera_distance:float|None = None, model_size:float|None = None) -> int:
+        """
+        Arguments:  
+            - frame_ms: duration of the last frame (rendered at the current level)  
+        Returns:  
+            - level to render next  
+        """
+        if self.levels <= 1:
+            return 0
+        if self.mode == "distance":
+            if camera_distance is not None and model_size:
+                far = camera_distance > self.distance_factor * model_size
+                self.level = self.levels - 1 if far else 0
+        elif frame_ms is not None:
+            self.frame_costs[self.level] = frame_ms
+            self.frames += 1
+            if self.frames % self.probe_interval == 0:
+                self.frame_costs = {self.level: frame_ms}
+            if frame_ms > self.frame_budget_ms:
+                self.level = min(self.level + 1, self.levels - 1)
+            elif self.level > 0 and self.frame_costs.get(self.level - 1, 0.0) <= self.frame_budget_ms:
+                self.level -= 1
+        return self.level
+
+
+def camera_distance(plotter, mesh) -> float:
+    """
+    Returns:  
+        - distance of the camera from the model, zooming (view angle) counted in as moving the camera  
+    """
+    camera = plotter.camera
+    distance = np.linalg.norm(np.asarray(camera.position) - np.asarray(mesh.center))
+    return float(distance * np.tan(np.radians(camera.view_angle / 2)) / np.tan(np.radians(15.0)))
@@ -0,0 +1,491 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve, qr, qr_insert, qr_delete, solve_triangular
+from scipy.sparse import csr_matrix, issparse
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+from .cache import default_cache_dir, _atomic_write_json
+from .harmonic import HarmonicInterpolator
+from .interpolation import INTERPOLATION_METHODS, PRECISIONS
+
+OPERATOR_VERSION = 1
+# rows of one build/row sum chunk ~ this many bytes of the operator -> bounded temporaries
+CHUNK_BYTES = 4 << 20
+
+
+def row_chunks(n_rows:int, row_bytes:int, chunk_bytes:int = CHUNK_BYTES) -> list[tuple[int, int]]:
+    rows = max(256, chunk_bytes // max(row_bytes, 1))
+    return [(start, min(start + rows, n_rows)) for start in range(0, n_rows, rows)]
+
+
+def rbf_epsilon(sensor_positions, fallback:float = 1.0):
+    """
+    Returns:  
+        - default multiquadric epsilon of scipy.interpolate.Rbf (average distance between the nodes),  
+          fallback when the nodes have no extent (single or coincident nodes)  
+    """
+    sensor_positions = np.asarray(sensor_positions, dtype=float)
+    if len(sensor_positions) == 0:
+        return fallback
+    edges = sensor_positions.max(axis=0) - sensor_positions.min(axis=0)
+    edges = edges[np.nonzero(edges)]
+    if edges.size == 0:
+        return fallback
+    return float(np.power(np.prod(edges) / len(sensor_positions), 1.0 / edges.size))
+
+
+def multiquadric(points, sensor_positions, epsilon:float):
+    """
+    Returns:  
+        - (len(points), len(sensor_positions)) kernel matrix sqrt((r / epsilon)^2 + 1)  
+    """
+    r = cdist(points, sensor_positions)
+    return np.sqrt((r / epsilon) ** 2 + 1)
+
+
+class RbfInterpolator(object):
+    """
+    Same field as scipy.interpolate.Rbf(function='multiquadric'), the sensor matrix A is factorized once.  
+    Linear in the temperatures -> on fixed points the whole interpolation is the operator W = Phi @ inv(A),  
+    every update is then just W @ temperatures.  
+    """
+    kernel = "multiquadric"
+
+    def __init__(self, sensor_positions, epsilon:float|None = None):
+        self.sensor_positions = np.asarray(sensor_positions, dtype=float)
+        self.epsilon = rbf_epsilon(self.sensor_positions) if epsilon is None else epsilon
+        self.lu = lu_factor(multiquadric(self.sensor_positions, self.sensor_positions, self.epsilon))
+
+    def params(self) -> dict:
+        return {"kernel": self.kernel, "epsilon": self.epsilon}
+
+    def subset(self, valid):
+        """
+        Returns:  
+            - interpolator of the valid sensors, same epsilon -> field does not change shape when a sensor drops out  
+        """
+        return RbfInterpolator(self.sensor_positions[valid], self.epsilon)
+
+    def weights(self, temperatures):
+        return lu_solve(self.lu, np.asarray(temperatures, dtype=float))
+
+    def evaluate(self, points, temperatures):
+        """
+        Interpolated temperatures on arbitrary points (no operator).  
+        """
+        return multiquadric(np.atleast_2d(points), self.sensor_positions, self.epsilon) @ self.weights(temperatures)
+
+    def operator(self, points, dtype=np.float64, out=None):
+        """
+        Arguments:  
+            - dtype: float32 halves the memory, computed in float64 anyway  
+            - out: array to fill (e.g. memory mapped file -> operator larger than the RAM)  
+        Returns:  
+            - (len(points), n_sensors) operator W  
+        """
+        points = np.asarray(points, dtype=float)
+        n = len(self.sensor_positions)
+        W = np.empty((len(points), n), dtype=dtype) if out is None else out
+
+        def build(chunk):
+            start, end = chunk
+            phi = multiquadric(points[start:end], self.sensor_positions, self.epsilon)
+            # W = Phi A^-1 -> W^T = A^-T Phi^T
+            W[start:end] = lu_solve(self.lu, phi.T, trans=1).T
+
+        for chunk in row_chunks(len(points), 8 * n):
+            build(chunk)
+        return W
+
+
+class KnnInterpolator(object):
+    """
+    Local interpolation from the k nearest sensors (KD-tree) -> sparse operator with k entries per vertex,  
+    cost proportional to vertices * k, no solve.  
+    Methods:  
+        - idw: inverse distance weights 1 / d^power  
+        - wendland: 1 / d^power tapered by the Wendland C2 function over the distance of the (k+1)-th sensor,  
+          weight of a sensor goes to 0 before it leaves the neighbourhood -> continuous field  
+    Both are exact at the sensors.  
+    """
+    def __init__(self, sensor_positions, k:int = 8, method:str = "idw", power:float = 2.0):
+        if method not in ("idw", "wendland"):
+            raise ValueError("Unknown local interpolation method -> got: ", method)
+        self.sensor_positions = np.asarray(sensor_positions, dtype=float)
+        self.k = k
+        self.kernel = method
+        self.power = power
+        self.tree = cKDTree(self.sensor_positions)
+
+    def params(self) -> dict:
+        return {"kernel": self.kernel, "k": self.k, "power": self.power}
+
+    def subset(self, valid):
+        return KnnInterpolator(self.sensor_positions[valid], self.k, self.kernel, self.power)
+
+    def operator(self, points, chunk:int = 262144):
+        """
+        Returns:  
+            - (len(points), n_sensors) sparse operator W (CSR)  
+        """
+        points = np.asarray(points, dtype=float)
+        n = len(self.sensor_positions)
+        k = min(self.k, n)
+        # one more neighbour -> support radius of the taper
+        query = min(k + 1, n) if self.kernel == "wendland" else k
+        data = np.empty((len(points), k))
+        indices = np.empty((len(points), k), dtype=np.int32)
+        for start in range(0, len(points), chunk):
+            dist, idx = self.tree.query(points[start:start + chunk], k=query)
+            dist = dist.reshape(len(dist), query)
+            idx = idx.reshape(len(idx), query)
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / dist[:, :k] ** self.power
+            if self.kernel == "wendland" and query > k:
+                r = dist[:, :k] / np.maximum(dist[:, k:k + 1], 1e-300)
+                weights *= np.clip(1 - r, 0, None) ** 4 * (4 * r + 1)
+            # vertex on a sensor -> only that sensor
+            exact = ~np.isfinite(weights)
+            on_sensor = exact.any(axis=1)
+            weights[on_sensor] = exact[on_sensor]
+            total = weights.sum(axis=1, keepdims=True)
+            # all tapered to 0 (equidistant neighbours) -> plain average
+            weights = np.where(total > 0, weights / np.where(total > 0, total, 1), 1.0 / k)
+            data[start:start + chunk] = weights
+            indices[start:start + chunk] = idx[:, :k]
+        indptr = np.arange(0, len(points) * k + 1, k, dtype=np.int64)
+        return csr_matrix((data.ravel(), indices.ravel(), indptr), shape=(len(points), n))
+
+    def evaluate(self, points, temperatures):
+        return self.operator(np.atleast_2d(points)) @ np.asarray(temperatures, dtype=float)
+
+
+def make_interpolator(sensor_positions, method:str = "multiquadric", k:int = 8):
+    """
+    Arguments:  
+        - method: one of INTERPOLATION_METHODS  
+        - k: neighbours of the local methods  
+    """
+    if method == "multiquadric":
+        return RbfInterpolator(sensor_positions)
+    if method in ("idw", "wendland"):
+        return KnnInterpolator(sensor_positions, k, method)
+    if method == "harmonic":
+        return HarmonicInterpolator(sensor_positions)
+    raise ValueError("Unknown interpolation method -> got: ", method)
+
+
+class ChunkedOperator(object):
+    """
+    Dense operator (in RAM or memory mapped), evaluated by a single product (BLAS threads on its own).  
+    float32 operators are applied to the temperatures minus their mean (+ mean * row sums) -> rounding error  
+    scales with the spread of the temperatures, not with their absolute value. The float64 row sums are  
+    computed once in row chunks -> no float64 copy of the operator.  
+    """
+    def __init__(self, W):
+        self.W = W
+        self.shape = W.shape
+        self.dtype = W.dtype
+        self.chunks = row_chunks(W.shape[0], W.shape[1] * W.dtype.itemsize)
+        self.row_sums = None
+
+    def __matmul__(self, temperatures):
+        temperatures = np.asarray(temperatures, dtype=float)
+        if self.dtype == np.float64:
+            return self.W @ temperatures
+        if self.row_sums is None:
+            self.row_sums = np.empty(self.shape[0])
+            for start, end in self.chunks:
+                self.row_sums[start:end] = self.W[start:end].sum(axis=1, dtype=np.float64)
+        mean = float(np.mean(temperatures))
+        centered = (temperatures - mean).astype(self.dtype)
+        return self.W @ centered + (mean * self.row_sums).astype(self.dtype)
+
+
+def operator_dtype(n_points:int, n_sensors:int, ram_budget:int|None = None, precision:str = "auto"):
+    """
+    Returns:  
+        - float64, float32 when asked for or when float64 does not fit into ram_budget (bytes)  
+    """
+    if precision not in PRECISIONS:
+        raise ValueError("Unknown operator precision -> got: ", precision)
+    if precision != "auto":
+        return np.dtype(precision)
+    if ram_budget is not None and n_points * n_sensors * 8 > ram_budget:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def build_operator(interpolator, mesh, cache=None, ram_budget:int|None = None, precision:str = "auto"):
+    """
+    Arguments:  
+        - ram_budget: bytes a dense operator may take in RAM, larger ones are built straight into  
+          the (memory mapped) cache file  
+        - precision: auto (float32 only when float64 does not fit the budget), float32, float64  
+    Returns:  
+        - operator of the interpolator on the mesh vertices (operator @ temperatures)  
+    """
+    if isinstance(interpolator, HarmonicInterpolator):
+        # needs the connectivity, factorization is kept in memory only
+        return interpolator.operator(mesh)
+    if isinstance(interpolator, KnnInterpolator):
+        return cache.get(mesh.points, interpolator) if cache is not None else interpolator.operator(mesh.points)
+    dtype = operator_dtype(mesh.n_points, len(interpolator.sensor_positions), ram_budget, precision)
+    if cache is not None:
+        return ChunkedOperator(cache.get(mesh.points, interpolator, dtype))
+    if ram_budget is not None and mesh.n_points * len(interpolator.sensor_positions) * dtype.itemsize > ram_budget:
+        print("Operator over the RAM budget without operator cache -> kept in RAM")
+    return ChunkedOperator(interpolator.operator(mesh.points, dtype))
+
+
+def operator_cache_dir(project_path:str|None = None) -> str:
+    """
+    Returns:  
+        - <project>_cache/operators next to the project file, user cache dir for unsaved projects  
+    """
+    if project_path is None:
+        return os.path.join(default_cache_dir(), "operators")
+    return os.path.join(os.path.splitext(project_path)[0] + "_cache", "operators")
+
+
+class OperatorCache(object):
+    """
+    Interpolation operators on disk (.npy, sparse ones as CSR arrays, loaded memory mapped), content addressed by the hash of  
+    the mesh points, sensor positions, kernel and its parameters. Least recently used entries are removed  
+    when the cache grows over max_bytes.  
+    """
+    def __init__(self, cache_dir:str, max_bytes:int = 2 << 30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, points, sensor_positions, params:dict) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(np.ascontiguousarray(points, dtype=float).data)
+        digest.update(np.ascontiguousarray(sensor_positions, dtype=float).data)
+        digest.update(json.dumps(dict(params, version=OPERATOR_VERSION), sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def load(self, key:str):
+        """
+        Returns:  
+            - memory mapped operator or None  
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, "meta.json"), "r") as f:
+                meta = json.load(f)
+            if meta.get("sparse", False):
+                arrays = [np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r") for name in ("data", "indices", "indptr")]
+                W = csr_matrix(tuple(arrays), shape=tuple(meta["shape"]), copy=False)
+            else:
+                W = np.load(os.path.join(entry_dir, "operator.npy"), mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        # access time for the LRU (atime is often disabled)
+        os.utime(entry_dir)
+        return W
+
+    def store(self, key:str, W, meta:dict, build=None):
+        """
+        Arguments:  
+            - W: operator or (shape, dtype) with build(out) filling the memory mapped file (never whole in RAM)  
+        """
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp_")
+        try:
+            if build is not None:
+                shape, dtype = W
+                out = np.lib.format.open_memmap(os.path.join(tmp_dir, "operator.npy"), mode="w+", dtype=dtype, shape=shape)
+                build(out)
+                out.flush()
+                W = out
+            elif issparse(W):
+                for name in ("data", "indices", "indptr"):
+                    np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(W, name))
+            else:
+                np.save(os.path.join(tmp_dir, "operator.npy"), W)
+            _atomic_write_json(os.path.join(tmp_dir, "meta.json"), dict(meta, sparse=issparse(W), shape=list(W.shape)))
+            entry_dir = os.path.join(self.cache_dir, key)
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.replace(tmp_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """
+        Returns:  
+            - (last use, size in bytes, key) of every entry  
+        """
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, key)
+            if key.startswith(".tmp_") or not os.path.isdir(entry_dir):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+            entries.append((os.stat(entry_dir).st_mtime, size, key))
+        return entries
+
+    def evict(self, keep:str|None = None):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            total -= size
+
+    def get(self, points, interpolator:RbfInterpolator|KnnInterpolator, dtype=np.float64):
+        """
+        Returns:  
+            - operator of the interpolator on the points (from the cache or built + stored)  
+        """
+        params = interpolator.params()
+        dense = isinstance(interpolator, RbfInterpolator)
+        if dense:
+            params = dict(params, dtype=np.dtype(dtype).name)
+        key = self.key(points, interpolator.sensor_positions, params)
+        W = self.load(key)
+        if W is not None:
+            return W
+        meta = dict(params, n_points=len(points), n_sensors=len(interpolator.sensor_positions))
+        try:
+            if dense:
+                # built straight into the file
+                shape = (len(points), len(interpolator.sensor_positions))
+                self.store(key, (shape, dtype), meta, lambda out: interpolator.operator(points, dtype, out))
+            else:
+                self.store(key, interpolator.operator(points), meta)
+            cached = self.load(key)
+            if cached is not None:
+                return cached
+        except OSError as e:
+            print(f"Operator cache write failed: {e}")
+        return interpolator.operator(points, dtype) if dense else interpolator.operator(points)
+
+
+class IncrementalRbf(object):
+    """
+    Multiquadric interpolation on fixed points while sensors are added/moved/removed one at a time.  
+    Keeps a QR factorization of the sensor matrix A, a sensor is inserted/deleted as a row + column  
+    (scipy.linalg.qr_insert/qr_delete -> O(n^2), stable also for the badly conditioned multiquadric matrices)  
+    and the point/sensor kernel columns Phi (one new column per added sensor -> O(points)), nothing is refactorized.  
+    epsilon is fixed; when the scipy default of the current layout drifts away by more than rebuild_ratio  
+    everything is rebuilt once (field keeps matching the one of the test).  
+    Sensors closer than duplicate_ratio * epsilon to another one are rejected (ValueError) -> A stays regular.  
+    """
+    def __init__(self, points, epsilon:float, rebuild_ratio:float = 1.25, duplicate_ratio:float = 1e-3):
+        self.points = np.asarray(points, dtype=float)
+        self.epsilon = epsilon
+        self.rebuild_ratio = rebuild_ratio
+        self.duplicate_ratio = duplicate_ratio
+        self.positions = np.empty((0, 3))
+        self.q = np.empty((0, 0))
+        self.r = np.empty((0, 0))
+        # columns [:n] used, spare capacity -> adding does not copy every time
+        self.phi = np.empty((len(self.points), 16))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _kernel(self, a, b):
+        return multiquadric(np.atleast_2d(a), np.atleast_2d(b), self.epsilon)
+
+    def rebuild(self, positions, epsilon:float|None = None):
+        """
+        Full build (initial layout or epsilon drift).  
+        """
+        if epsilon is not None:
+            self.epsilon = epsilon
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        if len(positions) > 1 and cKDTree(positions).query_pairs(self.duplicate_ratio * self.epsilon):
+            raise ValueError("Sensors at the same position -> got: ", positions)
+        self.positions = positions
+        n = len(self.positions)
+        if n > 0:
+            self.q, self.r = qr(self._kernel(self.positions, self.positions))
+        else:
+            self.q, self.r = np.empty((0, 0)), np.empty((0, 0))
+        self.phi = np.empty((len(self.points), n + max(16, n // 2)))
+        if n > 0:
+            self.phi[:, :n] = self._kernel(self.points, self.positions)
+
+    def _check_epsilon(self):
+        if len(self.positions) < 2:
+            return
+        target = rbf_epsilon(self.positions, self.epsilon)
+        if max(target / self.epsilon, self.epsilon / target) > self.rebuild_ratio:
+            self.rebuild(self.positions, target)
+
+    def is_duplicate(self, position) -> bool:
+        """
+        Returns:  
+            - True when position is within duplicate_ratio * epsilon of a sensor  
+        """
+        if len(self.positions) == 0:
+            return False
+        distance = np.linalg.norm(self.positions - np.asarray(position, dtype=float).reshape(1, 3), axis=1)
+        return bool(distance.min() < self.duplicate_ratio * self.epsilon)
+
+    def add(self, position, index:int|None = None):
+        """
+        Arguments:  
+            - index: position in the sensor order (default: append)  
+        """
+        position = np.asarray(position, dtype=float).reshape(1, 3)
+        if self.is_duplicate(position):
+            # coincident sensors -> singular A, nothing is changed
+            raise ValueError("Sensor at the position of another one -> got: ", position[0])
+        n = len(self.positions)
+        index = n if index is None else index
+        positions = np.insert(self.positions, index, position, axis=0)
+        if n == 0:
+            self.q, self.r = qr(self._kernel(positions, positions))
+        else:
+            column = self._kernel(self.positions, position)[:, 0]
+            self.q, self.r = qr_insert(self.q, self.r, column, index, which="col")
+            self.q, self.r = qr_insert(self.q, self.r, self._kernel(position, positions)[0], index, which="row")
+        self.positions = positions
+        if n + 1 > self.phi.shape[1]:
+            phi = np.empty((len(self.points), n + max(16, n // 2)))
+            phi[:, :n] = self.phi[:, :n]
+            self.phi = phi
+        self.phi[:, index + 1:n + 1] = self.phi[:, index:n].copy()
+        self.phi[:, index] = self._kernel(self.points, position)[:, 0]
+        self._check_epsilon()
+
+    def remove(self, index:int):
+        n = len(self.positions)
+        if n == 1:
+            self.rebuild(np.empty((0, 3)))
+            return
+        self.q, self.r = qr_delete(self.q, self.r, index, 1, which="row")
+        self.q, self.r = qr_delete(self.q, self.r, index, 1, which="col")
+        self.positions = np.delete(self.positions, index, axis=0)
+        self.phi[:, index:n - 1] = self.phi[:, index + 1:n].copy()
+        self._check_epsilon()
+
+    def move(self, index:int, position):
+        self.remove(index)
+        self.add(position, index)
+
+    def weights(self, temperatures):
+        return solve_triangular(self.r, self.q.T @ np.asarray(temperatures, dtype=float))
+
+    def evaluate(self, temperatures):
+        """
+        Returns:  
+            - interpolated temperatures on the points  
+        """
+        n = len(self.positions)
+        if n == 0:
+            return np.full(len(self.points), np.nan)
+        return self.phi[:, :n] @ self.weights(temperatures)
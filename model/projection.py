@@ -0,0 +1,165 @@
+from itertools import chain
+import numpy as np
+from scipy.spatial import cKDTree
+from vtkmodules.vtkCommonCore import mutable
+from vtkmodules.vtkCommonDataModel import vtkStaticCellLocator
+
+
+def closest_points_on_triangles(p, a, b, c):
+    """
+    Closest point of each triangle (a[i], b[i], c[i]) to p[i], vectorized (Ericson, Real-Time Collision Detection 5.1.5).  
+    Arguments:  
+        - p, a, b, c: (n, 3) arrays  
+    Returns:  
+        - (n, 3) closest points  
+    """
+    def dot(u, v):
+        return np.einsum("ij,ij->i", u, v)
+
+    ab = b - a
+    ac = c - a
+    ap = p - a
+    bp = p - b
+    cp = p - c
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = 1.0 / (va + vb + vc)
+        result = a + ab * (vb * denom)[:, None] + ac * (vc * denom)[:, None]
+        # Voronoi regions, the first matching one in Ericson's order wins -> assigned in reverse
+        bc_w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        result = np.where(((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0))[:, None], b + (c - b) * bc_w[:, None], result)
+        ac_w = d2 / (d2 - d6)
+        result = np.where(((vb <= 0) & (d2 >= 0) & (d6 <= 0))[:, None], a + ac * ac_w[:, None], result)
+        result = np.where(((d6 >= 0) & (d5 <= d6))[:, None], c, result)
+        ab_v = d1 / (d1 - d3)
+        result = np.where(((vc <= 0) & (d1 >= 0) & (d3 <= 0))[:, None], a + ab * ab_v[:, None], result)
+        result = np.where(((d3 >= 0) & (d4 <= d3))[:, None], b, result)
+        result = np.where(((d1 <= 0) & (d2 <= 0))[:, None], a, result)
+    # degenerate triangles
+    return np.where(np.isfinite(result), result, a)
+
+
+class SurfaceProjector(object):
+    """
+    Projection of points onto the model surface, built once per model.  
+    Triangles (quads/polygons are triangulated), their normals, a vtkStaticCellLocator for single points  
+    and a KD-tree over the triangle centroids for bulk projection: k nearest centroids first, points where a  
+    farther triangle could still be closer get all centroids within reach (one ball query), candidates are  
+    skipped by a lower bound of their distance.  
+    """
+    def __init__(self, surface, candidates:int = 16, ball_limit:int = 4096):
+        triangles = surface.triangulate()
+        self.locator_mesh = triangles
+        faces = triangles.regular_faces
+        points = np.asarray(triangles.points, dtype=float)
+        self.a, self.b, self.c = points[faces[:, 0]], points[faces[:, 1]], points[faces[:, 2]]
+        normals = np.cross(self.b - self.a, self.c - self.a)
+        lengths = np.linalg.norm(normals, axis=1)
+        self.normals = normals / np.where(lengths > 0, lengths, 1.0)[:, None]
+        centroids = (self.a + self.b + self.c) / 3
+        # every point of a triangle lies within its radius around the centroid
+        self.radius = np.max(np.stack([np.linalg.norm(v - centroids, axis=1) for v in (self.a, self.b, self.c)]), axis=0)
+        self.max_radius = float(self.radius.max()) if len(self.radius) > 0 else 0.0
+        self.centroids = centroids
+        self.tree = cKDTree(centroids)
+        self.candidates = min(candidates, len(centroids))
+        self.ball_limit = ball_limit
+
+        self.locator = vtkStaticCellLocator()
+        self.locator.SetDataSet(triangles)
+        self.locator.BuildLocator()
+
+    def project(self, point):
+        """
+        Arguments:  
+            - point: (3,) position (e.g. picked point)  
+        Returns:  
+            - closest point on the surface, index of its triangle  
+        """
+        closest = [0.0, 0.0, 0.0]
+        cell_id = mutable(0)
+        sub_id = mutable(0)
+        dist2 = mutable(0.0)
+        self.locator.FindClosestPoint(np.asarray(point, dtype=float), closest, cell_id, sub_id, dist2)
+        return np.array(closest), int(cell_id)
+
+    def normal(self, triangle:int):
+        return self.normals[triangle]
+
+    def project_many(self, points, chunk:int = 65536):
+        """
+        Arguments:  
+            - points: (n, 3) positions  
+        Returns:  
+            - (n, 3) closest points on the surface, (n,) triangle indices  
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        closest = np.empty_like(points)
+        triangles = np.empty(len(points), dtype=np.int64)
+        for start in range(0, len(points), chunk):
+            end = min(start + chunk, len(points))
+            closest[start:end], triangles[start:end] = self._project_chunk(points[start:end])
+        return closest, triangles
+
+    def _lower_bound(self, points, triangles):
+        """
+        Lower bound of the distance from each point to its triangle: the triangle lies in its plane  
+        within radius of the centroid -> plane distance and in-plane distance to that disk.  
+        """
+        offset = points - self.centroids[triangles]
+        height = np.einsum("ij,ij->i", offset, self.normals[triangles])
+        lateral = np.sqrt(np.maximum(np.einsum("ij,ij->i", offset, offset) - height ** 2, 0.0))
+        return np.sqrt(height ** 2 + np.maximum(lateral - self.radius[triangles], 0.0) ** 2)
+
+    def _refine(self, points, result, triangles, best_dist, owners, flat):
+        """
+        Closest points of the (owner point, triangle) pairs that can beat the current best, result,  
+        triangles and best_dist updated in place.  
+        """
+        near = self._lower_bound(points[owners], flat) < best_dist[owners]
+        owners, flat = owners[near], flat[near]
+        closest = closest_points_on_triangles(points[owners], self.a[flat], self.b[flat], self.c[flat])
+        dist = np.linalg.norm(closest - points[owners], axis=1)
+        order = np.lexsort((dist, owners))
+        # first pair of every owner = its closest triangle
+        first = order[np.r_[True, owners[order][1:] != owners[order][:-1]]] if len(order) else order
+        first = first[dist[first] < best_dist[owners[first]]]
+        result[owners[first]] = closest[first]
+        triangles[owners[first]] = flat[first]
+        best_dist[owners[first]] = dist[first]
+
+    def _project_chunk(self, points):
+        k = self.candidates
+        centroid_dist, candidates = self.tree.query(points, k=k)
+        centroid_dist = centroid_dist.reshape(len(points), k)
+        candidates = candidates.reshape(len(points), k)
+        # nearest centroid -> first best, the other candidates only where their lower bound is below it
+        triangles = candidates[:, 0].copy()
+        result = closest_points_on_triangles(points, self.a[triangles], self.b[triangles], self.c[triangles])
+        best_dist = np.linalg.norm(result - points, axis=1)
+        others = centroid_dist[:, 1:] - self.radius[candidates[:, 1:]] < best_dist[:, None]
+        owners = np.nonzero(others)[0]
+        self._refine(points, result, triangles, best_dist, owners, candidates[:, 1:][others])
+        if k == len(self.radius):
+            return result, triangles
+        # a triangle outside the candidates has its centroid at least the k-th distance away -> closer only within max radius
+        unsure = np.nonzero(centroid_dist[:, -1] - self.max_radius < best_dist)[0]
+        if len(unsure) == 0:
+            return result, triangles
+        # every triangle that can be closer has its centroid within best + max radius -> one ball query
+        reach = best_dist[unsure] + self.max_radius
+        counts = self.tree.query_ball_point(points[unsure], reach, return_length=True)
+        bulk = counts <= self.ball_limit
+        if bulk.any():
+            balls = self.tree.query_ball_point(points[unsure[bulk]], reach[bulk], return_sorted=False)
+            flat = np.fromiter(chain.from_iterable(balls), dtype=np.int64, count=int(counts[bulk].sum()))
+            self._refine(points, result, triangles, best_dist, np.repeat(unsure[bulk], counts[bulk]), flat)
+        # far from the surface -> ball holds a large part of the model, single locator queries instead
+        for i in unsure[~bulk]:
+            result[i], triangles[i] = self.project(points[i])
+        return result, triangles
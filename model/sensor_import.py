@@ -0,0 +1,50 @@
+import csv
+from collections import Counter
+import numpy as np
+
+COLUMNS = ("name", "x", "y", "z", "channel")
+
+
+def _is_number(text:str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def read_sensor_csv(file_path:str):
+    """
+    Sensor layout from CAD, one sensor per row: name, x, y, z[, channel]  
+    Optional header row (columns then matched by name), empty lines and lines starting with # are skipped.  
+    Returns:  
+        - names, (n, 3) positions, channels (None where no channel is given)  
+    """
+    with open(file_path, "r", newline="") as f:
+        rows = [row for row in csv.reader(f) if row and any(cell.strip() for cell in row) and not row[0].lstrip().startswith("#")]
+    if len(rows) == 0:
+        raise ValueError("Sensor CSV is empty -> got: ", file_path)
+    header = [cell.strip().lower() for cell in rows[0]]
+    if len(header) > 1 and not _is_number(header[1]):
+        missing = [c for c in COLUMNS[:4] if c not in header]
+        if missing:
+            raise ValueError("Sensor CSV header is missing columns -> got: ", missing)
+        index = [header.index(c) if c in header else None for c in COLUMNS]
+        rows = rows[1:]
+    else:
+        index = list(range(len(COLUMNS)))
+
+    names, positions, channels = [], [], []
+    for line, row in enumerate(rows, start=1):
+        row = [cell.strip() for cell in row]
+        try:
+            names.append(row[index[0]])
+            positions.append([float(row[i]) for i in index[1:4]])
+        except (IndexError, ValueError):
+            raise ValueError("Invalid sensor row, should be name, x, y, z[, channel] -> got: ", line, row)
+        channel = row[index[4]] if index[4] is not None and index[4] < len(row) else ""
+        channels.append(channel or None)
+    duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+    if duplicates:
+        raise ValueError("Duplicate sensor names -> got: ", duplicates)
+    return names, np.array(positions, dtype=float).reshape(-1, 3), channels
@@ -0,0 +1,195 @@
+import numpy as np
+import pyvista as pv
+from scipy.sparse import csr_matrix, issparse
+from .operators import ChunkedOperator
+
+# corner offsets of the voxel cell around a point -> trilinear weights
+CORNERS = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+SLICE_NORMALS = ("x", "y", "z")
+
+
+def inside_voxels(surface, origin, spacing:float, dims, chunk:int = 65536):
+    """
+    Voxel centers within the closed surface: rays along z through every (x, y) column of centers, a center  
+    is inside after an odd number of surface crossings below it -> linear in triangles + voxels.  
+    Arguments:  
+        - origin: (3,) first voxel center, spacing: voxel edge, dims: (3,) voxels per axis  
+    Returns:  
+        - bool array of shape dims  
+    """
+    triangles = surface if surface.is_all_triangles else surface.triangulate()
+    faces = triangles.regular_faces
+    points = np.asarray(triangles.points, dtype=float)
+    nx, ny, nz = (int(d) for d in dims)
+    # columns shifted by a fraction of a voxel -> no ray runs exactly through a vertex or an edge
+    column_origin = np.asarray(origin[:2], dtype=float) + spacing * np.array([1.3e-4, 0.7e-4])
+    crossings = np.zeros(nx * ny * (nz + 1), dtype=np.int64)
+    for start in range(0, len(faces), chunk):
+        a, b, c = (points[faces[start:start + chunk, v]] for v in range(3))
+        corners = np.stack([a[:, :2], b[:, :2], c[:, :2]])
+        low = np.ceil((corners.min(axis=0) - column_origin) / spacing).astype(np.int64)
+        high = np.floor((corners.max(axis=0) - column_origin) / spacing).astype(np.int64)
+        low = np.maximum(low, 0)
+        high = np.minimum(high, [nx - 1, ny - 1])
+        extent = np.maximum(high - low + 1, 0)
+        counts = extent[:, 0] * extent[:, 1]
+        # every (triangle, column) pair within the bounding box of the triangle
+        tri = np.repeat(np.arange(len(a)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        i = low[tri, 0] + offset // extent[tri, 1]
+        j = low[tri, 1] + offset % extent[tri, 1]
+        q = column_origin + spacing * np.stack([i, j], axis=1)
+        a2, b2, c2 = a[tri], b[tri], c[tri]
+        area = (b2[:, 0] - a2[:, 0]) * (c2[:, 1] - a2[:, 1]) - (b2[:, 1] - a2[:, 1]) * (c2[:, 0] - a2[:, 0])
+        w_a = (b2[:, 0] - q[:, 0]) * (c2[:, 1] - q[:, 1]) - (b2[:, 1] - q[:, 1]) * (c2[:, 0] - q[:, 0])
+        w_b = (c2[:, 0] - q[:, 0]) * (a2[:, 1] - q[:, 1]) - (c2[:, 1] - q[:, 1]) * (a2[:, 0] - q[:, 0])
+        w_c = area - w_a - w_b
+        # same sign as the area -> column goes through the triangle, vertical triangles are never hit
+        hit = (area != 0) & (w_a * area >= 0) & (w_b * area >= 0) & (w_c * area >= 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (w_a * a2[:, 2] + w_b * b2[:, 2] + w_c * c2[:, 2]) / area
+        # first center above the crossing
+        k = np.clip(np.ceil((z[hit] - origin[2]) / spacing), 0, nz).astype(np.int64)
+        crossings += np.bincount((i[hit] * ny + j[hit]) * (nz + 1) + k, minlength=len(crossings))
+    parity = np.cumsum(crossings.reshape(nx, ny, nz + 1), axis=2)[:, :, :nz] % 2
+    return parity.astype(bool)
+
+
+def grid_dims(surface, resolution:int):
+    """
+    Returns:  
+        - voxel edge, voxels per axis of the grid over the model bounds  
+    """
+    bounds = np.array(surface.bounds).reshape(3, 2)
+    size = bounds[:, 1] - bounds[:, 0]
+    spacing = float(size.max()) / resolution
+    return spacing, np.maximum(np.ceil(size / spacing).astype(np.int64), 2)
+
+
+def fit_resolution(surface, resolution:int, bytes_per_voxel:float, budget:int|None) -> int:
+    """
+    Arguments:  
+        - bytes_per_voxel: operator bytes of one voxel (row), budget: bytes the operator may take (None = any)  
+    Returns:  
+        - highest resolution <= resolution whose operator fits the budget, every voxel of the bounding box  
+          counted (upper bound of the voxels inside), 0 when not even resolution 2 fits  
+    """
+    if budget is None:
+        return resolution
+    while resolution >= 2:
+        _, dims = grid_dims(surface, resolution)
+        size = float(np.prod(dims)) * bytes_per_voxel
+        if size <= budget:
+            return resolution
+        resolution = min(resolution - 1, int(resolution * (budget / size) ** (1 / 3)))
+    return 0
+
+
+def _operator_rows(W, rows):
+    """
+    Returns:  
+        - rows of an operator (dense: ChunkedOperator/ndarray, possibly memory mapped float32 -> float64, or sparse)  
+    """
+    if isinstance(W, ChunkedOperator):
+        W = W.W
+    if issparse(W):
+        return W[rows]
+    return np.asarray(W[rows], dtype=float)
+
+
+class VoxelGrid(object):
+    """
+    Regular grid of voxel centers over the model, resolution = voxels along the longest side.  
+    Only the voxels inside the surface get a row in the sensors -> voxels operator (rows, -1 outside).  
+    """
+    def __init__(self, surface, resolution:int):
+        if resolution < 2:
+            raise ValueError("Volume resolution must be at least 2 -> got: ", resolution)
+        bounds = np.array(surface.bounds).reshape(3, 2)
+        self.resolution = resolution
+        self.spacing, self.dims = grid_dims(surface, resolution)
+        if surface.n_open_edges > 0:
+            # ray parity needs a closed surface -> holes flip whole columns inside/outside
+            print(f"Volume: model surface is not closed ({surface.n_open_edges} open edges), inside voxels may be wrong")
+        # grid centered on the model
+        self.origin = (bounds[:, 0] + bounds[:, 1]) / 2 - (self.dims - 1) / 2 * self.spacing
+        self.inside = inside_voxels(surface, self.origin, self.spacing, self.dims)
+        self.rows = np.full(self.inside.size, -1, dtype=np.int64)
+        self.rows[self.inside.ravel()] = np.arange(int(self.inside.sum()))
+        self.points = self.origin + self.spacing * np.argwhere(self.inside)
+        self.center = (bounds[:, 0] + bounds[:, 1]) / 2
+
+    def __len__(self):
+        return len(self.points)
+
+    def cloud(self):
+        return pv.PolyData(self.points)
+
+    def slice(self, origin, normal):
+        """
+        Cut through the voxels: quads on a lattice in the plane (voxel spacing), kept where at least half  
+        of the trilinear weight lies on voxels inside the model.  
+        Arguments:  
+            - origin, normal: plane  
+        Returns:  
+            - slice mesh (pv.PolyData, None when the plane misses the model), sparse (slice points x len(rows))  
+              trilinear weights, operator rows of the voxels around the slice  
+        """
+        normal = np.asarray(normal, dtype=float)
+        normal = normal / np.linalg.norm(normal)
+        origin = np.asarray(origin, dtype=float)
+        # in plane axes, the world axis least aligned with the normal as reference
+        u = np.cross(normal, np.eye(3)[np.argmin(np.abs(normal))])
+        u /= np.linalg.norm(u)
+        v = np.cross(normal, u)
+        center = self.center - np.dot(self.center - origin, normal) * normal
+        box = self.origin + (self.dims - 1) * self.spacing * CORNERS
+        extent_u = (box - center) @ u
+        extent_v = (box - center) @ v
+        s = np.arange(np.floor(extent_u.min() / self.spacing), np.ceil(extent_u.max() / self.spacing) + 1) * self.spacing
+        t = np.arange(np.floor(extent_v.min() / self.spacing), np.ceil(extent_v.max() / self.spacing) + 1) * self.spacing
+        lattice = center + s[:, None, None] * u + t[None, :, None] * v
+        lattice = lattice.reshape(-1, 3)
+
+        g = (lattice - self.origin) / self.spacing
+        base = np.floor(g).astype(np.int64)
+        fraction = g - base
+        usable = np.all((base >= 0) & (base <= self.dims - 2), axis=1)
+        base = np.where(usable[:, None], base, 0)
+        corner_index = base[:, None, :] + CORNERS[None, :, :]
+        corner_rows = self.rows[np.ravel_multi_index(corner_index.reshape(-1, 3).T, self.dims)].reshape(-1, 8)
+        weights = np.prod(np.where(CORNERS[None, :, :] == 1, fraction[:, None, :], 1 - fraction[:, None, :]), axis=2)
+        weights = np.where(corner_rows >= 0, weights, 0.0)
+        total = weights.sum(axis=1)
+        kept = usable & (total >= 0.5)
+
+        # quads of the lattice with all four points kept
+        kept_grid = kept.reshape(len(s), len(t))
+        quads = kept_grid[:-1, :-1] & kept_grid[1:, :-1] & kept_grid[1:, 1:] & kept_grid[:-1, 1:]
+        qi, qj = np.nonzero(quads)
+        if len(qi) == 0:
+            return None, None, None
+        nt = len(t)
+        quad_points = np.stack([qi * nt + qj, (qi + 1) * nt + qj, (qi + 1) * nt + qj + 1, qi * nt + qj + 1], axis=1)
+        used, quad_points = np.unique(quad_points, return_inverse=True)
+        faces = np.hstack([np.full((len(qi), 1), 4), quad_points.reshape(-1, 4)]).ravel()
+        mesh = pv.PolyData(lattice[used], faces)
+
+        weights = weights[used] / total[used, None]
+        corner_rows = corner_rows[used]
+        nonzero = weights > 0
+        rows, columns = np.unique(corner_rows[nonzero], return_inverse=True)
+        slice_points = np.repeat(np.arange(len(used)), nonzero.sum(axis=1))
+        S = csr_matrix((weights[nonzero], (slice_points, columns.ravel())), shape=(len(used), len(rows)))
+        return mesh, S, rows
+
+    def slice_operator(self, S, rows, W=None, interpolator=None):
+        """
+        Arguments:  
+            - W: sensors -> voxels operator (rows gathered) or interpolator (only the rows computed, e.g. sensor subsets)  
+        Returns:  
+            - (slice points x sensors) operator  
+        """
+        block = _operator_rows(W, rows) if W is not None else interpolator.operator(self.points[rows])
+        operator = S @ block
+        return operator.tocsr() if issparse(operator) else np.asarray(operator)
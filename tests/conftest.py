@@ -0,0 +1,5 @@
+import os
+import sys
+
+# repository root -> the tests import the packages (data, model, gui) like main.py does, also under a bare pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
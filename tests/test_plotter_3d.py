@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import pyvista as pv
+from gui.plotter_3D import Plotter3D
+from model.lod import LODSelector
+
+
+@pytest.fixture
+def view():
+    mesh = pv.Sphere(theta_resolution=40, phi_resolution=40)
+    rng = np.random.default_rng(0)
+    sensors = mesh.points[rng.choice(mesh.n_points, 12, replace=False)]
+    plotter = pv.Plotter(off_screen=True)
+    # distance mode with factor 0 -> always the coarse level is rendered
+    view = Plotter3D(plotter, mesh, sensors, [f"s{i}" for i in range(12)], lod_levels=[mesh.decimate(0.75)],
+                     lod_selector=LODSelector(2, "distance", distance_factor=0.0))
+    temperatures = 20.0 + 10.0 * sensors[:, 0]
+    view.update_temperatures(temperatures)
+    yield view, temperatures
+    view.reset()
+    plotter.close()
+
+
+def test_renders_the_coarse_level(view):
+    view, _ = view
+    assert view.level == 1
+    assert view.render_mesh.n_points < view.mesh.n_points
+
+
+def test_full_resolution_matches_level_0(view):
+    view, temperatures = view
+    np.testing.assert_allclose(view.full_resolution_temperatures(), view.operator(0) @ temperatures, atol=1e-9)
+
+
+def test_picked_values_match_level_0(view):
+    view, temperatures = view
+    vertices = view.mesh.points[[0, 100, 500]]
+    np.testing.assert_allclose(view.temperatures_at(vertices), (view.operator(0) @ temperatures)[[0, 100, 500]], atol=1e-9)
+
+
+def test_failed_sensor_left_out(view):
+    view, temperatures = view
+    failed = temperatures.copy()
+    failed[3] = np.nan
+    view.update_temperatures(failed)
+    valid = np.arange(12) != 3
+    expected = view.masked_operator(0, valid) @ temperatures[valid]
+    np.testing.assert_allclose(view.full_resolution_temperatures(), expected, atol=1e-9)
+    np.testing.assert_allclose(view.temperatures_at(view.mesh.points[:5]), expected[:5], atol=1e-9)
+
+
+def test_export_field(view, tmp_path):
+    view, temperatures = view
+    path = str(tmp_path / "field.vtk")
+    view.export_field(path)
+    exported = pv.read(path)
+    assert exported.n_points == view.mesh.n_points
+    np.testing.assert_allclose(exported["Temperature"], view.operator(0) @ temperatures, atol=1e-6)
+    # exported from a copy -> the full resolution model (not rendered) stays without scalars
+    assert "Temperature" not in view.mesh.point_data
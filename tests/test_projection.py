@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import pyvista as pv
+from model.projection import SurfaceProjector
+
+
+def near_surface(surface, count:int, noise:float, seed:int = 0):
+    rng = np.random.default_rng(seed)
+    return surface.points[rng.integers(0, surface.n_points, count)] + rng.normal(0, noise, (count, 3))
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    calls = []
+
+    def make(projector):
+        single = projector.project
+        monkeypatch.setattr(projector, "project", lambda point: calls.append(point) or single(point))
+        return calls
+    return make
+
+
+@pytest.mark.parametrize("surface", [
+    pv.Sphere(theta_resolution=200, phi_resolution=200),
+    pv.ParametricTorus().triangulate(),
+], ids=["sphere", "torus"])
+@pytest.mark.parametrize("noise", [0.001, 0.01, 0.05])
+def test_bulk_without_fallbacks(counted, surface, noise):
+    projector = SurfaceProjector(surface)
+    points = near_surface(surface, 1000, noise)
+    single = np.array([projector.project(point)[0] for point in points])
+    calls = counted(projector)
+    closest, triangles = projector.project_many(points)
+    assert len(calls) == 0
+    np.testing.assert_allclose(np.linalg.norm(closest - points, axis=1), np.linalg.norm(single - points, axis=1), atol=1e-12)
+    # closest points lie on their triangles
+    assert np.all(np.abs(np.einsum("ij,ij->i", closest - projector.a[triangles], projector.normals[triangles])) < 1e-9)
+
+
+def test_far_points_fall_back(counted):
+    # center of the sphere -> every triangle about as far, the ball holds the whole model
+    surface = pv.Sphere(theta_resolution=60, phi_resolution=60)
+    projector = SurfaceProjector(surface, ball_limit=256)
+    points = np.array([[0.52, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    calls = counted(projector)
+    closest, _ = projector.project_many(points)
+    assert len(calls) == 1
+    np.testing.assert_allclose(np.linalg.norm(closest, axis=1), 0.5, atol=1e-2)
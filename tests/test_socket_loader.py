@@ -0,0 +1,99 @@
+import queue
+import socket
+import threading
+import time
+import numpy as np
+import pytest
+from data.parser import pack_frame
+from data.socket_loader import SocketLoader
+from data.supervisor import Gap
+
+
+class StandInServer(object):
+    """
+    Local TCP board: every accepted connection gets the next payload, then it is closed (-> loader reconnects).  
+    """
+    def __init__(self, payloads:list[bytes], hold:float = 1.0):
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.payloads = payloads
+        self.hold = hold
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        for i, payload in enumerate(self.payloads):
+            conn, _ = self.server.accept()
+            with conn:
+                conn.sendall(payload)
+                # last connection stays open until the loader stops
+                time.sleep(self.hold if i < len(self.payloads) - 1 else 5.0)
+
+    def close(self):
+        self.server.close()
+
+
+def free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def collect(q:queue.Queue, count:int, timeout:float = 5.0) -> list:
+    return [q.get(timeout=timeout) for _ in range(count)]
+
+
+@pytest.fixture
+def loader():
+    started = []
+
+    def make(url):
+        q = queue.Queue()
+        source = SocketLoader(url, q)
+        source.start()
+        started.append(source)
+        return source, q
+
+    yield make
+    for source in started:
+        source.stop()
+
+
+@pytest.mark.parametrize("framing, payload", [
+    ("csv", b"23.5,24.1,25.0\n22.0,23.0,24.0\n"),
+    ("binary", pack_frame([23.5, 24.1, 25.0]) + pack_frame([22.0, 23.0, 24.0])),
+])
+def test_tcp_rows(loader, framing, payload):
+    server = StandInServer([payload])
+    _, q = loader(f"tcp://127.0.0.1:{server.port}?framing={framing}")
+    rows = collect(q, 2)
+    np.testing.assert_allclose(rows, [[23.5, 24.1, 25.0], [22.0, 23.0, 24.0]], rtol=1e-6)
+    server.close()
+
+
+@pytest.mark.parametrize("framing, payload", [
+    ("csv", b"21.0,22.0\n21.5,22.5\n"),
+    ("binary", pack_frame([21.0, 22.0]) + pack_frame([21.5, 22.5])),
+])
+def test_udp_rows(loader, framing, payload):
+    port = free_udp_port()
+    source, q = loader(f"udp://127.0.0.1:{port}?framing={framing}")
+    deadline = time.monotonic() + 5.0
+    while source.sock is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        sender.sendto(payload, ("127.0.0.1", port))
+    rows = collect(q, 2)
+    np.testing.assert_allclose(rows, [[21.0, 22.0], [21.5, 22.5]], rtol=1e-6)
+
+
+def test_tcp_reconnect_gap(loader):
+    # board drops the connection after the first row, the second connection sends the next one
+    server = StandInServer([b"20.0,21.0\n", b"30.0,31.0\n"], hold=0.1)
+    _, q = loader(f"tcp://127.0.0.1:{server.port}")
+    first, gap, second = collect(q, 3)
+    np.testing.assert_allclose(first, [20.0, 21.0])
+    assert isinstance(gap, Gap)
+    assert gap.end >= gap.start
+    np.testing.assert_allclose(second, [30.0, 31.0])
+    server.close()